@@ -1,11 +1,12 @@
 """
 API Dependencies - Database sessions, authentication, etc.
 """
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, AsyncSessionLocal
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -24,6 +25,19 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for getting an async database session
+    
+    Usage:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(...))
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Optional: Add authentication dependency
 # Uncomment and customize when you add authentication
 
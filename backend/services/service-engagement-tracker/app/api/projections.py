@@ -0,0 +1,72 @@
+"""
+Column projections shaped like the read-only response schemas.
+
+List endpoints select these columns and hand the row mappings straight to
+orjson, skipping ORM instances and per-row Pydantic validation. Since FastAPI
+no longer checks those rows against response_model, a nullable column behind a
+required schema field is coalesced here (tests/test_projections.py enforces it).
+"""
+from sqlalchemy import DateTime, cast, func
+
+from app.models import EngagementScore, DisengagementPrediction, DailyEngagementMetric
+
+
+def _coalesced(column, fallback):
+    """column, or fallback where it is NULL, under the column's own type and key."""
+    return func.coalesce(column, fallback, type_=column.type).label(column.key)
+
+
+def _defaulted(column):
+    """column, or its insert default where it is NULL (rows written around the ORM)."""
+    return _coalesced(column, column.default.arg)
+
+
+# EngagementScoreResponse / DisengagementPredictionResponse / DailyMetricResponse
+SCORE_RESPONSE_COLUMNS = (
+    EngagementScore.student_id,
+    EngagementScore.date,
+    EngagementScore.login_score,
+    EngagementScore.session_score,
+    EngagementScore.interaction_score,
+    EngagementScore.forum_score,
+    EngagementScore.assignment_score,
+    EngagementScore.engagement_score,
+    EngagementScore.engagement_level,
+    EngagementScore.engagement_trend,
+    EngagementScore.rolling_avg_7days,
+    EngagementScore.rolling_avg_30days,
+    _coalesced(EngagementScore.created_at, cast(EngagementScore.date, DateTime)),
+)
+PREDICTION_RESPONSE_COLUMNS = (
+    DisengagementPrediction.student_id,
+    DisengagementPrediction.prediction_date,
+    DisengagementPrediction.at_risk,
+    DisengagementPrediction.risk_probability,
+    DisengagementPrediction.risk_level,
+    # Same definition the training script stores
+    _coalesced(
+        DisengagementPrediction.confidence_score,
+        func.greatest(DisengagementPrediction.risk_probability, 1 - DisengagementPrediction.risk_probability),
+    ),
+    DisengagementPrediction.contributing_factors,
+    # Looked up from model_metadata; label it so the mapping key matches the schema
+    DisengagementPrediction.feature_importance.label('feature_importance'),
+    DisengagementPrediction.model_version,
+    _defaulted(DisengagementPrediction.prediction_horizon_days),
+    _coalesced(DisengagementPrediction.created_at, cast(DisengagementPrediction.prediction_date, DateTime)),
+)
+METRIC_RESPONSE_COLUMNS = (
+    DailyEngagementMetric.student_id,
+    DailyEngagementMetric.date,
+    _defaulted(DailyEngagementMetric.login_count),
+    _defaulted(DailyEngagementMetric.total_session_duration_minutes),
+    _defaulted(DailyEngagementMetric.page_views),
+    _defaulted(DailyEngagementMetric.content_interactions),
+    _defaulted(DailyEngagementMetric.video_plays),
+    _defaulted(DailyEngagementMetric.video_watch_minutes),
+    _defaulted(DailyEngagementMetric.resource_downloads),
+    _defaulted(DailyEngagementMetric.forum_posts),
+    _defaulted(DailyEngagementMetric.forum_replies),
+    _defaulted(DailyEngagementMetric.quiz_attempts),
+    _defaulted(DailyEngagementMetric.assignments_submitted),
+)
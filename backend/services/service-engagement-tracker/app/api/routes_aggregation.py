@@ -8,8 +8,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.core.cache import PREDICTIONS_GENERATION, bump_generation
 from app.models import StudentActivityEvent
-from app.services.aggregation_service import run_pipeline
+from app.services.aggregation_service import run_pipeline, refresh_engagement_aggregates
 
 router = APIRouter(prefix="/api/v1/aggregation", tags=["Aggregation Pipeline"])
 
@@ -36,6 +37,8 @@ def process_student(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Pipeline error: {exc}")
 
+    # run_pipeline committed a new prediction; retire the cached at-risk listings
+    bump_generation(PREDICTIONS_GENERATION)
     return result
 
 
@@ -78,6 +81,10 @@ def process_all_students(
             db.rollback()
             errors.append({"student_id": sid, "date": str(d), "error": str(exc)})
 
+    if results:
+        refresh_engagement_aggregates(db)
+        bump_generation(PREDICTIONS_GENERATION)
+
     return {
         "processed": len(results),
         "errors": len(errors),
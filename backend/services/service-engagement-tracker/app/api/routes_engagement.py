@@ -2,13 +2,18 @@
 Engagement Score API Routes
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, and_
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 
 from app.api.dependencies import get_db
-from app.models import EngagementScore, DailyEngagementMetric
+from app.api.projections import SCORE_RESPONSE_COLUMNS, METRIC_RESPONSE_COLUMNS
+from app.core.cache import cached
+from app.core.clock import today
+from app.models import EngagementScore, DailyEngagementMetric, StudentEngagementAggregate
+from app.models.engagement import FixedPointScore
 from app.schemas import (
     EngagementScoreResponse,
     EngagementSummary,
@@ -18,6 +23,40 @@ from app.schemas import (
 router = APIRouter(prefix="/api/v1/engagement", tags=["Engagement Scores"])
 
 
+def _with_latest_score(db: Session, aggregates):
+    """
+    Join per-student aggregates (student_id, avg_score, days_tracked, last_date)
+    with the EngagementScore row recorded on last_date, in a single query.
+    """
+    latest = db.query(
+        EngagementScore.student_id,
+        EngagementScore.engagement_level,
+        EngagementScore.engagement_trend,
+        func.row_number().over(
+            partition_by=EngagementScore.student_id,
+            order_by=desc(EngagementScore.id)
+        ).label('rn')
+    ).join(
+        aggregates,
+        and_(
+            EngagementScore.student_id == aggregates.c.student_id,
+            EngagementScore.date == aggregates.c.last_date
+        )
+    ).subquery('latest_scores')
+    
+    return db.query(
+        aggregates.c.student_id,
+        aggregates.c.avg_score,
+        aggregates.c.days_tracked,
+        aggregates.c.last_date,
+        latest.c.engagement_level,
+        latest.c.engagement_trend
+    ).outerjoin(
+        latest,
+        and_(latest.c.student_id == aggregates.c.student_id, latest.c.rn == 1)
+    )
+
+
 @router.get("/students/{student_id}/latest", response_model=EngagementScoreResponse)
 def get_latest_engagement_score(
     student_id: str,
@@ -45,15 +84,17 @@ def get_engagement_history(
     """
     Get engagement score history for a student
     """
-    scores = db.query(EngagementScore).filter(
+    # Latest N days, returned in chronological order by the database
+    recent = db.query(*SCORE_RESPONSE_COLUMNS).filter(
         EngagementScore.student_id == student_id
-    ).order_by(desc(EngagementScore.date)).limit(days).all()
+    ).order_by(desc(EngagementScore.date)).limit(days).subquery()
+    scores = db.query(recent).order_by(recent.c.date).all()
     
     if not scores:
         raise HTTPException(status_code=404, detail=f"No engagement history found for student {student_id}")
     
-    # Return in chronological order
-    return list(reversed(scores))
+    # Rows already match EngagementScoreResponse; serialized directly by orjson
+    return ORJSONResponse([row._asdict() for row in scores])
 
 
 @router.get("/students/{student_id}/summary", response_model=EngagementSummary)
@@ -64,25 +105,28 @@ def get_engagement_summary(
     """
     Get engagement summary for a student
     """
-    # Get all scores for student
-    scores = db.query(EngagementScore).filter(
+    # Aggregate in the database and join the latest score row
+    aggregates = db.query(
+        EngagementScore.student_id,
+        func.avg(EngagementScore.engagement_score, type_=FixedPointScore).label('avg_score'),
+        func.count(EngagementScore.id).label('days_tracked'),
+        func.max(EngagementScore.date).label('last_date')
+    ).filter(
         EngagementScore.student_id == student_id
-    ).all()
+    ).group_by(EngagementScore.student_id).cte('student_aggregates')
     
-    if not scores:
-        raise HTTPException(status_code=404, detail=f"No engagement data found for student {student_id}")
+    summary = _with_latest_score(db, aggregates).first()
     
-    # Calculate summary
-    avg_score = sum(s.engagement_score for s in scores) / len(scores)
-    latest = max(scores, key=lambda s: s.date)
+    if not summary:
+        raise HTTPException(status_code=404, detail=f"No engagement data found for student {student_id}")
     
     return EngagementSummary(
         student_id=student_id,
-        days_tracked=len(scores),
-        avg_engagement_score=round(avg_score, 2),
-        current_engagement_level=latest.engagement_level,
-        trend=latest.engagement_trend,
-        last_updated=latest.date
+        days_tracked=summary.days_tracked,
+        avg_engagement_score=round(summary.avg_score, 2),
+        current_engagement_level=summary.engagement_level,
+        trend=summary.engagement_trend,
+        last_updated=summary.last_date
     )
 
 
@@ -118,17 +162,20 @@ def get_daily_metrics(
     """
     Get raw daily engagement metrics for a student
     """
-    metrics = db.query(DailyEngagementMetric).filter(
+    recent = db.query(*METRIC_RESPONSE_COLUMNS).filter(
         DailyEngagementMetric.student_id == student_id
-    ).order_by(desc(DailyEngagementMetric.date)).limit(days).all()
+    ).order_by(desc(DailyEngagementMetric.date)).limit(days).subquery()
+    metrics = db.query(recent).order_by(recent.c.date).all()
     
     if not metrics:
         raise HTTPException(status_code=404, detail=f"No daily metrics found for student {student_id}")
     
-    return list(reversed(metrics))
+    # Rows already match DailyMetricResponse; serialized directly by orjson
+    return ORJSONResponse([row._asdict() for row in metrics])
 
 
 @router.get("/leaderboard", response_model=List[EngagementSummary])
+@cached("leaderboard", ttl=300)
 def get_engagement_leaderboard(
     limit: int = Query(10, ge=1, le=100, description="Number of students to return"),
     db: Session = Depends(get_db)
@@ -136,35 +183,23 @@ def get_engagement_leaderboard(
     """
     Get top engaged students (leaderboard)
     """
-    # Get average engagement per student
-    subquery = db.query(
-        EngagementScore.student_id,
-        func.avg(EngagementScore.engagement_score).label('avg_score'),
-        func.count(EngagementScore.id).label('days_tracked'),
-        func.max(EngagementScore.date).label('last_date')
-    ).group_by(EngagementScore.student_id).subquery()
+    # Precomputed per-student averages, refreshed by the aggregation pipeline
+    agg = StudentEngagementAggregate.c
+    top_students = db.query(StudentEngagementAggregate).order_by(
+        desc(agg.avg_score), agg.student_id
+    ).limit(limit).all()
     
-    # Get top students
-    top_students = db.query(subquery).order_by(desc('avg_score')).limit(limit).all()
-    
-    # Build response
-    leaderboard = []
-    for student in top_students:
-        latest_score = db.query(EngagementScore).filter(
-            EngagementScore.student_id == student.student_id,
-            EngagementScore.date == student.last_date
-        ).first()
-        
-        leaderboard.append(EngagementSummary(
+    return [
+        EngagementSummary(
             student_id=student.student_id,
             days_tracked=student.days_tracked,
             avg_engagement_score=round(student.avg_score, 2),
-            current_engagement_level=latest_score.engagement_level if latest_score else "Medium",
-            trend=latest_score.engagement_trend if latest_score else None,
+            current_engagement_level=student.latest_level or "Medium",
+            trend=student.latest_trend,
             last_updated=student.last_date
-        ))
-    
-    return leaderboard
+        )
+        for student in top_students
+    ]
 
 
 @router.get("/low-engagement", response_model=List[EngagementSummary])
@@ -177,38 +212,31 @@ def get_low_engagement_students(
     Get students with consistently low engagement
     """
     # Get students with low average engagement in recent days
-    cutoff_date = date.today() - timedelta(days=days)
+    cutoff_date = today() - timedelta(days=days)
     
-    subquery = db.query(
+    aggregates = db.query(
         EngagementScore.student_id,
-        func.avg(EngagementScore.engagement_score).label('avg_score'),
+        func.avg(EngagementScore.engagement_score, type_=FixedPointScore).label('avg_score'),
         func.count(EngagementScore.id).label('days_tracked'),
         func.max(EngagementScore.date).label('last_date')
     ).filter(
         EngagementScore.date >= cutoff_date,
         EngagementScore.engagement_score < threshold
-    ).group_by(EngagementScore.student_id).subquery()
+    ).group_by(EngagementScore.student_id).cte('student_aggregates')
     
-    low_students = db.query(subquery).order_by('avg_score').all()
+    low_students = _with_latest_score(db, aggregates).order_by(aggregates.c.avg_score).all()
     
-    # Build response
-    result = []
-    for student in low_students:
-        latest_score = db.query(EngagementScore).filter(
-            EngagementScore.student_id == student.student_id,
-            EngagementScore.date == student.last_date
-        ).first()
-        
-        result.append(EngagementSummary(
+    return [
+        EngagementSummary(
             student_id=student.student_id,
             days_tracked=student.days_tracked,
             avg_engagement_score=round(student.avg_score, 2),
-            current_engagement_level=latest_score.engagement_level if latest_score else "Low",
-            trend=latest_score.engagement_trend if latest_score else None,
+            current_engagement_level=student.engagement_level or "Low",
+            trend=student.engagement_trend,
             last_updated=student.last_date
-        ))
-    
-    return result
+        )
+        for student in low_students
+    ]
 
 
 @router.get("/trends/declining", response_model=List[EngagementSummary])
@@ -219,46 +247,20 @@ def get_declining_students(
     """
     Get students with declining engagement trends
     """
-    # Get recent scores with declining trend
-    recent_declining = db.query(EngagementScore).filter(
-        EngagementScore.engagement_trend == 'Declining',
-        EngagementScore.date >= date.today() - timedelta(days=7)
-    ).all()
-    
-    # Group by student and count declining days
-    from collections import defaultdict
-    student_declining_days = defaultdict(int)
-    student_latest = {}
+    # Declining days over the last week, precomputed by the aggregation pipeline
+    agg = StudentEngagementAggregate.c
+    declining_students = db.query(StudentEngagementAggregate).filter(
+        agg.declining_days_7d > 0
+    ).order_by(desc(agg.declining_days_7d), agg.student_id).limit(limit).all()
     
-    for score in recent_declining:
-        student_declining_days[score.student_id] += 1
-        if score.student_id not in student_latest or score.date > student_latest[score.student_id].date:
-            student_latest[score.student_id] = score
-    
-    # Sort by number of declining days
-    sorted_students = sorted(
-        student_declining_days.items(),
-        key=lambda x: x[1],
-        reverse=True
-    )[:limit]
-    
-    result = []
-    for student_id, declining_days in sorted_students:
-        latest = student_latest[student_id]
-        
-        # Get average score
-        avg_score = db.query(func.avg(EngagementScore.engagement_score)).filter(
-            EngagementScore.student_id == student_id
-        ).scalar()
-        
-        result.append(EngagementSummary(
-            student_id=student_id,
-            days_tracked=declining_days,
-            avg_engagement_score=round(avg_score, 2),
-            current_engagement_level=latest.engagement_level,
+    return [
+        EngagementSummary(
+            student_id=student.student_id,
+            days_tracked=student.declining_days_7d,
+            avg_engagement_score=round(student.avg_score, 2),
+            current_engagement_level=student.latest_declining_level,
             trend="Declining",
-            last_updated=latest.date
-        ))
-    
-    return result
-
+            last_updated=student.last_declining_date_7d
+        )
+        for student in declining_students
+    ]
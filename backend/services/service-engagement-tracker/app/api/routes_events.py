@@ -3,16 +3,28 @@ Event Ingestion API Routes
 For receiving activity events from Moodle or other sources
 """
 from fastapi import APIRouter, Depends, HTTPException, Header, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import and_, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from psycopg.types.json import Jsonb
+from collections import Counter
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-import uuid
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_async_db
+from app.core.database import json_serializer
 from app.models import StudentActivityEvent
+from app.models.engagement import PROMOTED_EVENT_DATA_KEYS
 from app.schemas import EventCreate
 from app.services.aggregation_service import run_pipeline
+from app.services.student_service import resolve_student_pk, resolve_student_pks
 from app.core.logging import get_logger
+from app.core.cache import (
+    EVENTS_COUNTER, PREDICTIONS_GENERATION, aincr_counter, bump_generation, cached, incr_counter,
+    invalidate, ainvalidate,
+)
+from app.core.clock import today as cached_today
 
 logger = get_logger(__name__)
 
@@ -20,12 +32,65 @@ router = APIRouter(prefix="/api/v1/events", tags=["Event Ingestion"])
 
 FALLBACK_INSTITUTE = "LMS_INST_A"
 
+# Batches larger than this are streamed with COPY instead of INSERT
+COPY_THRESHOLD = 1000
+COPY_COLUMNS = (
+    "student_id", "student_pk", "institute_id", "event_type", "event_timestamp", "session_id",
+    "duration_seconds", "resource_id", "score", "page_path",
+    "event_data", "source_service", "created_at",
+)
+
 
 def _resolve_institute(header_value: Optional[str], body_value: Optional[str]) -> str:
     """Header wins over body field; both fall back to default."""
     return (header_value or body_value or FALLBACK_INSTITUTE).strip()
 
 
+# Largest value an INTEGER column holds
+INT32_MAX = 2**31 - 1
+
+
+def _fits_column(column, value: Any) -> bool:
+    """True when value can be stored in column exactly as sent, without casting."""
+    python_type = column.type.python_type
+    if isinstance(value, bool):
+        # bool is an int subclass, but True is not a duration or a score
+        return False
+    if python_type is int:
+        return isinstance(value, int) and -INT32_MAX - 1 <= value <= INT32_MAX
+    if python_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, str) and len(value) <= column.type.length
+
+
+def _split_event_data(event_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Move promoted payload keys into their typed columns; the rest stays in event_data."""
+    fields: Dict[str, Any] = {column.key: None for column in PROMOTED_EVENT_DATA_KEYS}
+    overflow = dict(event_data or {})
+    for column in PROMOTED_EVENT_DATA_KEYS:
+        value = overflow.get(column.key)
+        if value is None or not _fits_column(column, value):
+            continue
+        fields[column.key] = value
+        del overflow[column.key]
+    fields["event_data"] = overflow
+    return fields
+
+
+async def _copy_events(db: AsyncSession, rows: List[dict]) -> None:
+    """Stream event rows into student_activity_events using PostgreSQL COPY."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    statement = f"COPY {StudentActivityEvent.__tablename__} ({', '.join(COPY_COLUMNS)}) FROM STDIN"
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(statement) as copy:
+            for row in rows:
+                await copy.write_row([
+                    Jsonb(row[column], dumps=json_serializer) if column == "event_data" else row[column]
+                    for column in COPY_COLUMNS
+                ])
+
+
 @router.post("/ingest", status_code=status.HTTP_201_CREATED)
 def ingest_event(
     event: EventCreate,
@@ -42,25 +107,30 @@ def ingest_event(
     institute_id = _resolve_institute(x_institute_id, event.institute_id)
     try:
         db_event = StudentActivityEvent(
-            event_id=uuid.uuid4(),
             student_id=event.student_id,
+            student_pk=resolve_student_pk(db, event.student_id),
             institute_id=institute_id,
             event_type=event.event_type.value,
             event_timestamp=event.event_timestamp,
             session_id=event.session_id,
-            event_data=event.event_data or {},
             source_service=event.source_service,
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            **_split_event_data(event.event_data),
         )
         
         db.add(db_event)
+        db.flush()
+        # Read the key returned by INSERT ... RETURNING before commit expires the row
+        event_id = db_event.event_id
         db.commit()
-        db.refresh(db_event)
+        invalidate("events:statistics")
+        incr_counter(EVENTS_COUNTER, 1, institute_id=institute_id)
 
         # Run aggregation pipeline for this student on the event's date
         event_date = event.event_timestamp.date()
         try:
             pipeline_result = run_pipeline(db, event.student_id, event_date, institute_id=institute_id)
+            bump_generation(PREDICTIONS_GENERATION)
             logger.info(f"✅ Aggregation successful for {event.student_id} on {event_date}: score={pipeline_result.get('engagement_score', 'N/A')}")
         except Exception as e:
             # Log the error but don't fail the event ingestion
@@ -69,7 +139,7 @@ def ingest_event(
         
         return {
             "status": "success",
-            "event_id": str(db_event.event_id),
+            "event_id": str(event_id),
             "institute_id": institute_id,
             "message": "Event ingested and aggregated",
             "aggregation": pipeline_result,
@@ -84,9 +154,9 @@ def ingest_event(
 
 
 @router.post("/ingest/batch", status_code=status.HTTP_201_CREATED)
-def ingest_events_batch(
+async def ingest_events_batch(
     events: List[EventCreate],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     x_institute_id: Optional[str] = Header(None, alias="X-Institute-ID"),
 ):
     """
@@ -94,24 +164,33 @@ def ingest_events_batch(
     X-Institute-ID header applies to all events in the batch.
     """
     try:
-        db_events = []
-        for event in events:
-            institute_id = _resolve_institute(x_institute_id, event.institute_id)
-            db_event = StudentActivityEvent(
-                event_id=uuid.uuid4(),
-                student_id=event.student_id,
-                institute_id=institute_id,
-                event_type=event.event_type.value,
-                event_timestamp=event.event_timestamp,
-                session_id=event.session_id,
-                event_data=event.event_data or {},
-                source_service=event.source_service,
-                created_at=datetime.now()
-            )
-            db_events.append(db_event)
+        # Plain mappings (ORM bulk INSERT) skip instance construction; event_id is
+        # generated by the database (gen_random_uuid()).
+        created_at = datetime.now()
+        student_pks = await db.run_sync(resolve_student_pks, [event.student_id for event in events])
+        rows = [
+            {
+                "student_id": event.student_id,
+                "student_pk": student_pks[event.student_id],
+                "institute_id": _resolve_institute(x_institute_id, event.institute_id),
+                "event_type": event.event_type.value,
+                "event_timestamp": event.event_timestamp,
+                "session_id": event.session_id,
+                "source_service": event.source_service,
+                "created_at": created_at,
+                **_split_event_data(event.event_data),
+            }
+            for event in events
+        ]
         
-        db.bulk_save_objects(db_events)
-        db.commit()
+        if len(rows) > COPY_THRESHOLD:
+            await _copy_events(db, rows)
+        else:
+            await db.execute(insert(StudentActivityEvent), rows)
+        await db.commit()
+        await ainvalidate("events:statistics")
+        for institute_id, count in Counter(row["institute_id"] for row in rows).items():
+            await aincr_counter(EVENTS_COUNTER, count, institute_id=institute_id)
         
         return {
             "status": "success",
@@ -120,7 +199,7 @@ def ingest_events_batch(
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error ingesting events: {str(e)}"
@@ -128,74 +207,90 @@ def ingest_events_batch(
 
 
 @router.get("/students/{student_id}/recent")
-def get_recent_events(
+async def get_recent_events(
     student_id: str,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Get recent activity events for a student
+    Get recent activity events for a student (empty list when none exist)
     """
-    events = db.query(StudentActivityEvent).filter(
-        StudentActivityEvent.student_id == student_id
-    ).order_by(StudentActivityEvent.event_timestamp.desc()).limit(limit).all()
-    
-    if not events:
-        raise HTTPException(status_code=404, detail=f"No events found for student {student_id}")
+    result = await db.execute(
+        select(StudentActivityEvent).where(
+            StudentActivityEvent.student_id == student_id
+        ).order_by(StudentActivityEvent.event_timestamp.desc()).limit(limit)
+    )
+    events = result.scalars().all()
     
-    return {
+    # orjson encodes UUID/datetime natively; skip jsonable_encoder
+    return ORJSONResponse({
         "student_id": student_id,
         "event_count": len(events),
         "events": [
             {
-                "event_id": str(e.event_id),
+                "event_id": e.event_id,
                 "event_type": e.event_type,
-                "event_timestamp": e.event_timestamp.isoformat(),
+                "event_timestamp": e.event_timestamp,
                 "session_id": e.session_id,
+                "duration_seconds": e.duration_seconds,
+                "resource_id": e.resource_id,
+                "score": e.score,
+                "page_path": e.page_path,
                 "event_data": e.event_data,
                 "source_service": e.source_service
             }
             for e in events
         ]
-    }
+    })
 
 
 @router.get("/statistics")
-def get_event_statistics(db: Session = Depends(get_db)):
+@cached("events:statistics", ttl=60)
+async def get_event_statistics(db: AsyncSession = Depends(get_async_db)):
     """
     Get statistics about ingested events
     """
     from sqlalchemy import func
-    from datetime import date, timedelta
-    
-    total_events = db.query(func.count(StudentActivityEvent.event_id)).scalar()
+    from datetime import date, time, timedelta
     
-    # Events by type
-    events_by_type = db.query(
-        StudentActivityEvent.event_type,
-        func.count(StudentActivityEvent.event_id).label('count')
-    ).group_by(StudentActivityEvent.event_type).all()
+    # Day boundaries as timestamps so the predicates stay sargable on event_timestamp
+    today = cached_today()
+    today_start = datetime.combine(today, time.min)
+    tomorrow_start = datetime.combine(today + timedelta(days=1), time.min)
+    last_week_start = datetime.combine(today - timedelta(days=7), time.min)
+    event_timestamp = StudentActivityEvent.event_timestamp
     
-    # Events today
-    today = date.today()
-    events_today = db.query(func.count(StudentActivityEvent.event_id)).filter(
-        func.date(StudentActivityEvent.event_timestamp) == today
-    ).scalar()
+    # Totals and unique students
+    totals = (await db.execute(
+        select(
+            func.count(StudentActivityEvent.event_id).label('total_events'),
+            func.count(func.distinct(StudentActivityEvent.student_id)).label('unique_students'),
+        )
+    )).one()
     
-    # Events last 7 days
-    last_week = today - timedelta(days=7)
-    events_last_week = db.query(func.count(StudentActivityEvent.event_id)).filter(
-        func.date(StudentActivityEvent.event_timestamp) >= last_week
-    ).scalar()
+    # Today / last 7 days from an index range scan on event_timestamp
+    recent = (await db.execute(
+        select(
+            func.count(StudentActivityEvent.event_id).filter(
+                and_(event_timestamp >= today_start, event_timestamp < tomorrow_start)
+            ).label('events_today'),
+            func.count(StudentActivityEvent.event_id).label('events_last_week'),
+        ).where(event_timestamp >= last_week_start)
+    )).one()
     
-    # Unique students
-    unique_students = db.query(func.count(func.distinct(StudentActivityEvent.student_id))).scalar()
+    # Events by type
+    events_by_type = (await db.execute(
+        select(
+            StudentActivityEvent.event_type,
+            func.count(StudentActivityEvent.event_id).label('count')
+        ).group_by(StudentActivityEvent.event_type)
+    )).all()
     
     return {
-        "total_events": total_events,
-        "events_today": events_today,
-        "events_last_7_days": events_last_week,
-        "unique_students": unique_students,
+        "total_events": totals.total_events,
+        "events_today": recent.events_today,
+        "events_last_7_days": recent.events_last_week,
+        "unique_students": totals.unique_students,
         "events_by_type": {
             event_type: count for event_type, count in events_by_type
         }
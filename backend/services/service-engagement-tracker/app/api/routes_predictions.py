@@ -3,24 +3,60 @@ Disengagement Prediction API Routes.
 All endpoints are scoped by institute_id.
 """
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, undefer_group
+from sqlalchemy import func, desc, tuple_, case, and_, cast, column, distinct, literal, Text
+from sqlalchemy.dialects.postgresql import JSONB, JSONPATH
 from typing import List, Optional
 from datetime import date, datetime, timedelta
+import json
 
 from app.api.dependencies import get_db
+from app.api.projections import PREDICTION_RESPONSE_COLUMNS
+from app.core.cache import PREDICTIONS_GENERATION, cached, cached_by_generation
+from app.core.clock import today
 from app.models import DisengagementPrediction, EngagementScore
 from app.schemas import (
     DisengagementPredictionResponse,
     AtRiskStudent,
     BatchPredictionRequest,
-    BatchPredictionResponse
+    BatchPredictionResponse,
+    RiskLevel
 )
 
 FALLBACK_INSTITUTE = "LMS_INST_A"
 
 router = APIRouter(prefix="/api/v1/predictions", tags=["Disengagement Predictions"])
 
+# JSON values Python treats as falsy; anything else marks the factor as present
+FALSY_FACTOR_VALUES = ['false', '0', '""', 'null', '[]', '{}']
+
+
+def _truthy_factors(db: Session, *criteria):
+    """
+    Per-student distinct factor names whose contributing_factors value is truthy,
+    unnested with jsonb_each and aggregated in Postgres.
+    """
+    factor = func.jsonb_each(DisengagementPrediction.contributing_factors).table_valued(
+        column('key', Text), column('value', JSONB), joins_implicitly=True
+    )
+    return db.query(
+        DisengagementPrediction.student_id,
+        func.array_agg(distinct(factor.c.key)).label('factors'),
+    ).select_from(DisengagementPrediction, factor).filter(
+        *criteria,
+        factor.c.value.not_in([cast(literal(v, Text), JSONB) for v in FALSY_FACTOR_VALUES]),
+    ).group_by(DisengagementPrediction.student_id).subquery('truthy_factors')
+
+
+def _factor_flagged(name: str):
+    """
+    contributing_factors has `name` set to true, as a jsonpath predicate (@@) so
+    ix_predictions_factors_gin can answer it instead of a per-row ->> comparison.
+    """
+    path = f"$.{json.dumps(name)} == true"
+    return DisengagementPrediction.contributing_factors.op('@@')(literal(path, JSONPATH))
+
 
 @router.get("/students/{student_id}/latest", response_model=DisengagementPredictionResponse)
 def get_latest_prediction(
@@ -28,7 +64,7 @@ def get_latest_prediction(
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
     db: Session = Depends(get_db)
 ):
-    prediction = db.query(DisengagementPrediction).filter(
+    prediction = db.query(DisengagementPrediction).options(undefer_group('explain')).filter(
         DisengagementPrediction.student_id == student_id,
         DisengagementPrediction.institute_id == institute_id,
     ).order_by(desc(DisengagementPrediction.prediction_date)).first()
@@ -46,37 +82,65 @@ def get_prediction_history(
     days: int = Query(30, ge=1, le=365, description="Number of days to retrieve"),
     db: Session = Depends(get_db)
 ):
-    predictions = db.query(DisengagementPrediction).filter(
+    # Latest N predictions, returned in chronological order by the database
+    recent = db.query(*PREDICTION_RESPONSE_COLUMNS).filter(
         DisengagementPrediction.student_id == student_id,
         DisengagementPrediction.institute_id == institute_id,
-    ).order_by(desc(DisengagementPrediction.prediction_date)).limit(days).all()
+    ).order_by(desc(DisengagementPrediction.prediction_date)).limit(days).subquery()
+    predictions = db.query(recent).order_by(recent.c.prediction_date).all()
 
     if not predictions:
         raise HTTPException(status_code=404, detail=f"No prediction history found for student {student_id}")
 
-    return list(reversed(predictions))
+    # Rows already match DisengagementPredictionResponse; serialized directly by orjson
+    return ORJSONResponse([row._asdict() for row in predictions])
 
 
 @router.get("/at-risk", response_model=List[AtRiskStudent])
+@cached_by_generation("predictions:at-risk", PREDICTIONS_GENERATION)
 def get_at_risk_students(
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
-    risk_level: Optional[str] = Query(None, description="Filter by risk level (High/Medium/Low)"),
+    risk_level: Optional[RiskLevel] = Query(None, description="Filter by risk level (High/Medium/Low)"),
+    factor: Optional[str] = Query(None, description="Only predictions with this contributing factor flagged (e.g. low_login)"),
     limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db)
 ):
     """Get list of at-risk students for a given institute."""
-    query = db.query(DisengagementPrediction).filter(
+    recent_date = today() - timedelta(days=7)
+    criteria = [
         DisengagementPrediction.at_risk == True,
         DisengagementPrediction.institute_id == institute_id,
-    )
-
+        DisengagementPrediction.prediction_date >= recent_date,
+    ]
     if risk_level:
-        query = query.filter(DisengagementPrediction.risk_level == risk_level)
-
-    recent_date = date.today() - timedelta(days=7)
-    query = query.filter(DisengagementPrediction.prediction_date >= recent_date)
-
-    predictions = query.all()
+        criteria.append(DisengagementPrediction.risk_level == risk_level.value)
+    if factor:
+        criteria.append(_factor_flagged(factor))
+
+    # Only the columns used below; skips the JSON payloads entirely
+    predictions = db.query(
+        DisengagementPrediction.student_id,
+        DisengagementPrediction.risk_probability,
+        DisengagementPrediction.risk_level,
+        DisengagementPrediction.prediction_date,
+    ).filter(*criteria).all()
+
+    factors = _truthy_factors(db, *criteria)
+    factor_map = {row.student_id: row.factors for row in db.query(factors).all()}
+
+    # Fetch the matching engagement scores in one round-trip
+    keys = {(p.student_id, p.prediction_date) for p in predictions}
+    score_map = {}
+    if keys:
+        rows = db.query(
+            EngagementScore.student_id,
+            EngagementScore.date,
+            EngagementScore.engagement_score
+        ).filter(
+            EngagementScore.institute_id == institute_id,
+            tuple_(EngagementScore.student_id, EngagementScore.date).in_(keys)
+        ).all()
+        score_map = {(r.student_id, r.date): r.engagement_score for r in rows}
 
     from collections import defaultdict
     student_data = defaultdict(lambda: {
@@ -84,7 +148,6 @@ def get_at_risk_students(
         'engagement_scores': [],
         'dates': [],
         'high_risk_days': 0,
-        'factors': set()
     })
 
     for pred in predictions:
@@ -93,43 +156,82 @@ def get_at_risk_students(
         if pred.risk_level == 'High':
             student_data[pred.student_id]['high_risk_days'] += 1
 
-        if pred.contributing_factors:
-            for factor, value in pred.contributing_factors.items():
-                if value:
-                    student_data[pred.student_id]['factors'].add(factor)
-
-        eng_score = db.query(EngagementScore).filter(
-            EngagementScore.student_id == pred.student_id,
-            EngagementScore.institute_id == institute_id,
-            EngagementScore.date == pred.prediction_date
-        ).first()
+        eng_score = score_map.get((pred.student_id, pred.prediction_date))
 
-        if eng_score:
-            student_data[pred.student_id]['engagement_scores'].append(eng_score.engagement_score)
+        if eng_score is not None:
+            student_data[pred.student_id]['engagement_scores'].append(eng_score)
 
+    # Plain dicts shaped like AtRiskStudent, serialized directly by orjson
     result = []
     for student_id, data in student_data.items():
         if data['risk_probs']:
-            result.append(AtRiskStudent(
-                student_id=student_id,
-                avg_risk_probability=round(sum(data['risk_probs']) / len(data['risk_probs']), 3),
-                latest_engagement_score=round(data['engagement_scores'][-1], 2) if data['engagement_scores'] else 0.0,
-                days_at_high_risk=data['high_risk_days'],
-                last_prediction_date=max(data['dates']),
-                contributing_factors=list(data['factors'])
-            ))
+            result.append({
+                "student_id": student_id,
+                "avg_risk_probability": round(sum(data['risk_probs']) / len(data['risk_probs']), 3),
+                "latest_engagement_score": round(data['engagement_scores'][-1], 2) if data['engagement_scores'] else 0.0,
+                "days_at_high_risk": data['high_risk_days'],
+                "last_prediction_date": max(data['dates']),
+                "contributing_factors": factor_map.get(student_id, [])
+            })
 
-    result.sort(key=lambda x: x.avg_risk_probability, reverse=True)
-    return result[:limit]
+    result.sort(key=lambda x: x["avg_risk_probability"], reverse=True)
+    return ORJSONResponse(result[:limit])
 
 
 @router.get("/high-risk", response_model=List[AtRiskStudent])
+@cached_by_generation("predictions:high-risk", PREDICTIONS_GENERATION)
 def get_high_risk_students(
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
+    factor: Optional[str] = Query(None, description="Only predictions with this contributing factor flagged (e.g. low_login)"),
     limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db)
 ):
-    return get_at_risk_students(institute_id=institute_id, risk_level="High", limit=limit, db=db)
+    """High-risk students, aggregated and ranked in a single statement."""
+    recent_date = today() - timedelta(days=7)
+
+    criteria = [
+        DisengagementPrediction.at_risk == True,
+        DisengagementPrediction.institute_id == institute_id,
+        DisengagementPrediction.risk_level == 'High',
+        DisengagementPrediction.prediction_date >= recent_date,
+    ]
+    if factor:
+        criteria.append(_factor_flagged(factor))
+
+    high_risk = db.query(
+        DisengagementPrediction.student_id,
+        func.avg(DisengagementPrediction.risk_probability).label('avg_risk_probability'),
+        func.count(DisengagementPrediction.id).label('days_at_high_risk'),
+        func.max(DisengagementPrediction.prediction_date).label('last_prediction_date'),
+    ).filter(*criteria).group_by(DisengagementPrediction.student_id).order_by(
+        desc('avg_risk_probability')
+    ).limit(limit).subquery('high_risk')
+
+    factors = _truthy_factors(db, *criteria)
+
+    rows = db.query(high_risk, EngagementScore.engagement_score, factors.c.factors).outerjoin(
+        EngagementScore,
+        and_(
+            EngagementScore.student_id == high_risk.c.student_id,
+            EngagementScore.institute_id == institute_id,
+            EngagementScore.date == high_risk.c.last_prediction_date,
+        )
+    ).outerjoin(
+        factors, factors.c.student_id == high_risk.c.student_id
+    ).order_by(desc(high_risk.c.avg_risk_probability)).all()
+
+    result = []
+    for row in rows:
+        result.append({
+            "student_id": row.student_id,
+            "avg_risk_probability": round(row.avg_risk_probability, 3),
+            "latest_engagement_score": round(row.engagement_score, 2) if row.engagement_score is not None else 0.0,
+            "days_at_high_risk": row.days_at_high_risk,
+            "last_prediction_date": row.last_prediction_date,
+            "contributing_factors": row.factors or []
+        })
+
+    return ORJSONResponse(result)
 
 
 @router.get("/students/{student_id}/risk-trajectory")
@@ -139,9 +241,14 @@ def get_risk_trajectory(
     days: int = Query(14, ge=7, le=90),
     db: Session = Depends(get_db)
 ):
-    cutoff_date = date.today() - timedelta(days=days)
-
-    predictions = db.query(DisengagementPrediction).filter(
+    cutoff_date = today() - timedelta(days=days)
+
+    predictions = db.query(
+        DisengagementPrediction.prediction_date,
+        DisengagementPrediction.risk_probability,
+        DisengagementPrediction.risk_level,
+        DisengagementPrediction.at_risk,
+    ).filter(
         DisengagementPrediction.student_id == student_id,
         DisengagementPrediction.institute_id == institute_id,
         DisengagementPrediction.prediction_date >= cutoff_date
@@ -166,50 +273,54 @@ def get_risk_trajectory(
     else:
         trend = "insufficient_data"
 
-    return {
+    return ORJSONResponse({
         "student_id": student_id,
         "institute_id": institute_id,
         "days_analyzed": len(trajectory),
         "trend": trend,
         "current_risk": trajectory[-1] if trajectory else None,
         "trajectory": trajectory
-    }
+    })
 
 
 @router.get("/statistics")
+@cached("predictions:statistics", ttl=60)
 def get_prediction_statistics(
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
     db: Session = Depends(get_db)
 ):
-    recent_date = date.today() - timedelta(days=7)
-    recent_predictions = db.query(DisengagementPrediction).filter(
+    recent_date = today() - timedelta(days=7)
+    stats = db.query(
+        func.count(DisengagementPrediction.id).label('total'),
+        func.sum(case((DisengagementPrediction.at_risk, 1), else_=0)).label('at_risk_count'),
+        func.sum(case((DisengagementPrediction.risk_level == 'High', 1), else_=0)).label('high_risk'),
+        func.sum(case((DisengagementPrediction.risk_level == 'Medium', 1), else_=0)).label('medium_risk'),
+        func.sum(case((DisengagementPrediction.risk_level == 'Low', 1), else_=0)).label('low_risk'),
+        func.avg(DisengagementPrediction.risk_probability).label('avg_risk_prob'),
+        func.count(func.distinct(DisengagementPrediction.student_id)).label('unique_students'),
+        func.count(func.distinct(
+            case((DisengagementPrediction.at_risk, DisengagementPrediction.student_id))
+        )).label('unique_at_risk'),
+        func.max(DisengagementPrediction.prediction_date).label('latest_date'),
+    ).filter(
         DisengagementPrediction.prediction_date >= recent_date,
         DisengagementPrediction.institute_id == institute_id,
-    ).all()
+    ).one()
 
-    if not recent_predictions:
+    if not stats.total:
         raise HTTPException(status_code=404, detail="No recent predictions found")
 
-    total = len(recent_predictions)
-    at_risk_count = sum(1 for p in recent_predictions if p.at_risk)
-    high_risk = sum(1 for p in recent_predictions if p.risk_level == 'High')
-    medium_risk = sum(1 for p in recent_predictions if p.risk_level == 'Medium')
-    low_risk = sum(1 for p in recent_predictions if p.risk_level == 'Low')
-    avg_risk_prob = sum(p.risk_probability for p in recent_predictions) / total if total > 0 else 0
-    unique_students = len(set(p.student_id for p in recent_predictions))
-    unique_at_risk = len(set(p.student_id for p in recent_predictions if p.at_risk))
-
     return {
         "institute_id": institute_id,
-        "total_predictions": total,
-        "unique_students": unique_students,
-        "at_risk_predictions": at_risk_count,
-        "at_risk_students": unique_at_risk,
-        "at_risk_percentage": round((at_risk_count / total) * 100, 2) if total > 0 else 0,
-        "risk_levels": {"high": high_risk, "medium": medium_risk, "low": low_risk},
-        "average_risk_probability": round(avg_risk_prob, 3),
+        "total_predictions": stats.total,
+        "unique_students": stats.unique_students,
+        "at_risk_predictions": stats.at_risk_count,
+        "at_risk_students": stats.unique_at_risk,
+        "at_risk_percentage": round((stats.at_risk_count / stats.total) * 100, 2),
+        "risk_levels": {"high": stats.high_risk, "medium": stats.medium_risk, "low": stats.low_risk},
+        "average_risk_probability": round(stats.avg_risk_prob, 3),
         "analysis_period_days": 7,
-        "latest_prediction_date": max(p.prediction_date for p in recent_predictions).isoformat()
+        "latest_prediction_date": stats.latest_date.isoformat()
     }
 
 
@@ -221,33 +332,39 @@ def generate_predictions(
 ):
     start_time = datetime.now()
 
-    query = db.query(DisengagementPrediction).filter(
-        DisengagementPrediction.institute_id == institute_id
-    )
+    criteria = [DisengagementPrediction.institute_id == institute_id]
 
     if request.student_ids:
-        query = query.filter(DisengagementPrediction.student_id.in_(request.student_ids))
+        criteria.append(DisengagementPrediction.student_id.in_(request.student_ids))
 
     if request.prediction_date:
-        query = query.filter(DisengagementPrediction.prediction_date == request.prediction_date)
+        criteria.append(DisengagementPrediction.prediction_date == request.prediction_date)
     else:
         latest_date = db.query(func.max(DisengagementPrediction.prediction_date)).filter(
             DisengagementPrediction.institute_id == institute_id
         ).scalar()
         if latest_date:
-            query = query.filter(DisengagementPrediction.prediction_date == latest_date)
-
-    predictions = query.all()
-    high_risk = sum(1 for p in predictions if p.risk_level == 'High')
-    medium_risk = sum(1 for p in predictions if p.risk_level == 'Medium')
-    low_risk = sum(1 for p in predictions if p.risk_level == 'Low')
+            criteria.append(DisengagementPrediction.prediction_date == latest_date)
+
+    # Risk-level tallies in one scan with FILTER aggregates; only the rows
+    # returned in full are loaded
+    counts = db.query(
+        func.count().label('total'),
+        func.count().filter(DisengagementPrediction.risk_level == 'High').label('high'),
+        func.count().filter(DisengagementPrediction.risk_level == 'Medium').label('medium'),
+        func.count().filter(DisengagementPrediction.risk_level == 'Low').label('low'),
+    ).filter(*criteria).one()
+
+    predictions = db.query(DisengagementPrediction).options(undefer_group('explain')).filter(
+        *criteria
+    ).order_by(DisengagementPrediction.student_id).limit(100).all()
     processing_time = (datetime.now() - start_time).total_seconds()
 
     return BatchPredictionResponse(
-        total_predictions=len(predictions),
-        high_risk_count=high_risk,
-        medium_risk_count=medium_risk,
-        low_risk_count=low_risk,
+        total_predictions=counts.total,
+        high_risk_count=counts.high,
+        medium_risk_count=counts.medium,
+        low_risk_count=counts.low,
         processing_time_seconds=round(processing_time, 2),
-        predictions=predictions[:100]
+        predictions=predictions
     )
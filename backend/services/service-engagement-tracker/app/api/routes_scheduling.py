@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional
 from datetime import date
+from operator import itemgetter
 
 from app.api.dependencies import get_db
 from app.models import StudySchedule
@@ -19,6 +20,55 @@ from app.services.scheduling_service import SchedulingService
 
 router = APIRouter(prefix="/api/v1/schedules", tags=["Study Scheduling"])
 
+# Static feature descriptions returned by /features (shared, never mutated)
+FEATURE_EXPLANATIONS = {
+    "session_score": "Current session engagement score (0-100). Higher = can handle longer sessions.",
+    "engagement_volatility_7days": "Standard deviation of engagement scores over 7 days. Higher = more unpredictable, needs shorter sessions.",
+    "consecutive_low_days": "Number of consecutive days with engagement < 40. Higher = burnout risk, needs shorter sessions.",
+    "engagement_score_lag_1day": "Previous day's engagement score. Used to predict tomorrow's engagement.",
+    "rolling_avg_7days": "7-day moving average of engagement. Used for trend detection.",
+    "rolling_avg_30days": "30-day moving average. Used to detect temporary vs. long-term decline.",
+    "is_declining": "Whether engagement trend is declining. Triggers load reduction.",
+    "assignment_score": "Assignment completion score. Low + high login = avoidance behavior.",
+    "interaction_score": "Content interaction score. Low = needs more interactive tasks.",
+    "forum_score": "Forum participation score. Low = needs more social engagement."
+}
+
+# Reasoning messages for /summary, formatted with str.format per request
+SESSION_HIGH_VOLATILITY_MSG = (
+    "Short sessions ({minutes} min) due to high engagement volatility "
+    "({volatility:.1f}). Student needs frequent, manageable blocks."
+)
+SESSION_HIGH_SCORE_MSG = (
+    "Longer sessions ({minutes} min) because student has high session score "
+    "({session_score:.1f}) and can maintain focus."
+)
+SESSION_STANDARD_MSG = (
+    "Standard session length ({minutes} min) based on session score "
+    "({session_score:.1f})."
+)
+SESSIONS_PER_DAY_MSG = (
+    "{sessions} sessions per day to achieve {total_minutes} "
+    "minutes of daily study time."
+)
+LOAD_REDUCTION_MSG = (
+    "{reduction_pct}% load reduction applied due to declining engagement trend. "
+    "This prevents burnout while maintaining learning momentum."
+)
+NO_LOAD_REDUCTION_MSG = "No load reduction needed. Student engagement is stable or improving."
+LIGHT_DAYS_MSG = (
+    "{light_days} light day(s) predicted based on engagement patterns. "
+    "These days have reduced workload to prevent overload."
+)
+NO_LIGHT_DAYS_MSG = "No light days predicted. Student can handle full workload."
+FRONT_LOADED_TASKS_MSG = (
+    "Assignment prep scheduled early in week (Mon-Wed) to address avoidance behavior. "
+    "Student logs in but avoids assignments, so we front-load assignment work."
+)
+STANDARD_TASKS_MSG = "Standard task distribution across the week."
+
+_is_light_day = itemgetter('is_light_day')
+
 
 @router.post("/students/{student_id}/generate", response_model=StudyScheduleResponse)
 def generate_schedule(
@@ -120,63 +170,49 @@ def get_schedule_summary(
     
     # Extract reasoning from features
     features = schedule.features_used or {}
+    volatility = features.get('engagement_volatility_7days', 0)
+    session_score = features.get('session_score', 0)
+    minutes = schedule.session_length_minutes
     reasoning = {}
     
     # Session length reasoning
-    if features.get('engagement_volatility_7days', 0) > 20:
-        reasoning['session_length'] = (
-            f"Short sessions ({schedule.session_length_minutes} min) due to high engagement volatility "
-            f"({features.get('engagement_volatility_7days', 0):.1f}). Student needs frequent, manageable blocks."
-        )
-    elif features.get('session_score', 0) > 70:
-        reasoning['session_length'] = (
-            f"Longer sessions ({schedule.session_length_minutes} min) because student has high session score "
-            f"({features.get('session_score', 0):.1f}) and can maintain focus."
-        )
+    if volatility > 20:
+        reasoning['session_length'] = SESSION_HIGH_VOLATILITY_MSG.format(minutes=minutes, volatility=volatility)
+    elif session_score > 70:
+        reasoning['session_length'] = SESSION_HIGH_SCORE_MSG.format(minutes=minutes, session_score=session_score)
     else:
-        reasoning['session_length'] = (
-            f"Standard session length ({schedule.session_length_minutes} min) based on session score "
-            f"({features.get('session_score', 0):.1f})."
-        )
+        reasoning['session_length'] = SESSION_STANDARD_MSG.format(minutes=minutes, session_score=session_score)
     
     # Sessions per day reasoning
-    reasoning['sessions_per_day'] = (
-        f"{schedule.sessions_per_day} sessions per day to achieve {schedule.total_study_minutes_per_day} "
-        f"minutes of daily study time."
+    reasoning['sessions_per_day'] = SESSIONS_PER_DAY_MSG.format(
+        sessions=schedule.sessions_per_day,
+        total_minutes=schedule.total_study_minutes_per_day
     )
     
     # Load reduction reasoning
     if schedule.load_reduction_factor < 1.0:
         reduction_pct = int((1.0 - schedule.load_reduction_factor) * 100)
-        reasoning['load_reduction'] = (
-            f"{reduction_pct}% load reduction applied due to declining engagement trend. "
-            f"This prevents burnout while maintaining learning momentum."
-        )
+        reasoning['load_reduction'] = LOAD_REDUCTION_MSG.format(reduction_pct=reduction_pct)
     else:
-        reasoning['load_reduction'] = "No load reduction needed. Student engagement is stable or improving."
+        reasoning['load_reduction'] = NO_LOAD_REDUCTION_MSG
     
     # Light days reasoning
-    # daily_schedules is stored as JSONB, so it's already a list of dicts
+    # daily_schedules is stored as JSONB, so it's already a list of dicts;
+    # SchedulingService always writes 'is_light_day' on every day entry
     if isinstance(schedule.daily_schedules, list):
-        light_days = sum(1 for day in schedule.daily_schedules if day.get('is_light_day', False))
+        light_days = sum(map(_is_light_day, schedule.daily_schedules))
     else:
         light_days = 0
     if light_days > 0:
-        reasoning['light_days'] = (
-            f"{light_days} light day(s) predicted based on engagement patterns. "
-            f"These days have reduced workload to prevent overload."
-        )
+        reasoning['light_days'] = LIGHT_DAYS_MSG.format(light_days=light_days)
     else:
-        reasoning['light_days'] = "No light days predicted. Student can handle full workload."
+        reasoning['light_days'] = NO_LIGHT_DAYS_MSG
     
     # Course effort rebalancing reasoning
     if features.get('assignment_score', 0) < 40 and features.get('login_score', 0) > 50:
-        reasoning['task_distribution'] = (
-            "Assignment prep scheduled early in week (Mon-Wed) to address avoidance behavior. "
-            "Student logs in but avoids assignments, so we front-load assignment work."
-        )
+        reasoning['task_distribution'] = FRONT_LOADED_TASKS_MSG
     else:
-        reasoning['task_distribution'] = "Standard task distribution across the week."
+        reasoning['task_distribution'] = STANDARD_TASKS_MSG
     
     return ScheduleSummary(
         student_id=student_id,
@@ -231,18 +267,7 @@ def get_scheduling_features(
         return {
             "student_id": student_id,
             "features": features,
-            "explanations": {
-                "session_score": "Current session engagement score (0-100). Higher = can handle longer sessions.",
-                "engagement_volatility_7days": "Standard deviation of engagement scores over 7 days. Higher = more unpredictable, needs shorter sessions.",
-                "consecutive_low_days": "Number of consecutive days with engagement < 40. Higher = burnout risk, needs shorter sessions.",
-                "engagement_score_lag_1day": "Previous day's engagement score. Used to predict tomorrow's engagement.",
-                "rolling_avg_7days": "7-day moving average of engagement. Used for trend detection.",
-                "rolling_avg_30days": "30-day moving average. Used to detect temporary vs. long-term decline.",
-                "is_declining": "Whether engagement trend is declining. Triggers load reduction.",
-                "assignment_score": "Assignment completion score. Low + high login = avoidance behavior.",
-                "interaction_score": "Content interaction score. Low = needs more interactive tasks.",
-                "forum_score": "Forum participation score. Low = needs more social engagement."
-            }
+            "explanations": FEATURE_EXPLANATIONS
         }
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
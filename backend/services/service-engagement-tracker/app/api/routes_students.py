@@ -3,105 +3,276 @@ Student Analytics API Routes
 Comprehensive student analytics combining engagement scores and predictions.
 All endpoints are scoped by institute_id (passed as a query parameter).
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional
+import asyncio
+import hashlib
+import operator
+import orjson
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, literal, select, tuple_
+from typing import Awaitable, Callable, List, Optional
 from datetime import date, timedelta
 
-from app.api.dependencies import get_db
-from app.models import EngagementScore, DisengagementPrediction, DailyEngagementMetric
-from app.schemas import StudentAnalytics, EngagementSummary, EngagementScoreResponse, DisengagementPredictionResponse
+from app.api.dependencies import get_async_db
+from app.api.projections import SCORE_RESPONSE_COLUMNS, PREDICTION_RESPONSE_COLUMNS
+from app.core.cache import cache_key, get_async_redis
+from app.core.clock import today
+from app.core.database import AsyncSessionLocal
+from app.core.logging import get_logger
+from app.models import EngagementScore, DisengagementPrediction, DailyEngagementMetric, StudentLatestMetrics
+from app.models.engagement import FixedPointScore
+from app.schemas import EngagementLevel, RiskLevel, StudentAnalytics
 from app.services.aggregation_service import generate_prediction
 
 router = APIRouter(prefix="/api/v1/students", tags=["Student Analytics"])
+logger = get_logger(__name__)
 
 FALLBACK_INSTITUTE = "LMS_INST_A"
 
+# Per-student responses are cached until the student's data changes (the
+# version is part of the key), so the TTL only bounds abandoned entries
+STUDENT_RESPONSE_TTL_SECONDS = 86400
+
+
+async def _student_data_version(db: AsyncSession, student_id: str, institute_id: str) -> Optional[str]:
+    """
+    Fingerprint of a student's scores and predictions; None when there are no scores.
+    The pipeline upserts rows and stamps created_at on every write, so any new or
+    recomputed score/prediction moves the fingerprint.
+    """
+    score_ts, prediction_ts = (await db.execute(
+        select(
+            select(func.max(EngagementScore.created_at)).where(
+                EngagementScore.student_id == student_id,
+                EngagementScore.institute_id == institute_id
+            ).scalar_subquery(),
+            select(func.max(DisengagementPrediction.created_at)).where(
+                DisengagementPrediction.student_id == student_id,
+                DisengagementPrediction.institute_id == institute_id
+            ).scalar_subquery()
+        )
+    )).one()
+    if score_ts is None:
+        return None
+    return f"{score_ts.timestamp()}/{prediction_ts.timestamp() if prediction_ts else 0}"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def _versioned_student_response(
+    request: Request,
+    db: AsyncSession,
+    namespace: str,
+    student_id: str,
+    institute_id: str,
+    params: dict,
+    build: Callable[[], Awaitable[dict]]
+) -> Response:
+    """
+    Serve a per-student payload with an ETag derived from the data version.
+    Returns 304 when the client already has it, then tries Redis, then builds it.
+    """
+    version = await _student_data_version(db, student_id, institute_id)
+    if version is None:
+        # No data: let the builder raise its 404
+        return await build()
+
+    key = cache_key(
+        namespace, student_id=student_id, institute_id=institute_id,
+        version=version, today=today(), **params
+    )
+    etag = f'"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+    headers = {"ETag": etag}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    client = get_async_redis()
+    if client is not None:
+        try:
+            hit = await client.get(key)
+            if hit is not None:
+                return Response(content=hit, media_type="application/json", headers=headers)
+        except redis.RedisError as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+
+    # generate_prediction can hand back numpy floats
+    body = orjson.dumps(await build(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+    if client is not None:
+        try:
+            await client.set(key, body, ex=STUDENT_RESPONSE_TTL_SECONDS)
+        except redis.RedisError as e:
+            logger.warning(f"Cache write failed for {key}: {e}")
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get("/{student_id}/analytics", response_model=StudentAnalytics)
-def get_student_analytics(
+async def get_student_analytics(
+    request: Request,
     student_id: str,
     days: int = Query(30, ge=1, le=365),
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
-    db: Session = Depends(get_db)
+    include_history: bool = Query(False, description="Include the full engagement and risk history"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    cutoff_date = date.today() - timedelta(days=days)
+    return await _versioned_student_response(
+        request, db, "students:analytics", student_id, institute_id,
+        params={"days": days, "include_history": include_history},
+        build=lambda: _build_student_analytics(db, student_id, days, institute_id, include_history)
+    )
 
-    engagement_scores = db.query(EngagementScore).filter(
+
+async def _build_student_analytics(
+    db: AsyncSession,
+    student_id: str,
+    days: int,
+    institute_id: str,
+    include_history: bool
+) -> dict:
+    """StudentAnalytics as plain dicts; the history lists go to orjson without per-row validation."""
+    cutoff_date = today() - timedelta(days=days)
+    score_filter = (
         EngagementScore.student_id == student_id,
         EngagementScore.institute_id == institute_id,
         EngagementScore.date >= cutoff_date
-    ).order_by(EngagementScore.date).all()
-
-    if not engagement_scores:
-        raise HTTPException(status_code=404, detail=f"No data found for student {student_id}")
-
-    avg_score = sum(s.engagement_score for s in engagement_scores) / len(engagement_scores)
-    latest_score = max(engagement_scores, key=lambda s: s.date)
-
-    engagement_summary = EngagementSummary(
-        student_id=student_id,
-        days_tracked=len(engagement_scores),
-        avg_engagement_score=round(avg_score, 2),
-        current_engagement_level=latest_score.engagement_level,
-        trend=latest_score.engagement_trend,
-        last_updated=latest_score.date
     )
-
-    predictions = db.query(DisengagementPrediction).filter(
+    prediction_filter = (
         DisengagementPrediction.student_id == student_id,
         DisengagementPrediction.institute_id == institute_id,
         DisengagementPrediction.prediction_date >= cutoff_date
-    ).order_by(DisengagementPrediction.prediction_date).all()
+    )
 
-    latest_prediction = max(predictions, key=lambda p: p.prediction_date) if predictions else None
+    # Reduce the window in SQL; only the summary row crosses the wire.
+    # date - date is an integer day count in Postgres, so the slope is points/day.
+    avg_score, score_std, trend_slope, days_tracked, min_date, max_date = (await db.execute(
+        select(
+            func.avg(EngagementScore.engagement_score, type_=FixedPointScore),
+            func.stddev_pop(EngagementScore.engagement_score, type_=FixedPointScore),
+            func.regr_slope(EngagementScore.engagement_score, EngagementScore.date - cutoff_date, type_=FixedPointScore),
+            func.count(),
+            func.min(EngagementScore.date),
+            func.max(EngagementScore.date)
+        ).where(*score_filter)
+    )).one()
+
+    if not days_tracked:
+        raise HTTPException(status_code=404, detail=f"No data found for student {student_id}")
 
-    min_date = min(s.date for s in engagement_scores)
-    max_date = max(s.date for s in engagement_scores)
+    latest_score = (await db.execute(
+        select(*SCORE_RESPONSE_COLUMNS).where(*score_filter)
+        .order_by(desc(EngagementScore.date)).limit(1)
+    )).first()
 
-    return StudentAnalytics(
-        student_id=student_id,
-        date_range={"start": min_date, "end": max_date},
-        engagement_summary=engagement_summary,
-        latest_score=latest_score,
-        latest_prediction=latest_prediction,
-        engagement_history=engagement_scores,
-        risk_history=predictions
-    )
+    engagement_summary = {
+        "student_id": student_id,
+        "days_tracked": days_tracked,
+        "avg_engagement_score": round(avg_score, 2),
+        "current_engagement_level": latest_score.engagement_level,
+        "trend": latest_score.engagement_trend,
+        "last_updated": latest_score.date,
+    }
+
+    latest_prediction = (await db.execute(
+        select(*PREDICTION_RESPONSE_COLUMNS).where(*prediction_filter)
+        .order_by(desc(DisengagementPrediction.prediction_date)).limit(1)
+    )).mappings().first()
+
+    engagement_history = []
+    risk_history = []
+    if include_history:
+        engagement_history = (await db.execute(
+            select(*SCORE_RESPONSE_COLUMNS).where(*score_filter).order_by(EngagementScore.date)
+        )).mappings().all()
+        risk_history = (await db.execute(
+            select(*PREDICTION_RESPONSE_COLUMNS).where(*prediction_filter)
+            .order_by(DisengagementPrediction.prediction_date)
+        )).mappings().all()
+
+    return {
+        "student_id": student_id,
+        "date_range": {"start": min_date, "end": max_date},
+        "engagement_summary": engagement_summary,
+        "latest_score": dict(latest_score._mapping),
+        "latest_prediction": dict(latest_prediction) if latest_prediction else None,
+        "engagement_history": [dict(row) for row in engagement_history],
+        "risk_history": [dict(row) for row in risk_history],
+        "score_std": round(score_std, 2) if score_std is not None else None,
+        # NULL below two points
+        "trend_slope": round(trend_slope, 3) if trend_slope is not None else None,
+    }
 
 
 @router.get("/{student_id}/dashboard")
-def get_student_dashboard(
+async def get_student_dashboard(
+    request: Request,
     student_id: str,
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    latest_score = db.query(EngagementScore).filter(
-        EngagementScore.student_id == student_id,
-        EngagementScore.institute_id == institute_id,
-    ).order_by(desc(EngagementScore.date)).first()
+    return await _versioned_student_response(
+        request, db, "students:dashboard", student_id, institute_id,
+        params={},
+        build=lambda: _build_student_dashboard(db, student_id, institute_id)
+    )
+
+
+async def _build_student_dashboard(db: AsyncSession, student_id: str, institute_id: str) -> dict:
+    latest_score = (await db.execute(
+        select(
+            EngagementScore.date,
+            EngagementScore.engagement_score,
+            EngagementScore.engagement_level,
+            EngagementScore.engagement_trend,
+            EngagementScore.login_score,
+            EngagementScore.session_score,
+            EngagementScore.interaction_score,
+            EngagementScore.forum_score,
+            EngagementScore.assignment_score,
+        ).where(
+            EngagementScore.student_id == student_id,
+            EngagementScore.institute_id == institute_id,
+        ).order_by(desc(EngagementScore.date)).limit(1)
+    )).first()
 
     if not latest_score:
         raise HTTPException(status_code=404, detail=f"No data found for student {student_id}")
 
-    latest_prediction = db.query(DisengagementPrediction).filter(
-        DisengagementPrediction.student_id == student_id,
-        DisengagementPrediction.institute_id == institute_id,
-    ).order_by(desc(DisengagementPrediction.prediction_date)).first()
+    latest_prediction = (await db.execute(
+        select(
+            DisengagementPrediction.at_risk,
+            DisengagementPrediction.risk_level,
+            DisengagementPrediction.risk_probability,
+        ).where(
+            DisengagementPrediction.student_id == student_id,
+            DisengagementPrediction.institute_id == institute_id,
+        ).order_by(desc(DisengagementPrediction.prediction_date)).limit(1)
+    )).first()
 
     # Ensure we always have a fresh, non-degenerate prediction for the dashboard.
     # If missing or equal to 0.0 (while we have engagement data), recompute using the current ML/rule logic.
     if latest_prediction is None or latest_prediction.risk_probability == 0.0:
-        latest_prediction = generate_prediction(db, student_id, institute_id=institute_id)
+        latest_prediction = await db.run_sync(
+            generate_prediction, student_id, institute_id=institute_id
+        )
 
     seven_days_ago = latest_score.date - timedelta(days=7)
-    recent_scores = db.query(EngagementScore).filter(
-        EngagementScore.student_id == student_id,
-        EngagementScore.institute_id == institute_id,
-        EngagementScore.date >= seven_days_ago,
-        EngagementScore.date <= latest_score.date
-    ).order_by(EngagementScore.date).all()
+    recent_scores = (await db.execute(
+        select(EngagementScore.engagement_score).where(
+            EngagementScore.student_id == student_id,
+            EngagementScore.institute_id == institute_id,
+            EngagementScore.date >= seven_days_ago,
+            EngagementScore.date <= latest_score.date
+        ).order_by(EngagementScore.date)
+    )).all()
 
     if len(recent_scores) >= 2:
         first_score = recent_scores[0].engagement_score
@@ -139,163 +310,283 @@ def get_student_dashboard(
     }
 
 
+# Alert payloads are fixed; built once and shared (never mutated)
+HIGH_RISK_ALERT = {
+    "severity": "high",
+    "message": "Student is at HIGH risk of disengagement",
+    "action": "Immediate intervention recommended"
+}
+LOW_ENGAGEMENT_ALERT = {
+    "severity": "warning",
+    "message": "Low engagement detected",
+    "action": "Monitor student progress closely"
+}
+DECLINING_TREND_ALERT = {
+    "severity": "warning",
+    "message": "Engagement trend is declining",
+    "action": "Consider proactive outreach"
+}
+LOW_SESSION_ALERT = {
+    "severity": "info",
+    "message": "Low session activity detected",
+    "action": "Encourage more time on platform"
+}
+LOW_FORUM_ALERT = {
+    "severity": "info",
+    "message": "Limited forum participation",
+    "action": "Encourage peer interaction"
+}
+HEALTHY_ALERTS = ({
+    "severity": "success",
+    "message": "Student engagement is healthy",
+    "action": "Continue monitoring"
+},)
+
+
+# Score-based alert rules, checked in order: (score field, comparison, threshold, alert)
+SCORE_ALERT_RULES = (
+    ("engagement_score", operator.lt, 40, LOW_ENGAGEMENT_ALERT),
+    ("engagement_trend", operator.eq, "Declining", DECLINING_TREND_ALERT),
+    ("session_score", operator.lt, 30, LOW_SESSION_ALERT),
+    ("forum_score", operator.lt, 20, LOW_FORUM_ALERT),
+)
+
+
 def generate_alerts(score: EngagementScore, prediction: Optional[DisengagementPrediction]) -> List[dict]:
     alerts = []
 
     if prediction and prediction.risk_level == "High":
-        alerts.append({
-            "severity": "high",
-            "message": "Student is at HIGH risk of disengagement",
-            "action": "Immediate intervention recommended"
-        })
-
-    if score.engagement_score < 40:
-        alerts.append({
-            "severity": "warning",
-            "message": "Low engagement detected",
-            "action": "Monitor student progress closely"
-        })
+        alerts.append(HIGH_RISK_ALERT)
 
-    if score.engagement_trend == "Declining":
-        alerts.append({
-            "severity": "warning",
-            "message": "Engagement trend is declining",
-            "action": "Consider proactive outreach"
-        })
-
-    if score.session_score < 30:
-        alerts.append({
-            "severity": "info",
-            "message": "Low session activity detected",
-            "action": "Encourage more time on platform"
-        })
-
-    if score.forum_score < 20:
-        alerts.append({
-            "severity": "info",
-            "message": "Limited forum participation",
-            "action": "Encourage peer interaction"
-        })
+    for field, compare, threshold, alert in SCORE_ALERT_RULES:
+        if compare(getattr(score, field), threshold):
+            alerts.append(alert)
 
     if not alerts:
-        alerts.append({
-            "severity": "success",
-            "message": "Student engagement is healthy",
-            "action": "Continue monitoring"
-        })
+        alerts.extend(HEALTHY_ALERTS)
 
     return alerts
 
 
-@router.get("/list")
-def list_students(
-    institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier — only this institute's students are returned"),
-    engagement_level: Optional[str] = Query(None, description="Filter by engagement level"),
-    risk_level: Optional[str] = Query(None, description="Filter by risk level"),
-    limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
-):
-    """
-    List all students for a given institute with their latest engagement data.
-    Each institute sees only its own students.
-    """
-    subquery = db.query(
-        EngagementScore.student_id,
-        func.max(EngagementScore.date).label('latest_date')
-    ).filter(
-        EngagementScore.institute_id == institute_id
-    ).group_by(EngagementScore.student_id).subquery()
-
-    query = db.query(EngagementScore).join(
-        subquery,
-        (EngagementScore.student_id == subquery.c.student_id) &
-        (EngagementScore.date == subquery.c.latest_date)
-    ).filter(EngagementScore.institute_id == institute_id)
+# Prefetched /list pages live briefly in Redis: long enough to cover UI scroll
+# think-time, short enough that a refreshed materialized view shows up quickly
+LIST_PREFETCH_TTL_SECONDS = 30
+_prefetch_slots = asyncio.Semaphore(16)
+_prefetch_tasks = set()
+
+
+def _list_page_key(**params) -> str:
+    return cache_key("students:list", **params)
+
+
+async def _fetch_list_page(
+    db: AsyncSession,
+    institute_id: str,
+    engagement_level: Optional[str],
+    risk_level: Optional[str],
+    limit: int,
+    after_score: Optional[float],
+    after_id: Optional[str],
+    offset: int = 0
+) -> dict:
+    # Latest score and prediction per student, precomputed by the aggregation pipeline
+    latest = StudentLatestMetrics.c
+    query = select(StudentLatestMetrics).where(
+        latest.institute_id == institute_id,
+        latest.latest_score_date.isnot(None)
+    )
 
     if engagement_level:
-        query = query.filter(EngagementScore.engagement_level == engagement_level)
-
-    scores = query.offset(offset).limit(limit).all()
+        query = query.where(latest.engagement_level == engagement_level)
+
+    if risk_level:
+        query = query.where(latest.latest_risk_level == risk_level)
+
+    # Keyset pagination: seek past the cursor instead of scanning offset rows.
+    # A plain value inside tuple_() binds as a float, not through the column
+    # type, so the cursor score is converted to stored hundredths explicitly
+    if after_score is not None and after_id is not None:
+        query = query.where(
+            tuple_(latest.engagement_score, latest.student_id)
+            < tuple_(literal(after_score, FixedPointScore), after_id)
+        )
+    elif offset:
+        query = query.offset(offset)
+
+    rows = (await db.execute(
+        query.order_by(desc(latest.engagement_score), desc(latest.student_id)).limit(limit)
+    )).all()
 
     students = []
-    seen = set()
-    for score in scores:
-        if score.student_id in seen:
-            continue
-        seen.add(score.student_id)
-        
-        prediction = db.query(DisengagementPrediction).filter(
-            DisengagementPrediction.student_id == score.student_id,
-            DisengagementPrediction.institute_id == institute_id,
-        ).order_by(desc(DisengagementPrediction.prediction_date)).first()
-
-        if risk_level and (not prediction or prediction.risk_level != risk_level):
-            continue
-
+    for row in rows:
+        has_prediction = row.latest_risk_level is not None
         students.append({
-            "student_id": score.student_id,
-            "engagement_score": round(score.engagement_score, 2),
-            "engagement_level": score.engagement_level,
-            "engagement_trend": score.engagement_trend,
-            "at_risk": prediction.at_risk if prediction else False,
-            "risk_level": prediction.risk_level if prediction else "Unknown",
-            "risk_probability": round(prediction.risk_probability, 3) if prediction else None,
-            "last_updated": score.date.isoformat()
+            "student_id": row.student_id,
+            "engagement_score": round(row.engagement_score, 2),
+            "engagement_level": row.engagement_level,
+            "engagement_trend": row.engagement_trend,
+            "at_risk": row.at_risk if has_prediction else False,
+            "risk_level": row.latest_risk_level if has_prediction else "Unknown",
+            "risk_probability": round(row.latest_risk_probability, 3) if has_prediction else None,
+            "last_updated": row.latest_score_date
         })
 
+    next_cursor = (
+        {"after_score": rows[-1].engagement_score, "after_id": rows[-1].student_id}
+        if len(rows) == limit else None
+    )
+
     return {
         "total": len(students),
         "offset": offset,
         "limit": limit,
         "institute_id": institute_id,
-        "students": students
+        "students": students,
+        "next_cursor": next_cursor
     }
 
 
+async def _prefetch_list_page(client, filters: dict, next_cursor: dict) -> None:
+    """Compute the page after `next_cursor` and park it in Redis for the next request."""
+    key = _list_page_key(**filters, **next_cursor)
+    async with _prefetch_slots:
+        try:
+            if await client.exists(key):
+                return
+            async with AsyncSessionLocal() as session:
+                page = await _fetch_list_page(session, **filters, **next_cursor)
+            await client.set(key, orjson.dumps(page), ex=LIST_PREFETCH_TTL_SECONDS)
+        except Exception as e:
+            # Nothing awaits this task, so a database error would otherwise only
+            # surface as "Task exception was never retrieved"
+            logger.warning(f"List prefetch failed for {key}: {e}")
+
+
+def _schedule_prefetch(client, filters: dict, page: dict) -> None:
+    if page["next_cursor"] is None:
+        return
+    task = asyncio.create_task(_prefetch_list_page(client, filters, page["next_cursor"]))
+    # Hold a reference until done so the task is not garbage-collected mid-flight
+    _prefetch_tasks.add(task)
+    task.add_done_callback(_prefetch_tasks.discard)
+
+
+@router.get("/list")
+async def list_students(
+    institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier — only this institute's students are returned"),
+    engagement_level: Optional[EngagementLevel] = Query(None, description="Filter by engagement level"),
+    risk_level: Optional[RiskLevel] = Query(None, description="Filter by risk level"),
+    limit: int = Query(100, ge=1, le=1000),
+    after_score: Optional[float] = Query(None, description="Keyset cursor: engagement_score of the last row seen"),
+    after_id: Optional[str] = Query(None, description="Keyset cursor: student_id of the last row seen"),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated; page with after_score/after_id (next_cursor)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    List all students for a given institute with their latest engagement data.
+    Each institute sees only its own students.
+
+    Ordered by engagement score (highest first). Pass the returned next_cursor
+    values as after_score/after_id to fetch the following page.
+    """
+    # Enum members reduced to their values: the filters also build Redis keys
+    filters = {
+        "institute_id": institute_id,
+        "engagement_level": engagement_level.value if engagement_level else None,
+        "risk_level": risk_level.value if risk_level else None,
+        "limit": limit,
+    }
+    cursor = {"after_score": after_score, "after_id": after_id}
+
+    # Offset paging is deprecated and never prefetched; serve it directly
+    client = get_async_redis() if not offset else None
+    if client is not None:
+        key = _list_page_key(**filters, **cursor)
+        try:
+            hit = await client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache read failed for {key}: {e}")
+            hit = None
+        if hit is not None:
+            # Keep one page ahead of a sequential scroll
+            _schedule_prefetch(client, filters, orjson.loads(hit))
+            return Response(content=hit, media_type="application/json")
+
+    page = await _fetch_list_page(db, **filters, **cursor, offset=offset)
+    if client is not None:
+        _schedule_prefetch(client, filters, page)
+
+    # Up to 1000 plain-dict rows; orjson encodes dates natively, skip jsonable_encoder
+    return ORJSONResponse(page)
+
+
 @router.get("/compare")
-def compare_students(
+async def compare_students(
     student_ids: str = Query(..., description="Comma-separated student IDs"),
     institute_id: str = Query(FALLBACK_INSTITUTE, description="Institute identifier"),
     days: int = Query(30, ge=1, le=90),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     ids = [id.strip() for id in student_ids.split(',')]
 
     if len(ids) < 2 or len(ids) > 10:
         raise HTTPException(status_code=400, detail="Please provide 2-10 student IDs")
 
-    cutoff_date = date.today() - timedelta(days=days)
+    cutoff_date = today() - timedelta(days=days)
+
+    # Per-student window stats plus the latest row, for all ids in one round-trip
+    window = {"partition_by": EngagementScore.student_id}
+    ranked_scores = select(
+        EngagementScore.student_id,
+        EngagementScore.engagement_score,
+        EngagementScore.engagement_level,
+        EngagementScore.engagement_trend,
+        func.avg(EngagementScore.engagement_score, type_=FixedPointScore).over(**window).label('avg_score'),
+        func.count().over(**window).label('days_analyzed'),
+        func.row_number().over(
+            **window, order_by=(desc(EngagementScore.date), desc(EngagementScore.id))
+        ).label('rn'),
+    ).where(
+        EngagementScore.student_id.in_(ids),
+        EngagementScore.institute_id == institute_id,
+        EngagementScore.date >= cutoff_date
+    ).subquery('ranked_scores')
+    score_rows = (await db.execute(select(ranked_scores).where(ranked_scores.c.rn == 1))).all()
+    scores_by_student = {row.student_id: row for row in score_rows}
+
+    ranked_predictions = select(
+        DisengagementPrediction.student_id,
+        DisengagementPrediction.at_risk,
+        DisengagementPrediction.risk_probability,
+        func.row_number().over(
+            partition_by=DisengagementPrediction.student_id,
+            order_by=(desc(DisengagementPrediction.prediction_date), desc(DisengagementPrediction.id))
+        ).label('rn'),
+    ).where(
+        DisengagementPrediction.student_id.in_(ids),
+        DisengagementPrediction.institute_id == institute_id,
+    ).subquery('ranked_predictions')
+    prediction_rows = (await db.execute(select(ranked_predictions).where(ranked_predictions.c.rn == 1))).all()
+    predictions_by_student = {row.student_id: row for row in prediction_rows}
 
     comparison = []
     for student_id in ids:
-        scores = db.query(EngagementScore).filter(
-            EngagementScore.student_id == student_id,
-            EngagementScore.institute_id == institute_id,
-            EngagementScore.date >= cutoff_date
-        ).all()
-
-        if not scores:
+        latest = scores_by_student.get(student_id)
+        if latest is None:
             comparison.append({"student_id": student_id, "error": "No data found"})
             continue
 
-        avg_score = sum(s.engagement_score for s in scores) / len(scores)
-        latest = max(scores, key=lambda s: s.date)
-
-        prediction = db.query(DisengagementPrediction).filter(
-            DisengagementPrediction.student_id == student_id,
-            DisengagementPrediction.institute_id == institute_id,
-        ).order_by(desc(DisengagementPrediction.prediction_date)).first()
+        prediction = predictions_by_student.get(student_id)
 
         comparison.append({
             "student_id": student_id,
-            "avg_engagement_score": round(avg_score, 2),
+            "avg_engagement_score": round(latest.avg_score, 2),
             "current_engagement_score": round(latest.engagement_score, 2),
             "engagement_level": latest.engagement_level,
             "trend": latest.engagement_trend,
             "at_risk": prediction.at_risk if prediction else False,
             "risk_probability": round(prediction.risk_probability, 3) if prediction else None,
-            "days_analyzed": len(scores)
+            "days_analyzed": latest.days_analyzed
         })
 
     return {"comparison": comparison, "analysis_period_days": days, "institute_id": institute_id}
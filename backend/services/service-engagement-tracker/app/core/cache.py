@@ -0,0 +1,290 @@
+"""
+Redis response cache for dashboard-polled endpoints (statistics, leaderboard).
+
+Caching is optional: when REDIS_URL is not configured or Redis is unreachable
+every helper degrades to a no-op and the endpoint is computed as usual.
+"""
+import functools
+import inspect
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+from app.core.clock import today
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+KEY_PREFIX = "engagement"
+
+# Generation bumped whenever disengagement predictions are written
+PREDICTIONS_GENERATION = "predictions"
+
+# Per-institute activity event count, maintained by the ingest routes
+EVENTS_COUNTER = "events"
+
+_client: Optional[redis.Redis] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Lazily create the sync Redis client (None when caching is disabled)."""
+    global _client
+    if _client is None and settings.REDIS_URL:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _client
+
+
+def get_async_redis() -> Optional[aioredis.Redis]:
+    """Lazily create the asyncio Redis client (None when caching is disabled)."""
+    global _async_client
+    if _async_client is None and settings.REDIS_URL:
+        _async_client = aioredis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _async_client
+
+
+def cache_key(namespace: str, **params: Any) -> str:
+    """Build a cache key from a namespace and the endpoint's query parameters."""
+    parts = [f"{name}={params[name]}" for name in sorted(params)]
+    return ":".join([KEY_PREFIX, namespace, *parts])
+
+
+def _cacheable_params(kwargs: dict) -> dict:
+    # Injected dependencies (db sessions) are not part of the key
+    return {k: v for k, v in kwargs.items() if k != "db"}
+
+
+def cached(namespace: str, ttl: int = 60) -> Callable:
+    """
+    Cache an endpoint's JSON-encodable response in Redis for `ttl` seconds.
+
+    Works for both sync and async endpoints; the key is derived from the
+    namespace plus the endpoint's keyword arguments (excluding `db`).
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                client = get_async_redis()
+                key = cache_key(namespace, **_cacheable_params(kwargs))
+                if client is not None:
+                    try:
+                        hit = await client.get(key)
+                        if hit is not None:
+                            return json.loads(hit)
+                    except redis.RedisError as e:
+                        logger.warning(f"Cache read failed for {key}: {e}")
+
+                result = await func(*args, **kwargs)
+
+                if client is not None:
+                    try:
+                        await client.set(key, json.dumps(jsonable_encoder(result)), ex=ttl)
+                    except redis.RedisError as e:
+                        logger.warning(f"Cache write failed for {key}: {e}")
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            client = get_redis()
+            key = cache_key(namespace, **_cacheable_params(kwargs))
+            if client is not None:
+                try:
+                    hit = client.get(key)
+                    if hit is not None:
+                        return json.loads(hit)
+                except redis.RedisError as e:
+                    logger.warning(f"Cache read failed for {key}: {e}")
+
+            result = func(*args, **kwargs)
+
+            if client is not None:
+                try:
+                    client.set(key, json.dumps(jsonable_encoder(result)), ex=ttl)
+                except redis.RedisError as e:
+                    logger.warning(f"Cache write failed for {key}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(namespace: str, **params: Any) -> None:
+    """Drop a cached response (sync callers)."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.delete(cache_key(namespace, **params))
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {namespace}: {e}")
+
+
+async def ainvalidate(namespace: str, **params: Any) -> None:
+    """Drop a cached response (async callers)."""
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.delete(cache_key(namespace, **params))
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed for {namespace}: {e}")
+
+
+def _generation_key(name: str) -> str:
+    return cache_key(f"generation:{name}")
+
+
+def bump_generation(name: str) -> None:
+    """
+    Start a new generation after the underlying rows are committed; entries
+    cached by cached_by_generation() under the previous one stop matching and
+    age out at midnight, so nothing has to be found and deleted.
+    """
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(_generation_key(name))
+    except redis.RedisError as e:
+        logger.warning(f"Generation bump failed for {name}: {e}")
+
+
+def _next_midnight() -> datetime:
+    return datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+
+
+def cached_by_generation(namespace: str, generation: str) -> Callable:
+    """
+    Cache a sync endpoint's JSON response until the next midnight or the next
+    bump_generation(generation), whichever comes first.
+
+    For daily-cadence listings whose key includes today's date. The generation
+    and the entry are read in one pipelined round trip; the entry is served only
+    when it was built under the current generation.
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            client = get_redis()
+            key = cache_key(namespace, today=today(), **_cacheable_params(kwargs))
+            current = None
+            if client is not None:
+                try:
+                    generation_value, (built, body) = (
+                        client.pipeline(transaction=False)
+                        .get(_generation_key(generation))
+                        .hmget(key, "generation", "body")
+                        .execute()
+                    )
+                    current = generation_value or b"0"
+                    if body is not None and built == current:
+                        return Response(content=body, media_type="application/json")
+                except redis.RedisError as e:
+                    logger.warning(f"Cache read failed for {key}: {e}")
+
+            result = func(*args, **kwargs)
+
+            # Only cache what was built under a generation we actually read
+            if current is not None:
+                body = result.body if isinstance(result, Response) else orjson.dumps(jsonable_encoder(result))
+                try:
+                    (
+                        client.pipeline(transaction=False)
+                        .hset(key, mapping={"generation": current, "body": body})
+                        .expireat(key, _next_midnight())
+                        .execute()
+                    )
+                except redis.RedisError as e:
+                    logger.warning(f"Cache write failed for {key}: {e}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# Write-maintained counters. The increment only applies to a counter that has
+# already been seeded from the database, so an unseeded counter never reports a
+# partial total; reconciliation overwrites whatever drift remains.
+_INCR_IF_SEEDED = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+def counter_key(name: str, **params: Any) -> str:
+    return cache_key(f"counter:{name}", **params)
+
+
+def incr_counter(name: str, amount: int = 1, **params: Any) -> None:
+    """Add to a seeded counter after the rows it counts are committed (sync callers)."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.eval(_INCR_IF_SEEDED, 1, counter_key(name, **params), amount)
+    except redis.RedisError as e:
+        logger.warning(f"Counter update failed for {name}: {e}")
+
+
+async def aincr_counter(name: str, amount: int = 1, **params: Any) -> None:
+    """Add to a seeded counter after the rows it counts are committed (async callers)."""
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.eval(_INCR_IF_SEEDED, 1, counter_key(name, **params), amount)
+    except redis.RedisError as e:
+        logger.warning(f"Counter update failed for {name}: {e}")
+
+
+async def aget_counter(name: str, **params: Any) -> Optional[int]:
+    """Current counter value, or None when it is unseeded or Redis is unavailable."""
+    client = get_async_redis()
+    if client is None:
+        return None
+    try:
+        value = await client.get(counter_key(name, **params))
+    except redis.RedisError as e:
+        logger.warning(f"Counter read failed for {name}: {e}")
+        return None
+    return int(value) if value is not None else None
+
+
+async def aseed_counter(name: str, value: int, **params: Any) -> None:
+    """Seed an unseeded counter from a database count; never overwrites a live one."""
+    client = get_async_redis()
+    if client is None:
+        return
+    try:
+        await client.set(counter_key(name, **params), value, nx=True)
+    except redis.RedisError as e:
+        logger.warning(f"Counter seed failed for {name}: {e}")
+
+
+def set_counter(name: str, value: int, **params: Any) -> None:
+    """Overwrite a counter with an authoritative count (reconciliation)."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.set(counter_key(name, **params), value)
+    except redis.RedisError as e:
+        logger.warning(f"Counter reconcile failed for {name}: {e}")
@@ -0,0 +1,26 @@
+"""
+Cached calendar date for request handlers.
+
+Read endpoints derive their cutoff dates from today's date on every request;
+the value only changes at midnight, so it is refreshed at most once a minute
+(and never later than the next local midnight) instead of per call.
+"""
+import time
+from datetime import date, datetime, timedelta
+
+REFRESH_SECONDS = 60.0
+
+_today: date = date.min
+_expires_at: float = float("-inf")
+
+
+def today() -> date:
+    """Drop-in for date.today() in read paths."""
+    global _today, _expires_at
+    now = time.monotonic()
+    if now >= _expires_at:
+        current = datetime.now()
+        next_midnight = datetime.combine(current.date() + timedelta(days=1), datetime.min.time())
+        _today = current.date()
+        _expires_at = now + min(REFRESH_SECONDS, (next_midnight - current).total_seconds())
+    return _today
@@ -0,0 +1,56 @@
+"""
+Static CORS headers for wildcard-origin deployments.
+
+When ALLOWED_ORIGINS is ["*"] there is nothing to negotiate per request, so
+instead of Starlette's CORSMiddleware (which inspects every request and builds
+a header dict for each response) this ASGI middleware appends fixed header
+bytes and answers preflights with 204. A wildcard origin cannot be combined
+with credentialed requests, so no Access-Control-Allow-Credentials is sent.
+"""
+from typing import Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALLOW_ORIGIN_HEADER = (b"access-control-allow-origin", b"*")
+
+PREFLIGHT_HEADERS = (
+    ALLOW_ORIGIN_HEADER,
+    (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+    (b"access-control-max-age", b"600"),
+)
+
+
+def _header(headers: Iterable, name: bytes) -> bytes:
+    for key, value in headers:
+        if key == name:
+            return value
+    return b""
+
+
+class StaticCORSMiddleware:
+    """Allow any origin with precomputed headers."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and _header(scope["headers"], b"access-control-request-method"):
+            # Preflight: allow whatever headers the browser asks for
+            requested = _header(scope["headers"], b"access-control-request-headers")
+            headers = [*PREFLIGHT_HEADERS]
+            if requested:
+                headers.append((b"access-control-allow-headers", requested))
+            await send({"type": "http.response.start", "status": 204, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), ALLOW_ORIGIN_HEADER]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
@@ -20,11 +20,12 @@ if str(service_dir) not in sys.path:
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from app.core.config import settings
+from app.core.cors import StaticCORSMiddleware
 from app.core.logging import setup_logging, get_logger
 from backend.shared.middleware import (
     error_handler_middleware,
@@ -54,6 +55,7 @@ app = FastAPI(
     title=settings.SERVICE_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
+    default_response_class=ORJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
@@ -67,13 +69,17 @@ app = FastAPI(
 )
 
 # Standard middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+if "*" in settings.CORS_ORIGINS:
+    # Nothing to negotiate per request; emit fixed headers
+    app.add_middleware(StaticCORSMiddleware)
+else:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Shared middleware
 app.middleware("http")(logging_middleware)
@@ -2,20 +2,28 @@
 Models package - exports all SQLAlchemy models
 """
 from app.models.engagement import (
+    Student,
     StudentActivityEvent,
     DailyEngagementMetric,
     EngagementScore,
+    ModelMetadata,
     DisengagementPrediction,
     InterventionLog,
-    StudySchedule
+    StudySchedule,
+    StudentEngagementAggregate,
+    StudentLatestMetrics
 )
 
 __all__ = [
+    "Student",
     "StudentActivityEvent",
     "DailyEngagementMetric",
     "EngagementScore",
+    "ModelMetadata",
     "DisengagementPrediction",
     "InterventionLog",
-    "StudySchedule"
+    "StudySchedule",
+    "StudentEngagementAggregate",
+    "StudentLatestMetrics"
 ]
 
@@ -2,16 +2,74 @@
 SQLAlchemy models for engagement tracking
 """
 from sqlalchemy import (
-    Column, Integer, String, Float, DateTime, Date, 
-    Boolean, JSON, ForeignKey, CheckConstraint, Text, Time
+    Column, Integer, SmallInteger, String, Float, DateTime, Date, 
+    Boolean, JSON, ForeignKey, CheckConstraint, UniqueConstraint, Text, Time, Index, text,
+    Computed, DDL, MetaData, Table, TypeDecorator, event, select
 )
-from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import DATERANGE, ENUM, UUID, JSONB, ExcludeConstraint
+from sqlalchemy.orm import backref, column_property, deferred, relationship
 from datetime import datetime
-import uuid
 
 from app.core.database import Base
 
+# Native PostgreSQL enums (4 bytes per value) for the fixed vocabularies; the
+# values match the API enums in app.schemas.engagement. The type itself rejects
+# unknown values, so these columns need no IN-list CHECK constraints.
+EVENT_TYPE_ENUM = ENUM(
+    'login', 'logout', 'page_view', 'video_play', 'video_complete',
+    'quiz_start', 'quiz_submit', 'assignment_submit', 'forum_post',
+    'forum_reply', 'resource_download', 'content_interaction',
+    name='event_type_enum'
+)
+ENGAGEMENT_LEVEL_ENUM = ENUM('Low', 'Medium', 'High', name='engagement_level_enum')
+ENGAGEMENT_TREND_ENUM = ENUM('Improving', 'Stable', 'Declining', name='engagement_trend_enum')
+RISK_LEVEL_ENUM = ENUM('Low', 'Medium', 'High', name='risk_level_enum')
+INTERVENTION_TYPE_ENUM = ENUM(
+    'email_reminder', 'push_notification', 'resource_recommendation',
+    'alternative_content', 'micro_lesson', 'practice_problems',
+    'discussion_prompt', 'tutor_alert', 'motivational_message',
+    'peer_comparison', 'study_group_suggestion',
+    name='intervention_type_enum'
+)
+INTERVENTION_STATUS_ENUM = ENUM(
+    'pending', 'sent', 'delivered', 'opened', 'clicked', 'failed',
+    name='intervention_status_enum'
+)
+
+
+class FixedPointScore(TypeDecorator):
+    """
+    0-100 score with two decimals stored as SMALLINT hundredths (98.96 -> 9896).
+    Loaded values and bound parameters (including comparisons against the column)
+    are converted here, so Python code sees plain floats. SQL aggregates such as
+    AVG() stay in hundredths: pass type_=FixedPointScore() to convert their result.
+    """
+    impl = SmallInteger
+    cache_ok = True
+    SCALE = 100
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(round(value * self.SCALE))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else float(value) / self.SCALE
+
+
+class Student(Base):
+    """
+    Surrogate integer keys for LMS student ids
+    Fact tables carry student_pk next to the external student_id string; reads
+    move over to the integer key before the string columns are retired.
+    """
+    __tablename__ = "students"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    external_id = Column(String(50), nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<Student {self.id}: {self.external_id}>"
+
 
 class StudentActivityEvent(Base):
     """
@@ -20,14 +78,24 @@ class StudentActivityEvent(Base):
     """
     __tablename__ = "student_activity_events"
     
-    event_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    student_id = Column(String(50), nullable=False, index=True)
+    event_id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()"))
+    student_id = Column(String(50), nullable=False)  # leading column of the (student_id, time DESC) index
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     institute_id = Column(String(100), nullable=False, index=True, default='LMS_INST_A')
-    event_type = Column(String(50), nullable=False)
-    event_timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
+    event_type = Column(EVENT_TYPE_ENUM, nullable=False)
+    # Part of the primary key because the table is range-partitioned on it
+    event_timestamp = Column(DateTime(timezone=True), primary_key=True)
     session_id = Column(String(100), nullable=True)
     
-    # Event-specific data stored as JSON
+    # Hot payload keys promoted out of event_data (see PROMOTED_EVENT_DATA_KEYS)
+    duration_seconds = Column(Integer, nullable=True)
+    resource_id = Column(String(100), nullable=True)
+    score = Column(Float, nullable=True)
+    page_path = Column(String(255), nullable=True)
+    
+    # Remaining, truly variable event metadata. Only containment (@>) is indexed
+    # (ix_activity_event_data_gin); keys that queries filter on by equality,
+    # like session_id, belong in real columns rather than expression indexes.
     event_data = Column(JSONB, default={})
     
     # Tracking
@@ -36,73 +104,105 @@ class StudentActivityEvent(Base):
     
     # Constraints
     __table_args__ = (
-        CheckConstraint(
-            event_type.in_([
-                'login', 'logout', 'page_view', 'video_play', 'video_complete',
-                'quiz_start', 'quiz_submit', 'assignment_submit', 'forum_post',
-                'forum_reply', 'resource_download', 'content_interaction'
-            ]),
-            name='chk_event_type'
+        Index('ix_activity_events_student_ts', student_id, event_timestamp.desc()),
+        # Events arrive in time order, so a BRIN index prunes all-student time
+        # range scans at a fraction of a btree's size and write cost
+        Index(
+            'brin_events_ts', event_timestamp,
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        ),
+        # Containment (@>) lookups on event payload keys; jsonb_path_ops is ~5x
+        # smaller than the default jsonb_ops and is all @> needs
+        Index(
+            'ix_activity_event_data_gin', event_data,
+            postgresql_using='gin', postgresql_ops={'event_data': 'jsonb_path_ops'}
         ),
+        # One partition per calendar month; see ensure_activity_event_partitions()
+        {'postgresql_partition_by': 'RANGE (event_timestamp)'},
     )
     
     def __repr__(self):
         return f"<ActivityEvent {self.event_type} by {self.student_id} at {self.event_timestamp}>"
 
 
+# Incoming event_data keys stored in the typed column of the same name instead.
+# Only values that already have the column's JSON type are moved (an integer
+# for duration_seconds, a number for score, a string that fits for the string
+# columns); anything else stays in event_data untouched, so nothing is coerced
+PROMOTED_EVENT_DATA_KEYS = (
+    StudentActivityEvent.duration_seconds,
+    StudentActivityEvent.score,
+    StudentActivityEvent.page_path,
+    StudentActivityEvent.resource_id,
+)
+
+
+# Catches events outside the monthly partitions created so far, so an insert
+# never fails for lack of a partition. Dropped together with the parent table.
+ACTIVITY_EVENTS_DEFAULT_PARTITION = f"{StudentActivityEvent.__tablename__}_default"
+
+event.listen(StudentActivityEvent.__table__, "after_create", DDL(
+    f"CREATE TABLE IF NOT EXISTS {ACTIVITY_EVENTS_DEFAULT_PARTITION} "
+    f"PARTITION OF {StudentActivityEvent.__tablename__} DEFAULT"
+).execute_if(dialect="postgresql"))
+
+
 class DailyEngagementMetric(Base):
     """
     Daily aggregated metrics per student
-    Pre-computed for performance
+    Pre-computed for performance; counts are SMALLINT (capped at 32767 by the aggregator)
     """
     __tablename__ = "daily_engagement_metrics"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(String(50), nullable=False, index=True)
+    student_id = Column(String(50), nullable=False)  # leading column of the one-row-per-day unique key
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     institute_id = Column(String(100), nullable=False, index=True, default='LMS_INST_A')
     date = Column(Date, nullable=False, index=True)
     
     # Login metrics
-    login_count = Column(Integer, default=0)
+    login_count = Column(SmallInteger, default=0)
     first_login_time = Column(Time, nullable=True)
     last_login_time = Column(Time, nullable=True)
     
     # Session metrics
-    total_sessions = Column(Integer, default=0)
+    total_sessions = Column(SmallInteger, default=0)
     total_session_duration_minutes = Column(Float, default=0.0)
     avg_session_duration_minutes = Column(Float, default=0.0)
     longest_session_minutes = Column(Float, default=0.0)
     
     # Content interaction metrics
-    page_views = Column(Integer, default=0)
-    unique_pages_viewed = Column(Integer, default=0)
-    content_interactions = Column(Integer, default=0)
-    video_plays = Column(Integer, default=0)
+    page_views = Column(SmallInteger, default=0)
+    unique_pages_viewed = Column(SmallInteger, default=0)
+    content_interactions = Column(SmallInteger, default=0)
+    video_plays = Column(SmallInteger, default=0)
     video_watch_minutes = Column(Float, default=0.0)
-    resource_downloads = Column(Integer, default=0)
+    resource_downloads = Column(SmallInteger, default=0)
     
     # Forum metrics
-    forum_posts = Column(Integer, default=0)
-    forum_replies = Column(Integer, default=0)
-    forum_reads = Column(Integer, default=0)
+    forum_posts = Column(SmallInteger, default=0)
+    forum_replies = Column(SmallInteger, default=0)
+    forum_reads = Column(SmallInteger, default=0)
     
     # Assessment metrics
-    quiz_attempts = Column(Integer, default=0)
+    quiz_attempts = Column(SmallInteger, default=0)
     quiz_score_sum = Column(Float, default=0.0)
     quiz_score_avg = Column(Float, nullable=True)
-    assignments_submitted = Column(Integer, default=0)
-    assignments_on_time = Column(Integer, default=0)
+    assignments_submitted = Column(SmallInteger, default=0)
+    assignments_on_time = Column(SmallInteger, default=0)
     
     # Metadata
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     
-    # Unique constraint: one row per student per day
+    # Unique constraint: one row per student per day (per institute). Its index
+    # also serves (student_id, date DESC) scans.
     __table_args__ = (
         CheckConstraint('login_count >= 0', name='chk_login_count_positive'),
         CheckConstraint('total_session_duration_minutes >= 0', name='chk_session_duration_positive'),
         CheckConstraint('quiz_score_avg IS NULL OR (quiz_score_avg >= 0 AND quiz_score_avg <= 100)', 
                        name='chk_quiz_score_range'),
+        UniqueConstraint(student_id, date, institute_id, name='uq_daily_metric_student_date'),
     )
     
     def __repr__(self):
@@ -116,30 +216,31 @@ class EngagementScore(Base):
     __tablename__ = "engagement_scores"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(String(50), nullable=False, index=True)
+    student_id = Column(String(50), nullable=False)  # leading column of the one-row-per-day unique key
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     institute_id = Column(String(100), nullable=False, index=True, default='LMS_INST_A')
     date = Column(Date, nullable=False, index=True)
     
-    # Component scores (0-100 scale)
-    login_score = Column(Float, nullable=False)
-    session_score = Column(Float, nullable=False)
-    interaction_score = Column(Float, nullable=False)
-    forum_score = Column(Float, nullable=False)
-    assignment_score = Column(Float, nullable=False)
+    # Component scores (0-100 scale, stored as SMALLINT hundredths)
+    login_score = Column(FixedPointScore, nullable=False)
+    session_score = Column(FixedPointScore, nullable=False)
+    interaction_score = Column(FixedPointScore, nullable=False)
+    forum_score = Column(FixedPointScore, nullable=False)
+    assignment_score = Column(FixedPointScore, nullable=False)
     
     # Composite engagement score (weighted average)
-    engagement_score = Column(Float, nullable=False)
+    engagement_score = Column(FixedPointScore, nullable=False)
     
     # Engagement level categorization
-    engagement_level = Column(String(20), nullable=False)
+    engagement_level = Column(ENGAGEMENT_LEVEL_ENUM, nullable=False)
     
     # Trend analysis
-    engagement_score_lag_1day = Column(Float, nullable=True)
-    engagement_score_lag_7days = Column(Float, nullable=True)
-    engagement_change = Column(Float, nullable=True)
-    engagement_trend = Column(String(20), nullable=True)
-    rolling_avg_7days = Column(Float, nullable=True)
-    rolling_avg_30days = Column(Float, nullable=True)
+    engagement_score_lag_1day = Column(FixedPointScore, nullable=True)
+    engagement_score_lag_7days = Column(FixedPointScore, nullable=True)
+    engagement_change = Column(FixedPointScore, nullable=True)
+    engagement_trend = Column(ENGAGEMENT_TREND_ENUM, nullable=True)
+    rolling_avg_7days = Column(FixedPointScore, nullable=True)
+    rolling_avg_30days = Column(FixedPointScore, nullable=True)
     
     # Metadata
     calculation_version = Column(String(10), default='v1.0')
@@ -147,22 +248,32 @@ class EngagementScore(Base):
     
     # Constraints
     __table_args__ = (
-        CheckConstraint(
-            engagement_level.in_(['Low', 'Medium', 'High']),
-            name='chk_engagement_level'
-        ),
-        CheckConstraint(
-            engagement_trend.in_(['Improving', 'Stable', 'Declining']) | (engagement_trend == None),
-            name='chk_engagement_trend'
-        ),
-        CheckConstraint('engagement_score >= 0 AND engagement_score <= 100', 
+        CheckConstraint('engagement_score >= 0 AND engagement_score <= 10000', 
                        name='chk_engagement_score_range'),
+        # One row per student per day (per institute)
+        UniqueConstraint(student_id, date, institute_id, name='uq_engagement_score_student_date'),
     )
     
     def __repr__(self):
         return f"<EngagementScore {self.student_id} on {self.date}: {self.engagement_score:.1f} ({self.engagement_level})>"
 
 
+class ModelMetadata(Base):
+    """
+    One row per trained model version. Explainability that is the same for
+    every prediction a model makes is stored here once instead of per row.
+    """
+    __tablename__ = "model_metadata"
+    
+    model_version = Column(String(50), primary_key=True)
+    model_type = Column(String(50), nullable=True)
+    feature_importance = Column(JSONB, nullable=True)  # top features, [{feature, importance}]
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ModelMetadata {self.model_version}>"
+
+
 class DisengagementPrediction(Base):
     """
     ML model predictions for at-risk students
@@ -170,35 +281,64 @@ class DisengagementPrediction(Base):
     __tablename__ = "disengagement_predictions"
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    student_id = Column(String(50), nullable=False, index=True)
+    student_id = Column(String(50), nullable=False)  # leading column of the one-row-per-day unique key
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     institute_id = Column(String(100), nullable=False, index=True, default='LMS_INST_A')
     prediction_date = Column(Date, nullable=False, index=True)
     
     # Prediction outputs
     at_risk = Column(Boolean, nullable=False)
     risk_probability = Column(Float, nullable=False)
-    risk_level = Column(String(20), nullable=False)
+    risk_level = Column(RISK_LEVEL_ENUM, nullable=False)
     
-    # Model explainability
-    contributing_factors = Column(JSONB, nullable=True)
-    feature_importance = Column(JSONB, nullable=True)
+    # Model explainability (read whole, unnested with jsonb_each, or filtered by
+    # jsonpath through ix_predictions_factors_gin). Deferred: ORM loads skip the
+    # TOASTed payloads unless a query asks for them with undefer_group('explain').
+    contributing_factors = deferred(Column(JSONB, nullable=True), group='explain')
     
     # Model metadata
     model_version = Column(String(50), nullable=False)
     model_type = Column(String(50), nullable=True)
     confidence_score = Column(Float, nullable=True)
     
+    # Shared by every prediction of a model version, so it lives once in
+    # model_metadata and is looked up by model_version when asked for
+    feature_importance = column_property(
+        select(ModelMetadata.feature_importance)
+        .where(ModelMetadata.model_version == model_version)
+        .correlate_except(ModelMetadata)
+        .scalar_subquery(),
+        deferred=True,
+        group='explain',
+    )
+    
     # Prediction metadata
-    prediction_horizon_days = Column(Integer, default=7)
+    prediction_horizon_days = Column(SmallInteger, default=7)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     
     # Constraints
     __table_args__ = (
         CheckConstraint('risk_probability >= 0 AND risk_probability <= 1', 
                        name='chk_risk_probability_range'),
-        CheckConstraint(
-            risk_level.in_(['Low', 'Medium', 'High']),
-            name='chk_risk_level'
+        # One prediction per student per day (per institute)
+        UniqueConstraint(
+            student_id, prediction_date, institute_id, name='uq_prediction_student_date'
+        ),
+        # Partial index for the at-risk listings
+        Index(
+            'ix_predictions_at_risk_institute_date', institute_id, prediction_date,
+            postgresql_where=(at_risk == True)
+        ),
+        # Partial index for the high-risk listing and its per-institute scan
+        Index(
+            'ix_predictions_high_risk_institute_date', institute_id, prediction_date,
+            postgresql_where=(risk_level == 'High')
+        ),
+        # jsonpath (@@, @?) and containment filters on factors; jsonb_path_ops
+        # supports all three and is smaller than the default jsonb_ops
+        Index(
+            'ix_predictions_factors_gin', 'contributing_factors',
+            postgresql_using='gin', postgresql_ops={'contributing_factors': 'jsonb_path_ops'}
         ),
     )
     
@@ -214,15 +354,16 @@ class InterventionLog(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(String(50), nullable=False, index=True)
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     prediction_id = Column(Integer, ForeignKey('disengagement_predictions.id'), nullable=True)
     
     # Intervention details
-    intervention_type = Column(String(50), nullable=False)
+    intervention_type = Column(INTERVENTION_TYPE_ENUM, nullable=False)
     intervention_title = Column(String(200), nullable=True)
     intervention_content = Column(Text, nullable=True)
     
     # Delivery status
-    status = Column(String(20), nullable=False, default='pending')
+    status = Column(INTERVENTION_STATUS_ENUM, nullable=False, default='pending')
     delivered_at = Column(DateTime(timezone=True), nullable=True)
     opened_at = Column(DateTime(timezone=True), nullable=True)
     clicked_at = Column(DateTime(timezone=True), nullable=True)
@@ -235,24 +376,12 @@ class InterventionLog(Base):
     triggered_by = Column(String(50), default='system')
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     
-    # Relationship
-    prediction = relationship("DisengagementPrediction", backref="interventions")
-    
-    # Constraints
-    __table_args__ = (
-        CheckConstraint(
-            intervention_type.in_([
-                'email_reminder', 'push_notification', 'resource_recommendation',
-                'alternative_content', 'micro_lesson', 'practice_problems',
-                'discussion_prompt', 'tutor_alert', 'motivational_message',
-                'peer_comparison', 'study_group_suggestion'
-            ]),
-            name='chk_intervention_type'
-        ),
-        CheckConstraint(
-            status.in_(['pending', 'sent', 'delivered', 'opened', 'clicked', 'failed']),
-            name='chk_intervention_status'
-        ),
+    # Relationship (never lazy-loaded: callers must selectinload/joinedload it,
+    # so serializing a list of logs cannot silently turn into N+1 queries)
+    prediction = relationship(
+        "DisengagementPrediction",
+        backref=backref("interventions", lazy="raise_on_sql"),
+        lazy="raise_on_sql"
     )
     
     def __repr__(self):
@@ -267,15 +396,23 @@ class StudySchedule(Base):
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     student_id = Column(String(50), nullable=False, index=True)
+    student_pk = Column(Integer, ForeignKey('students.id'), nullable=True, index=True)
     
     # Schedule period
     week_start_date = Column(Date, nullable=False, index=True)
     week_end_date = Column(Date, nullable=False)
+    # Inclusive [start, end] range derived by Postgres; "schedule covering day D"
+    # is week_range @> D
+    week_range = Column(
+        DATERANGE,
+        Computed("daterange(week_start_date, week_end_date, '[]')", persisted=True),
+        nullable=False
+    )
     
     # Schedule configuration (from engagement features)
-    session_length_minutes = Column(Integer, nullable=False)  # Personalized session length
-    sessions_per_day = Column(Integer, nullable=False)  # Number of study blocks per day
-    total_study_minutes_per_day = Column(Integer, nullable=False)
+    session_length_minutes = Column(SmallInteger, nullable=False)  # Personalized session length
+    sessions_per_day = Column(SmallInteger, nullable=False)  # Number of study blocks per day
+    total_study_minutes_per_day = Column(SmallInteger, nullable=False)
     
     # Schedule adjustments
     load_reduction_factor = Column(Float, default=1.0)  # 0.5-1.0 for decline-aware reduction
@@ -301,8 +438,167 @@ class StudySchedule(Base):
                        name='chk_sessions_per_day'),
         CheckConstraint('load_reduction_factor >= 0.3 AND load_reduction_factor <= 1.0', 
                        name='chk_load_reduction'),
+        # At most one schedule per student covering any day; its GiST index also
+        # serves the (student_id, week_range @> D) lookups
+        ExcludeConstraint(
+            (student_id, '='), (week_range, '&&'),
+            name='excl_schedule_student_week', using='gist'
+        ),
     )
     
     def __repr__(self):
         return f"<StudySchedule {self.student_id} week {self.week_start_date}: {self.sessions_per_day}x{self.session_length_minutes}min/day>"
 
+
+# GiST has no operator class for VARCHAR equality without btree_gist, which the
+# exclusion constraint above needs for student_id
+event.listen(StudySchedule.__table__, "before_create", DDL(
+    "CREATE EXTENSION IF NOT EXISTS btree_gist"
+).execute_if(dialect="postgresql"))
+
+
+# ============================================================================
+# Materialized view: per-student engagement aggregates
+# ============================================================================
+
+# Refreshed by the aggregation pipeline (refresh_engagement_aggregates) so the
+# leaderboard / declining endpoints read precomputed rows instead of grouping
+# engagement_scores on every request. "Recent" windows are relative to the
+# last refresh. Score averages are kept in hundredths like the source columns.
+STUDENT_ENGAGEMENT_AGG_VIEW = "mv_student_engagement_daily_agg"
+
+event.listen(Base.metadata, "after_create", DDL(f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {STUDENT_ENGAGEMENT_AGG_VIEW} AS
+SELECT agg.student_id,
+       agg.avg_score,
+       agg.avg_score_30d,
+       agg.days_tracked,
+       agg.last_date,
+       agg.declining_days_7d,
+       agg.last_declining_date_7d,
+       latest.engagement_level AS latest_level,
+       latest.engagement_trend AS latest_trend,
+       declining.engagement_level AS latest_declining_level
+FROM (
+    SELECT student_id,
+           AVG(engagement_score) AS avg_score,
+           AVG(engagement_score) FILTER (WHERE date >= CURRENT_DATE - 30) AS avg_score_30d,
+           COUNT(*) AS days_tracked,
+           MAX(date) AS last_date,
+           COUNT(*) FILTER (WHERE engagement_trend = 'Declining' AND date >= CURRENT_DATE - 7) AS declining_days_7d,
+           MAX(date) FILTER (WHERE engagement_trend = 'Declining' AND date >= CURRENT_DATE - 7) AS last_declining_date_7d
+    FROM engagement_scores
+    GROUP BY student_id
+) agg
+LEFT JOIN (
+    SELECT DISTINCT ON (student_id) student_id, engagement_level, engagement_trend
+    FROM engagement_scores
+    ORDER BY student_id, date DESC, id DESC
+) latest ON latest.student_id = agg.student_id
+LEFT JOIN LATERAL (
+    SELECT engagement_level
+    FROM engagement_scores
+    WHERE student_id = agg.student_id AND date = agg.last_declining_date_7d
+    ORDER BY id DESC
+    LIMIT 1
+) declining ON true
+""").execute_if(dialect="postgresql"))
+
+# REFRESH ... CONCURRENTLY requires a unique index on the view
+event.listen(Base.metadata, "after_create", DDL(
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{STUDENT_ENGAGEMENT_AGG_VIEW}_student "
+    f"ON {STUDENT_ENGAGEMENT_AGG_VIEW} (student_id)"
+).execute_if(dialect="postgresql"))
+
+# Leaderboard top-N reads straight off this index instead of sorting the view
+event.listen(Base.metadata, "after_create", DDL(
+    f"CREATE INDEX IF NOT EXISTS ix_{STUDENT_ENGAGEMENT_AGG_VIEW}_avg_score "
+    f"ON {STUDENT_ENGAGEMENT_AGG_VIEW} (avg_score DESC, student_id)"
+).execute_if(dialect="postgresql"))
+
+event.listen(Base.metadata, "before_drop", DDL(
+    f"DROP MATERIALIZED VIEW IF EXISTS {STUDENT_ENGAGEMENT_AGG_VIEW}"
+).execute_if(dialect="postgresql"))
+
+# Read-only mapping for queries; kept off Base.metadata so create_all skips it
+StudentEngagementAggregate = Table(
+    STUDENT_ENGAGEMENT_AGG_VIEW,
+    MetaData(),
+    Column("student_id", String(50), primary_key=True),
+    Column("avg_score", FixedPointScore),
+    Column("avg_score_30d", FixedPointScore),
+    Column("days_tracked", Integer),
+    Column("last_date", Date),
+    Column("declining_days_7d", Integer),
+    Column("last_declining_date_7d", Date),
+    Column("latest_level", ENGAGEMENT_LEVEL_ENUM),
+    Column("latest_trend", ENGAGEMENT_TREND_ENUM),
+    # Level on last_declining_date_7d, for the declining list
+    Column("latest_declining_level", ENGAGEMENT_LEVEL_ENUM),
+)
+
+
+# ============================================================================
+# Materialized view: latest score and prediction per student
+# ============================================================================
+
+# One row per (institute, student) holding the most recent engagement score and
+# disengagement prediction; backs /stats and /students/list. Refreshed together
+# with the aggregate view above.
+STUDENT_LATEST_METRICS_VIEW = "student_latest_metrics"
+
+event.listen(Base.metadata, "after_create", DDL(f"""
+CREATE MATERIALIZED VIEW IF NOT EXISTS {STUDENT_LATEST_METRICS_VIEW} AS
+SELECT COALESCE(s.institute_id, p.institute_id) AS institute_id,
+       COALESCE(s.student_id, p.student_id) AS student_id,
+       s.date AS latest_score_date,
+       s.engagement_score,
+       s.engagement_level,
+       s.engagement_trend,
+       p.prediction_date AS latest_prediction_date,
+       p.at_risk,
+       p.risk_level AS latest_risk_level,
+       p.risk_probability AS latest_risk_probability
+FROM (
+    SELECT DISTINCT ON (institute_id, student_id)
+           institute_id, student_id, date, engagement_score, engagement_level, engagement_trend
+    FROM engagement_scores
+    ORDER BY institute_id, student_id, date DESC, id DESC
+) s
+FULL JOIN (
+    SELECT DISTINCT ON (institute_id, student_id)
+           institute_id, student_id, prediction_date, at_risk, risk_level, risk_probability
+    FROM disengagement_predictions
+    ORDER BY institute_id, student_id, prediction_date DESC, id DESC
+) p ON p.institute_id = s.institute_id AND p.student_id = s.student_id
+""").execute_if(dialect="postgresql"))
+
+event.listen(Base.metadata, "after_create", DDL(
+    f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{STUDENT_LATEST_METRICS_VIEW}_institute_student "
+    f"ON {STUDENT_LATEST_METRICS_VIEW} (institute_id, student_id)"
+).execute_if(dialect="postgresql"))
+
+# Keyset pagination order for /students/list
+event.listen(Base.metadata, "after_create", DDL(
+    f"CREATE INDEX IF NOT EXISTS ix_{STUDENT_LATEST_METRICS_VIEW}_institute_score "
+    f"ON {STUDENT_LATEST_METRICS_VIEW} (institute_id, engagement_score DESC, student_id DESC)"
+).execute_if(dialect="postgresql"))
+
+event.listen(Base.metadata, "before_drop", DDL(
+    f"DROP MATERIALIZED VIEW IF EXISTS {STUDENT_LATEST_METRICS_VIEW}"
+).execute_if(dialect="postgresql"))
+
+StudentLatestMetrics = Table(
+    STUDENT_LATEST_METRICS_VIEW,
+    MetaData(),
+    Column("institute_id", String(100), primary_key=True),
+    Column("student_id", String(50), primary_key=True),
+    Column("latest_score_date", Date),
+    Column("engagement_score", FixedPointScore),
+    Column("engagement_level", ENGAGEMENT_LEVEL_ENUM),
+    Column("engagement_trend", ENGAGEMENT_TREND_ENUM),
+    Column("latest_prediction_date", Date),
+    Column("at_risk", Boolean),
+    Column("latest_risk_level", RISK_LEVEL_ENUM),
+    Column("latest_risk_probability", Float),
+)
@@ -160,6 +160,8 @@ class StudentAnalytics(BaseModel):
     latest_prediction: Optional[DisengagementPredictionResponse]
     engagement_history: List[EngagementScoreResponse]
     risk_history: List[DisengagementPredictionResponse]
+    score_std: Optional[float] = Field(None, description="Population std-dev of engagement scores over the window")
+    trend_slope: Optional[float] = Field(None, description="Least-squares slope of engagement score per day over the window")
 
 
 class BatchPredictionRequest(BaseModel):
@@ -8,9 +8,10 @@ Three-step process that should run after every event ingest (or in batch):
 """
 
 from datetime import date, datetime, time, timedelta
-from typing import Optional
+from typing import List, Optional
 
-from sqlalchemy import func, desc, and_, cast, Date
+from sqlalchemy import func, desc, and_, case, cast, select, Date, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.orm import Session
 
 from app.models import (
@@ -18,8 +19,16 @@ from app.models import (
     DailyEngagementMetric,
     EngagementScore,
     DisengagementPrediction,
+    ModelMetadata,
+)
+from app.models.engagement import (
+    ACTIVITY_EVENTS_DEFAULT_PARTITION,
+    FixedPointScore,
+    STUDENT_ENGAGEMENT_AGG_VIEW,
+    STUDENT_LATEST_METRICS_VIEW,
 )
 from app.services.ml_service import get_disengagement_ml_service, RISK_THRESHOLDS
+from app.services.student_service import student_pk_subquery
 
 # ---------------------------------------------------------------------------
 # Weight configuration for component scores  (must sum to 1.0)
@@ -39,6 +48,30 @@ MAX_PAGE_VIEWS = 30
 MAX_FORUM_ACTIONS = 10
 MAX_ASSIGNMENT_ACTIONS = 5
 
+# Daily metric count columns (SMALLINT) and the event types each one counts
+SMALLINT_MAX = 32767
+EVENT_COUNT_COLUMNS = {
+    "login_count": ("login",),
+    "page_views": ("page_view",),
+    "video_plays": ("video_play",),
+    "quiz_attempts": ("quiz_start", "quiz_submit"),
+    "assignments_submitted": ("assignment_submit",),
+    "forum_posts": ("forum_post",),
+    "forum_replies": ("forum_reply",),
+    "resource_downloads": ("resource_download",),
+    "content_interactions": ("content_interaction",),
+}
+
+
+def _upsert(db: Session, model, constraint: str, values: dict):
+    """INSERT ... ON CONFLICT DO UPDATE a single row and return it as an ORM instance."""
+    stmt = pg_insert(model).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        constraint=constraint,
+        set_={name: stmt.excluded[name] for name in values},
+    ).returning(model)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
 
 def _clamp(value: float, lo: float = 0.0, hi: float = 100.0) -> float:
     return max(lo, min(hi, value))
@@ -53,95 +86,76 @@ def aggregate_daily_metrics(
 ) -> DailyEngagementMetric:
     day_start = datetime.combine(target_date, time.min)
     day_end = datetime.combine(target_date, time.max)
-
-    events = (
-        db.query(StudentActivityEvent)
-        .filter(
+    ts = StudentActivityEvent.event_timestamp
+    event_type = StudentActivityEvent.event_type
+    session_id = func.nullif(StudentActivityEvent.session_id, "")
+
+    # Roll events up per session first (events without a session form one
+    # group), then total the sessions, so the day is aggregated in one query
+    per_session = (
+        select(
+            session_id.label("session_id"),
+            # single-event session gets 2 min
+            case(
+                (func.count() >= 2, func.extract("epoch", func.max(ts) - func.min(ts)) / 60),
+                else_=2.0,
+            ).label("minutes"),
+            func.min(ts).filter(event_type == "login").label("first_login"),
+            func.max(ts).filter(event_type == "login").label("last_login"),
+            *[
+                func.count().filter(event_type.in_(types)).label(name)
+                for name, types in EVENT_COUNT_COLUMNS.items()
+            ],
+        )
+        .where(
             StudentActivityEvent.student_id == student_id,
             StudentActivityEvent.institute_id == institute_id,
-            StudentActivityEvent.event_timestamp >= day_start,
-            StudentActivityEvent.event_timestamp <= day_end,
+            ts >= day_start,
+            ts <= day_end,
         )
-        .all()
+        .group_by(session_id)
+        .subquery()
     )
-
-    login_count = sum(1 for e in events if e.event_type == "login")
-    page_views = sum(1 for e in events if e.event_type == "page_view")
-    video_plays = sum(1 for e in events if e.event_type == "video_play")
-    video_completes = sum(1 for e in events if e.event_type == "video_complete")
-    quiz_attempts = sum(1 for e in events if e.event_type in ("quiz_start", "quiz_submit"))
-    assignments_submitted = sum(1 for e in events if e.event_type == "assignment_submit")
-    forum_posts = sum(1 for e in events if e.event_type == "forum_post")
-    forum_replies = sum(1 for e in events if e.event_type == "forum_reply")
-    resource_downloads = sum(1 for e in events if e.event_type == "resource_download")
-    content_interactions = sum(1 for e in events if e.event_type == "content_interaction")
-
-    # Session duration approximation from distinct session_ids
-    session_ids = {e.session_id for e in events if e.session_id}
-    total_sessions = len(session_ids)
-    total_session_minutes = 0.0
-    longest_session = 0.0
-    for sid in session_ids:
-        sess_events = sorted(
-            [e for e in events if e.session_id == sid],
-            key=lambda e: e.event_timestamp,
+    session_minutes = case((per_session.c.session_id.isnot(None), per_session.c.minutes))
+    totals = db.execute(
+        select(
+            func.count(per_session.c.session_id).label("total_sessions"),
+            func.coalesce(func.sum(session_minutes), 0).label("total_session_minutes"),
+            func.coalesce(func.max(session_minutes), 0).label("longest_session"),
+            func.min(per_session.c.first_login).label("first_login"),
+            func.max(per_session.c.last_login).label("last_login"),
+            *[
+                func.coalesce(func.sum(per_session.c[name]), 0).label(name)
+                for name in EVENT_COUNT_COLUMNS
+            ],
         )
-        if len(sess_events) >= 2:
-            duration = (sess_events[-1].event_timestamp - sess_events[0].event_timestamp).total_seconds() / 60
-        else:
-            duration = 2.0  # single-event session gets 2 min
-        total_session_minutes += duration
-        longest_session = max(longest_session, duration)
+    ).one()
 
+    counts = {name: min(int(getattr(totals, name)), SMALLINT_MAX) for name in EVENT_COUNT_COLUMNS}
+    total_sessions = totals.total_sessions
+    total_session_minutes = float(totals.total_session_minutes)
+    longest_session = float(totals.longest_session)
     avg_session = total_session_minutes / total_sessions if total_sessions else 0.0
 
-    first_login_time = None
-    last_login_time = None
-    login_events = sorted(
-        [e for e in events if e.event_type == "login"],
-        key=lambda e: e.event_timestamp,
-    )
-    if login_events:
-        first_login_time = login_events[0].event_timestamp.time()
-        last_login_time = login_events[-1].event_timestamp.time()
+    first_login_time = totals.first_login.time() if totals.first_login else None
+    last_login_time = totals.last_login.time() if totals.last_login else None
 
-    # Upsert
-    existing = (
-        db.query(DailyEngagementMetric)
-        .filter(
-            DailyEngagementMetric.student_id == student_id,
-            DailyEngagementMetric.institute_id == institute_id,
-            DailyEngagementMetric.date == target_date,
-        )
-        .first()
-    )
-    if existing:
-        metric = existing
-    else:
-        metric = DailyEngagementMetric(student_id=student_id, institute_id=institute_id, date=target_date)
-        db.add(metric)
-
-    metric.login_count = login_count
-    metric.first_login_time = first_login_time
-    metric.last_login_time = last_login_time
-    metric.total_sessions = total_sessions
-    metric.total_session_duration_minutes = round(total_session_minutes, 2)
-    metric.avg_session_duration_minutes = round(avg_session, 2)
-    metric.longest_session_minutes = round(longest_session, 2)
-    metric.page_views = page_views
-    metric.unique_pages_viewed = page_views  # simplified
-    metric.content_interactions = content_interactions
-    metric.video_plays = video_plays
-    metric.video_watch_minutes = round(video_plays * 5.0, 2)  # ~5 min per play
-    metric.resource_downloads = resource_downloads
-    metric.forum_posts = forum_posts
-    metric.forum_replies = forum_replies
-    metric.quiz_attempts = quiz_attempts
-    metric.assignments_submitted = assignments_submitted
-    metric.updated_at = datetime.utcnow()
-
-    db.flush()
-    return metric
+    return _upsert(db, DailyEngagementMetric, "uq_daily_metric_student_date", {
+        "student_id": student_id,
+        "student_pk": student_pk_subquery(student_id),
+        "institute_id": institute_id,
+        "date": target_date,
+        **counts,
+        "first_login_time": first_login_time,
+        "last_login_time": last_login_time,
+        "total_sessions": min(total_sessions, SMALLINT_MAX),
+        "total_session_duration_minutes": round(total_session_minutes, 2),
+        "avg_session_duration_minutes": round(avg_session, 2),
+        "longest_session_minutes": round(longest_session, 2),
+        "unique_pages_viewed": counts["page_views"],  # simplified
+        "video_watch_minutes": round(counts["video_plays"] * 5.0, 2),  # ~5 min per play
+        "updated_at": datetime.utcnow(),
+    })
 
 
 # ======================================================================== #
@@ -190,49 +204,29 @@ def compute_engagement_score(
     else:
         level = "Low"
 
-    # Lag & trend
-    prev_1 = (
-        db.query(EngagementScore)
-        .filter(
-            EngagementScore.student_id == student_id,
-            EngagementScore.institute_id == institute_id,
-            EngagementScore.date == target_date - timedelta(days=1),
-        )
-        .first()
-    )
-    prev_7_scores = (
-        db.query(EngagementScore)
-        .filter(
+    # Lag & trend: previous day, 7 days back, and the averages over the previous
+    # 7 / 30 days, all from one pass over the last 30 days of scores
+    prev_score = EngagementScore.engagement_score
+    prev_date = EngagementScore.date
+    window_7 = prev_date >= target_date - timedelta(days=7)
+    history = db.execute(
+        select(
+            func.max(prev_score).filter(prev_date == target_date - timedelta(days=1)).label("lag_1"),
+            (func.array_agg(aggregate_order_by(prev_score, prev_date)).filter(window_7))[1].label("lag_7"),
+            func.avg(prev_score, type_=FixedPointScore).filter(window_7).label("avg_7"),
+            func.avg(prev_score, type_=FixedPointScore).label("avg_30"),
+        ).where(
             EngagementScore.student_id == student_id,
             EngagementScore.institute_id == institute_id,
-            EngagementScore.date >= target_date - timedelta(days=7),
-            EngagementScore.date < target_date,
+            prev_date >= target_date - timedelta(days=30),
+            prev_date < target_date,
         )
-        .all()
-    )
-    prev_30_scores = (
-        db.query(EngagementScore)
-        .filter(
-            EngagementScore.student_id == student_id,
-            EngagementScore.institute_id == institute_id,
-            EngagementScore.date >= target_date - timedelta(days=30),
-            EngagementScore.date < target_date,
-        )
-        .all()
-    )
+    ).one()
 
-    lag_1 = prev_1.engagement_score if prev_1 else None
-    lag_7 = prev_7_scores[0].engagement_score if prev_7_scores else None
-    avg_7 = (
-        round(sum(s.engagement_score for s in prev_7_scores) / len(prev_7_scores), 2)
-        if prev_7_scores
-        else None
-    )
-    avg_30 = (
-        round(sum(s.engagement_score for s in prev_30_scores) / len(prev_30_scores), 2)
-        if prev_30_scores
-        else None
-    )
+    lag_1 = history.lag_1
+    lag_7 = history.lag_7
+    avg_7 = round(history.avg_7, 2) if history.avg_7 is not None else None
+    avg_30 = round(history.avg_30, 2) if history.avg_30 is not None else None
 
     change = round(composite - lag_1, 2) if lag_1 is not None else None
     if change is not None:
@@ -240,39 +234,26 @@ def compute_engagement_score(
     else:
         trend = "Stable"
 
-    # Upsert
-    existing = (
-        db.query(EngagementScore)
-        .filter(
-            EngagementScore.student_id == student_id,
-            EngagementScore.institute_id == institute_id,
-            EngagementScore.date == target_date,
-        )
-        .first()
-    )
-    if existing:
-        score = existing
-    else:
-        score = EngagementScore(student_id=student_id, institute_id=institute_id, date=target_date)
-        db.add(score)
-
-    score.login_score = round(login_score, 2)
-    score.session_score = round(session_score, 2)
-    score.interaction_score = round(interaction_score, 2)
-    score.forum_score = round(forum_score, 2)
-    score.assignment_score = round(assignment_score, 2)
-    score.engagement_score = composite
-    score.engagement_level = level
-    score.engagement_score_lag_1day = lag_1
-    score.engagement_score_lag_7days = lag_7
-    score.engagement_change = change
-    score.engagement_trend = trend
-    score.rolling_avg_7days = avg_7
-    score.rolling_avg_30days = avg_30
-    score.created_at = datetime.utcnow()
-
-    db.flush()
-    return score
+    return _upsert(db, EngagementScore, "uq_engagement_score_student_date", {
+        "student_id": student_id,
+        "student_pk": student_pk_subquery(student_id),
+        "institute_id": institute_id,
+        "date": target_date,
+        "login_score": round(login_score, 2),
+        "session_score": round(session_score, 2),
+        "interaction_score": round(interaction_score, 2),
+        "forum_score": round(forum_score, 2),
+        "assignment_score": round(assignment_score, 2),
+        "engagement_score": composite,
+        "engagement_level": level,
+        "engagement_score_lag_1day": lag_1,
+        "engagement_score_lag_7days": lag_7,
+        "engagement_change": change,
+        "engagement_trend": trend,
+        "rolling_avg_7days": avg_7,
+        "rolling_avg_30days": avg_30,
+        "created_at": datetime.utcnow(),
+    })
 
 
 # ======================================================================== #
@@ -373,36 +354,36 @@ def generate_prediction(
         {"feature": "engagement_level",  "importance": 0.15},
     ])
 
-    # Upsert for today
-    today = date.today()
-    existing = (
-        db.query(DisengagementPrediction)
-        .filter(
-            DisengagementPrediction.student_id == student_id,
-            DisengagementPrediction.institute_id == institute_id,
-            DisengagementPrediction.prediction_date == today,
-        )
-        .first()
+    # Feature importance is per model version, stored once in model_metadata;
+    # the row is only rewritten when the model's importances changed
+    stmt = pg_insert(ModelMetadata).values(
+        model_version=result["model_version"],
+        model_type=result["model_type"],
+        feature_importance=feature_importance[:5],
+        created_at=datetime.utcnow(),
     )
-    if existing:
-        pred = existing
-    else:
-        pred = DisengagementPrediction(student_id=student_id, institute_id=institute_id, prediction_date=today)
-        db.add(pred)
-
-    pred.at_risk              = result["at_risk"]
-    pred.risk_probability     = result["risk_probability"]
-    pred.risk_level           = result["risk_level"]
-    pred.contributing_factors = factors
-    pred.feature_importance   = feature_importance[:5]
-    pred.model_version        = result["model_version"]
-    pred.model_type           = result["model_type"]
-    pred.confidence_score     = result["confidence_score"]
-    pred.prediction_horizon_days = 7
-    pred.created_at           = datetime.utcnow()
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[ModelMetadata.model_version],
+        set_={"model_type": stmt.excluded.model_type, "feature_importance": stmt.excluded.feature_importance},
+        where=ModelMetadata.feature_importance.is_distinct_from(stmt.excluded.feature_importance),
+    ))
 
-    db.flush()
-    return pred
+    # Upsert for today
+    return _upsert(db, DisengagementPrediction, "uq_prediction_student_date", {
+        "student_id":           student_id,
+        "student_pk":           student_pk_subquery(student_id),
+        "institute_id":         institute_id,
+        "prediction_date":      date.today(),
+        "at_risk":              result["at_risk"],
+        "risk_probability":     result["risk_probability"],
+        "risk_level":           result["risk_level"],
+        "contributing_factors": factors,
+        "model_version":        result["model_version"],
+        "model_type":           result["model_type"],
+        "confidence_score":     result["confidence_score"],
+        "prediction_horizon_days": 7,
+        "created_at":           datetime.utcnow(),
+    })
 
 
 # ======================================================================== #
@@ -432,3 +413,92 @@ def run_pipeline(
         "risk_level": prediction.risk_level,
         "risk_probability": prediction.risk_probability,
     }
+
+
+def refresh_rolling_averages(db: Session, since: date) -> int:
+    """
+    Recompute rolling_avg_7days / rolling_avg_30days for scores dated `since` or
+    later in one window-function pass. compute_engagement_score() only sees the
+    days that existed when it ran, so this fixes rows after a backfill or
+    late-arriving events. Rows whose averages change are restamped so cached
+    responses pick them up. Returns the number of rows updated; the caller commits.
+    Scores are SMALLINT hundredths, so rounding to an integer keeps two decimals.
+    """
+    return db.execute(text(f"""
+        UPDATE {EngagementScore.__tablename__} s
+        SET rolling_avg_7days = w.avg_7, rolling_avg_30days = w.avg_30, created_at = now()
+        FROM (
+            SELECT id,
+                   round(avg(engagement_score) OVER (
+                       PARTITION BY student_id, institute_id ORDER BY date
+                       RANGE BETWEEN interval '7 days' PRECEDING AND interval '1 day' PRECEDING
+                   ))::smallint AS avg_7,
+                   round(avg(engagement_score) OVER (
+                       PARTITION BY student_id, institute_id ORDER BY date
+                       RANGE BETWEEN interval '30 days' PRECEDING AND interval '1 day' PRECEDING
+                   ))::smallint AS avg_30
+            FROM {EngagementScore.__tablename__}
+            WHERE date >= :window_start
+        ) w
+        WHERE s.id = w.id AND s.date >= :since
+          AND (s.rolling_avg_7days IS DISTINCT FROM w.avg_7
+               OR s.rolling_avg_30days IS DISTINCT FROM w.avg_30)
+    """), {"since": since, "window_start": since - timedelta(days=30)}).rowcount
+
+
+def refresh_engagement_aggregates(db: Session) -> None:
+    """
+    Rebuild the per-student materialized views after a batch of scores is written.
+    CONCURRENTLY keeps the views readable while they refresh. Callers that also
+    wrote predictions bump PREDICTIONS_GENERATION themselves.
+    """
+    for view in (STUDENT_ENGAGEMENT_AGG_VIEW, STUDENT_LATEST_METRICS_VIEW):
+        db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    db.commit()
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def ensure_activity_event_partitions(
+    db: Session,
+    months_ahead: int = 2,
+    since: Optional[date] = None,
+) -> List[str]:
+    """
+    Create the monthly partitions of student_activity_events from the month of
+    `since` (default: the current month) through `months_ahead` months ahead.
+    Rows that already landed in the DEFAULT partition for a new month are moved
+    into it before it is attached. Returns the names of the partitions created;
+    the caller commits.
+    """
+    parent = StudentActivityEvent.__tablename__
+    first = (since or date.today()).replace(day=1)
+    last = _add_months(date.today().replace(day=1), months_ahead)
+    created = []
+
+    month = first
+    while month <= last:
+        name = f"{parent}_y{month.year:04d}m{month.month:02d}"
+        if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+            # Bounds are UTC midnights; partition bounds cannot be bind parameters
+            lower = f"'{month.isoformat()} 00:00:00+00'"
+            upper = f"'{_add_months(month, 1).isoformat()} 00:00:00+00'"
+            db.execute(text(
+                f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            db.execute(text(
+                f"WITH moved AS ("
+                f"DELETE FROM {ACTIVITY_EVENTS_DEFAULT_PARTITION} "
+                f"WHERE event_timestamp >= {lower} AND event_timestamp < {upper} RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            ))
+            db.execute(text(
+                f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM ({lower}) TO ({upper})"
+            ))
+            created.append(name)
+        month = _add_months(month, 1)
+
+    return created
@@ -10,11 +10,13 @@ Uses engagement features to generate adaptive study schedules:
 from typing import Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc
+from sqlalchemy.dialects.postgresql import DATERANGE
 from datetime import date, datetime, timedelta
 import math
 import json
 
 from app.models import EngagementScore, StudySchedule
+from app.services.student_service import student_pk_subquery
 
 
 class SchedulingService:
@@ -484,14 +486,24 @@ class SchedulingService:
     
     def save_schedule(self, schedule: StudySchedule) -> StudySchedule:
         """Save schedule to database"""
-        # Check if schedule already exists for this week
-        existing = self.db.query(StudySchedule).filter(
+        # excl_schedule_student_week allows one schedule per student per day, so
+        # the new week replaces every schedule it overlaps
+        week_range = func.daterange(schedule.week_start_date, schedule.week_end_date, '[]', type_=DATERANGE)
+        overlapping = self.db.query(StudySchedule).filter(
             StudySchedule.student_id == schedule.student_id,
-            StudySchedule.week_start_date == schedule.week_start_date
-        ).first()
-        
-        if existing:
+            StudySchedule.week_range.overlaps(week_range)
+        ).order_by(StudySchedule.week_start_date).all()
+        
+        if overlapping:
+            existing, superseded = overlapping[0], overlapping[1:]
+            for old in superseded:
+                self.db.delete(old)
+            # Deletes must reach the database before the update moves the week
+            self.db.flush()
+            
             # Update existing schedule
+            existing.week_start_date = schedule.week_start_date
+            existing.week_end_date = schedule.week_end_date
             existing.session_length_minutes = schedule.session_length_minutes
             existing.sessions_per_day = schedule.sessions_per_day
             existing.total_study_minutes_per_day = schedule.total_study_minutes_per_day
@@ -505,6 +517,7 @@ class SchedulingService:
             return existing
         else:
             # Create new schedule
+            schedule.student_pk = student_pk_subquery(schedule.student_id)
             self.db.add(schedule)
             self.db.commit()
             self.db.refresh(schedule)
@@ -522,10 +535,10 @@ class SchedulingService:
                 StudySchedule.student_id == student_id
             ).order_by(desc(StudySchedule.week_start_date)).first()
         else:
-            # Get schedule for specific week
+            # Get the schedule whose week covers the given date
             schedule = self.db.query(StudySchedule).filter(
                 StudySchedule.student_id == student_id,
-                StudySchedule.week_start_date == week_start_date
+                StudySchedule.week_range.contains(week_start_date)
             ).first()
         
         return schedule
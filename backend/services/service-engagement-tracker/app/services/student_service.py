@@ -0,0 +1,40 @@
+"""
+Student registry: maps external LMS student ids to the integer students.id
+surrogate key stored as student_pk on the fact tables.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import Student
+
+
+def resolve_student_pks(db: Session, external_ids: Iterable[str]) -> Dict[str, int]:
+    """Return students.id for each external id, registering ids seen for the first time."""
+    wanted = set(external_ids)
+    if not wanted:
+        return {}
+
+    lookup = select(Student.external_id, Student.id).where(Student.external_id.in_(wanted))
+    pks = dict(db.execute(lookup).all())
+    missing = sorted(wanted - pks.keys())
+    if missing:
+        # Sorted so concurrent registrations lock rows in the same order
+        db.execute(
+            pg_insert(Student)
+            .values([{"external_id": external_id} for external_id in missing])
+            .on_conflict_do_nothing(index_elements=[Student.external_id])
+        )
+        pks.update(db.execute(lookup.where(Student.external_id.in_(missing))).all())
+    return pks
+
+
+def resolve_student_pk(db: Session, external_id: str) -> int:
+    return resolve_student_pks(db, [external_id])[external_id]
+
+
+def student_pk_subquery(external_id: str):
+    """students.id as a scalar subquery, for INSERT/UPDATE values of registered students."""
+    return select(Student.id).where(Student.external_id == external_id).scalar_subquery()
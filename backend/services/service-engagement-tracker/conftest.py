@@ -0,0 +1,12 @@
+"""Pytest configuration"""
+
+import sys
+from pathlib import Path
+
+# Service root for app.*, repository root for the shared backend package,
+# as app/main.py does
+service_root = Path(__file__).parent
+repo_root = service_root.parent.parent.parent
+for path in (service_root, repo_root):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,48 @@
+"""
+Rebuild the per-student engagement aggregate view of an existing database with
+its latest_declining_level column.
+
+New databases get the column from init_db.py; run this script once against
+databases created before it was added. A materialized view cannot gain a
+column in place, so the view is dropped and re-created (and repopulated) in one
+transaction. Views that already have the column are skipped.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/add_declining_level_column.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import engine, Base
+from app.models import StudentEngagementAggregate
+from app.models.engagement import STUDENT_ENGAGEMENT_AGG_VIEW
+
+
+def main():
+    with engine.begin() as conn:
+        # Materialized views are absent from information_schema.columns
+        current = set(conn.execute(
+            text(
+                "SELECT attname FROM pg_attribute "
+                "WHERE attrelid = to_regclass(:view) AND attnum > 0 AND NOT attisdropped"
+            ),
+            {"view": STUDENT_ENGAGEMENT_AGG_VIEW},
+        ).scalars())
+        missing = [column.name for column in StudentEngagementAggregate.columns if column.name not in current]
+        if current and not missing:
+            print(f"  SKIP  {STUDENT_ENGAGEMENT_AGG_VIEW}")
+            return
+
+        conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {STUDENT_ENGAGEMENT_AGG_VIEW}"))
+        # Tables already exist; this only re-runs the view DDL
+        Base.metadata.create_all(conn)
+        print(f"  OK  {STUDENT_ENGAGEMENT_AGG_VIEW}: {', '.join(missing)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Add the generated week_range column and the no-overlap exclusion constraint to
+the study_schedules table of an existing database.
+
+New databases get both from init_db.py; run this script once against databases
+created before they were added. The constraint needs the btree_gist extension,
+which is created if missing. Where a student already has overlapping schedules,
+only the one with the latest week is kept, as save_schedule would have done.
+The column is computed during a table rewrite, so run it while schedule
+generation is paused.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/add_schedule_week_range.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.schema import AddConstraint, CreateColumn
+
+from app.core.database import engine
+from app.models import StudySchedule
+
+
+def main():
+    table = StudySchedule.__table__
+    column = table.c.week_range
+    exclusions = [
+        constraint for constraint in table.constraints
+        if isinstance(constraint, ExcludeConstraint)
+    ]
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+        column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column_ddl}"))
+        print(f"  OK  {table.name}.{column.name}")
+
+        for constraint in exclusions:
+            exists = conn.execute(
+                text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                {"name": constraint.name},
+            ).scalar()
+            if exists:
+                print(f"  SKIP  {table.name}.{constraint.name}")
+                continue
+
+            removed = conn.execute(text(
+                f"DELETE FROM {table.name} a USING {table.name} b "
+                f"WHERE a.student_id = b.student_id AND a.id <> b.id "
+                f"AND a.week_range && b.week_range "
+                f"AND (a.week_start_date, a.id) < (b.week_start_date, b.id)"
+            )).rowcount
+            conn.execute(AddConstraint(constraint))
+            print(f"  OK  {table.name}.{constraint.name} ({removed} overlapping removed)")
+
+
+if __name__ == "__main__":
+    main()
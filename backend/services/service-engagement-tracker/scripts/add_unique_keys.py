@@ -0,0 +1,62 @@
+"""
+Add the one-row-per-day unique keys to the aggregate tables of an existing
+database.
+
+New databases get these constraints from init_db.py; run this script once
+against databases created before they were added. Duplicate rows for the same
+(student, day, institute) are removed first, keeping the most recent one. Each
+key's index is built CONCURRENTLY and then attached as the constraint. Run
+create_indexes.py afterwards to drop the (student_id, date) indexes the keys
+replace.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/add_unique_keys.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import UniqueConstraint, text
+
+from app.core.database import engine
+from app.models import DailyEngagementMetric, EngagementScore, DisengagementPrediction
+
+
+def main():
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for model in (DailyEngagementMetric, EngagementScore, DisengagementPrediction):
+            table = model.__table__
+            for constraint in table.constraints:
+                if not isinstance(constraint, UniqueConstraint):
+                    continue
+                exists = conn.execute(
+                    text("SELECT 1 FROM pg_constraint WHERE conname = :name"),
+                    {"name": constraint.name},
+                ).scalar()
+                if exists:
+                    print(f"  SKIP  {table.name}.{constraint.name}")
+                    continue
+
+                columns = [column.name for column in constraint.columns]
+                same_key = " AND ".join(f"a.{name} = b.{name}" for name in columns)
+                removed = conn.execute(text(
+                    f"DELETE FROM {table.name} a USING {table.name} b "
+                    f"WHERE a.id < b.id AND {same_key}"
+                )).rowcount
+
+                conn.execute(text(
+                    f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {constraint.name} "
+                    f"ON {table.name} ({', '.join(columns)})"
+                ))
+                conn.execute(text(
+                    f"ALTER TABLE {table.name} ADD CONSTRAINT {constraint.name} "
+                    f"UNIQUE USING INDEX {constraint.name}"
+                ))
+                print(f"  OK  {table.name}.{constraint.name} ({removed} duplicates removed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Create the students table in an existing database, register every student id
+found in the fact tables and backfill their student_pk columns.
+
+New databases get the table and columns from init_db.py; run this script once
+against databases created before they were added, then run create_indexes.py
+to build the student_pk indexes. Rows that already have a student_pk are left
+alone, so the script can be re-run.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/backfill_student_keys.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.models import (
+    Student,
+    StudentActivityEvent,
+    DailyEngagementMetric,
+    EngagementScore,
+    DisengagementPrediction,
+    InterventionLog,
+    StudySchedule,
+)
+
+FACT_MODELS = [
+    StudentActivityEvent,
+    DailyEngagementMetric,
+    EngagementScore,
+    DisengagementPrediction,
+    InterventionLog,
+    StudySchedule,
+]
+
+
+def main():
+    students = Student.__tablename__
+    with engine.begin() as conn:
+        Student.__table__.create(conn, checkfirst=True)
+
+        for model in FACT_MODELS:
+            table = model.__tablename__
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS student_pk integer REFERENCES {students} (id)"
+            ))
+            registered = conn.execute(text(
+                f"INSERT INTO {students} (external_id, created_at) "
+                f"SELECT DISTINCT student_id, now() FROM {table} "
+                f"ON CONFLICT (external_id) DO NOTHING"
+            )).rowcount
+            updated = conn.execute(text(
+                f"UPDATE {table} t SET student_pk = s.id FROM {students} s "
+                f"WHERE s.external_id = t.student_id AND t.student_pk IS NULL"
+            )).rowcount
+            print(f"  OK  {table}: {registered} new students, {updated} rows backfilled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Convert the fixed-vocabulary VARCHAR columns of an existing database to the
+native PostgreSQL ENUM types declared on the models.
+
+New databases get the ENUM columns from init_db.py; run this script once
+against databases created before the change. The materialized views read these
+columns and partial-index predicates compare them as text, so both are dropped
+and rebuilt in the same transaction. The IN-list CHECK constraints the ENUM
+types replace are dropped as well; columns already converted are skipped.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/convert_enum_columns.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import engine, Base
+from app.models import (
+    StudentActivityEvent,
+    EngagementScore,
+    DisengagementPrediction,
+    InterventionLog,
+)
+from app.models.engagement import STUDENT_ENGAGEMENT_AGG_VIEW, STUDENT_LATEST_METRICS_VIEW
+
+ENUM_COLUMNS = [
+    StudentActivityEvent.__table__.c.event_type,
+    EngagementScore.__table__.c.engagement_level,
+    EngagementScore.__table__.c.engagement_trend,
+    DisengagementPrediction.__table__.c.risk_level,
+    InterventionLog.__table__.c.intervention_type,
+    InterventionLog.__table__.c.status,
+]
+
+# IN-list CHECK constraints made redundant by the ENUM types
+REDUNDANT_CHECKS = [
+    (StudentActivityEvent.__tablename__, "chk_event_type"),
+    (EngagementScore.__tablename__, "chk_engagement_level"),
+    (EngagementScore.__tablename__, "chk_engagement_trend"),
+    (DisengagementPrediction.__tablename__, "chk_risk_level"),
+    (InterventionLog.__tablename__, "chk_intervention_type"),
+    (InterventionLog.__tablename__, "chk_intervention_status"),
+]
+
+
+def main():
+    # A text predicate on an ENUM column is not IMMUTABLE, so these cannot be converted in place
+    partial_indexes = [
+        index
+        for table in {column.table for column in ENUM_COLUMNS}
+        for index in table.indexes
+        if index.dialect_options["postgresql"]["where"] is not None
+    ]
+
+    with engine.begin() as conn:
+        for table, name in REDUNDANT_CHECKS:
+            conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}"))
+            print(f"  DROP  {table}.{name}")
+
+        pending = [
+            column for column in ENUM_COLUMNS
+            if conn.execute(
+                text(
+                    "SELECT udt_name FROM information_schema.columns "
+                    "WHERE table_name = :table AND column_name = :column"
+                ),
+                {"table": column.table.name, "column": column.name},
+            ).scalar() != column.type.name
+        ]
+        if not pending:
+            return
+
+        for view in (STUDENT_ENGAGEMENT_AGG_VIEW, STUDENT_LATEST_METRICS_VIEW):
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view}"))
+        for index in partial_indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+
+        for column in pending:
+            enum_name = column.type.name
+            column.type.create(conn, checkfirst=True)
+            conn.execute(text(
+                f"ALTER TABLE {column.table.name} ALTER COLUMN {column.name} "
+                f"TYPE {enum_name} USING {column.name}::text::{enum_name}"
+            ))
+            print(f"  OK  {column.table.name}.{column.name} -> {enum_name}")
+
+        for index in partial_indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+        # Tables already exist; this only re-runs the view DDL
+        Base.metadata.create_all(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Convert the FLOAT score columns of engagement_scores in an existing database to
+the SMALLINT hundredths (0-10000 for 0-100) declared on the model.
+
+New databases get SMALLINT score columns from init_db.py; run this script once
+against databases created before the change. The materialized views read these
+columns, so they are dropped and rebuilt in the same transaction, and the
+score range CHECK is re-created on the new scale. The table is rewritten under
+an exclusive lock, so run it while ingestion is paused. Columns that already
+have the declared type are skipped.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/convert_fixed_point_scores.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import CheckConstraint, text
+from sqlalchemy.schema import AddConstraint
+
+from app.core.database import engine, Base
+from app.models import EngagementScore
+from app.models.engagement import (
+    FixedPointScore,
+    STUDENT_ENGAGEMENT_AGG_VIEW,
+    STUDENT_LATEST_METRICS_VIEW,
+)
+
+
+def main():
+    table = EngagementScore.__table__
+    range_checks = [
+        constraint for constraint in table.constraints
+        if isinstance(constraint, CheckConstraint) and constraint.name == "chk_engagement_score_range"
+    ]
+
+    with engine.begin() as conn:
+        current = dict(conn.execute(
+            text("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :name"),
+            {"name": table.name},
+        ).all())
+        columns = [
+            column.name for column in table.columns
+            if isinstance(column.type, FixedPointScore) and current.get(column.name) != "smallint"
+        ]
+        if not columns:
+            print(f"  SKIP  {table.name}")
+            return
+
+        for view in (STUDENT_ENGAGEMENT_AGG_VIEW, STUDENT_LATEST_METRICS_VIEW):
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {view}"))
+        for constraint in range_checks:
+            conn.execute(text(f"ALTER TABLE {table.name} DROP CONSTRAINT IF EXISTS {constraint.name}"))
+
+        # One ALTER TABLE so the table is rewritten once
+        conn.execute(text(
+            f"ALTER TABLE {table.name} "
+            + ", ".join(
+                f"ALTER COLUMN {name} TYPE smallint USING round({name} * 100)::smallint"
+                for name in columns
+            )
+        ))
+        for constraint in range_checks:
+            conn.execute(AddConstraint(constraint))
+        print(f"  OK  {table.name}: {', '.join(columns)}")
+
+        # Tables already exist; this only re-runs the view DDL
+        Base.metadata.create_all(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Create the indexes declared on the models in an existing database.
+
+New databases get these indexes from init_db.py (Base.metadata.create_all);
+run this script once against databases created before an index was added.
+Indexes are built with CREATE INDEX CONCURRENTLY so ingestion is not blocked
+(except on partitioned tables, where PostgreSQL does not support it).
+Indexes that a later schema change made redundant are dropped the same way.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/create_indexes.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import engine, Base
+import app.models  # noqa: F401  (register models on Base.metadata)
+
+# Indexes covered by another index with the same leading columns
+OBSOLETE_INDEXES = [
+    "ix_student_activity_events_student_id",     # ix_activity_events_student_ts
+    "ix_daily_engagement_metrics_student_id",    # uq_daily_metric_student_date
+    "ix_engagement_scores_student_id",           # uq_engagement_score_student_date
+    "ix_disengagement_predictions_student_id",   # uq_prediction_student_date
+    # (student_id, date DESC) indexes replaced by the one-row-per-day unique keys
+    "ix_daily_metrics_student_date",             # uq_daily_metric_student_date
+    "ix_engagement_scores_student_date",         # uq_engagement_score_student_date
+    "ix_predictions_student_date",               # uq_prediction_student_date
+    # btree on event_timestamp replaced by the BRIN index
+    "ix_student_activity_events_event_timestamp",  # brin_events_ts
+]
+
+
+def main():
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            partitioned = table.dialect_options["postgresql"]["partition_by"] is not None
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                index.dialect_options["postgresql"]["concurrently"] = not partitioned
+                conn.execute(CreateIndex(index, if_not_exists=True))
+                print(f"  OK  {table.name}.{index.name}")
+
+        for name in OBSOLETE_INDEXES:
+            # Partitioned indexes (relkind 'I') cannot be dropped concurrently
+            partitioned = conn.execute(
+                text("SELECT relkind = 'I' FROM pg_class WHERE relname = :name"),
+                {"name": name},
+            ).scalar()
+            concurrently = "" if partitioned else "CONCURRENTLY "
+            conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+            print(f"  DROP  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ if sys.platform == 'win32':
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.core.database import engine, Base, init_db, drop_all_tables
+from app.core.database import engine, Base, SessionLocal, init_db, drop_all_tables
 from app.models import (
     StudentActivityEvent,
     DailyEngagementMetric,
@@ -23,6 +23,7 @@ from app.models import (
     InterventionLog,
     StudySchedule
 )
+from app.services.aggregation_service import ensure_activity_event_partitions
 
 
 def create_tables():
@@ -38,9 +39,16 @@ def create_tables():
         # Create all tables
         Base.metadata.create_all(bind=engine)
         
+        # Monthly partitions for the activity events table
+        with SessionLocal() as db:
+            partitions = ensure_activity_event_partitions(db)
+            db.commit()
+        
         print("\n✅ Successfully created tables:")
         for table in Base.metadata.sorted_tables:
             print(f"   - {table.name}")
+        for name in partitions:
+            print(f"   - {name} (partition)")
         
         print("\n" + "=" * 60)
         print("✅ DATABASE INITIALIZATION COMPLETE")
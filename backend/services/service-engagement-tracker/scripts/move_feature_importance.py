@@ -0,0 +1,57 @@
+"""
+Move feature importance off disengagement_predictions into model_metadata.
+
+New databases get the model_metadata table from init_db.py and never had a
+per-prediction feature_importance column; run this script once against
+databases created before the move. For each model version, the importance
+stored on its most recent prediction is copied into model_metadata, and then
+the column is dropped.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/move_feature_importance.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.models import DisengagementPrediction, ModelMetadata
+
+
+def main():
+    predictions = DisengagementPrediction.__tablename__
+    metadata_table = ModelMetadata.__table__
+
+    metadata_table.create(engine, checkfirst=True)
+    print(f"  OK  {metadata_table.name}")
+
+    with engine.begin() as conn:
+        has_column = conn.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = 'feature_importance'"
+            ),
+            {"table": predictions},
+        ).scalar()
+        if not has_column:
+            print(f"  SKIP  {predictions}.feature_importance")
+            return
+
+        copied = conn.execute(text(
+            f"INSERT INTO {metadata_table.name} (model_version, model_type, feature_importance, created_at) "
+            f"SELECT DISTINCT ON (model_version) model_version, model_type, feature_importance, created_at "
+            f"FROM {predictions} ORDER BY model_version, created_at DESC "
+            f"ON CONFLICT (model_version) DO NOTHING"
+        )).rowcount
+        print(f"  OK  {metadata_table.name} ({copied} model versions copied)")
+
+        conn.execute(text(f"ALTER TABLE {predictions} DROP COLUMN feature_importance"))
+        print(f"  DROP  {predictions}.feature_importance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Convert the INTEGER count columns of an existing database to the SMALLINT
+types declared on the models.
+
+New databases get SMALLINT columns from init_db.py; run this script once
+against databases created before the change. Each table is rewritten under an
+exclusive lock, so run it while ingestion is paused. Columns that already
+have the declared type are skipped.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/narrow_integer_columns.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import SmallInteger, text
+
+from app.core.database import engine
+from app.models import DailyEngagementMetric, DisengagementPrediction, StudySchedule
+
+
+def main():
+    with engine.begin() as conn:
+        for model in (DailyEngagementMetric, DisengagementPrediction, StudySchedule):
+            table = model.__table__
+            current = dict(conn.execute(
+                text("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :name"),
+                {"name": table.name},
+            ).all())
+            columns = [
+                column.name for column in table.columns
+                if isinstance(column.type, SmallInteger) and current.get(column.name) == "integer"
+            ]
+            if not columns:
+                print(f"  SKIP  {table.name}")
+                continue
+
+            # One ALTER TABLE so the table is rewritten once
+            conn.execute(text(
+                f"ALTER TABLE {table.name} "
+                + ", ".join(f"ALTER COLUMN {name} TYPE smallint" for name in columns)
+            ))
+            print(f"  OK  {table.name}: {', '.join(columns)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Convert an existing student_activity_events table to the monthly
+range-partitioned layout declared on the model.
+
+New databases are created partitioned by init_db.py; run this script once
+against databases created before partitioning. Everything happens in one
+transaction that holds an exclusive lock on the events table while rows are
+copied, so pause ingestion first. Run create_indexes.py afterwards to build the
+secondary indexes on the partitioned table.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/partition_activity_events.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+from app.models import StudentActivityEvent
+from app.models.engagement import ACTIVITY_EVENTS_DEFAULT_PARTITION
+from app.services.aggregation_service import ensure_activity_event_partitions
+
+
+def main():
+    table = StudentActivityEvent.__tablename__
+    legacy = f"{table}_unpartitioned"
+
+    with SessionLocal() as db:
+        relkind = db.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": table},
+        ).scalar()
+        if relkind == "p":
+            print(f"{table} is already partitioned.")
+            return
+
+        # Move the old table and its index names out of the way
+        db.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        index_names = db.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :name"),
+            {"name": legacy},
+        ).scalars().all()
+        for name in index_names:
+            db.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_unpartitioned"'))
+
+        # Same columns as the old table (later schema scripts add the newer ones);
+        # the primary key must include the partition key
+        db.execute(text(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE (event_timestamp)"
+        ))
+        db.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (event_id, event_timestamp)"))
+        db.execute(text(f"CREATE TABLE {ACTIVITY_EVENTS_DEFAULT_PARTITION} PARTITION OF {table} DEFAULT"))
+
+        oldest = db.execute(text(f"SELECT min(event_timestamp) FROM {legacy}")).scalar()
+        for name in ensure_activity_event_partitions(db, since=oldest.date() if oldest else None):
+            print(f"  OK  {name}")
+
+        copied = db.execute(text(f"INSERT INTO {table} SELECT * FROM {legacy}")).rowcount
+        db.execute(text(f"DROP TABLE {legacy}"))
+        db.commit()
+
+    print(f"Copied {copied} events into {table}.")
+
+
+if __name__ == "__main__":
+    main()
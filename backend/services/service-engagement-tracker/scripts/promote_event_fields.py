@@ -0,0 +1,65 @@
+"""
+Add the typed payload columns to an existing student_activity_events table
+and backfill them from event_data.
+
+New databases get the columns from init_db.py; run this script once against
+databases created before they were added. Keys are promoted with the same
+rules as ingestion (PROMOTED_EVENT_DATA_KEYS): a value that already has the
+column's JSON type moves to the column of the same name and its key is removed
+from event_data; any other value stays in event_data unchanged.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/promote_event_fields.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, engine
+from app.models import StudentActivityEvent
+from app.models.engagement import PROMOTED_EVENT_DATA_KEYS
+
+# JSON values stored as-is in a column of each type. The checks sit inside CASE
+# so the cast only runs once jsonb_typeof has confirmed a number
+TYPE_GUARDS = {
+    # Plain integer literals only: 45.0 and 1e3 are floats on ingestion too
+    int: (
+        "CASE WHEN jsonb_typeof({json}) = 'number' AND {text} ~ '^-?[0-9]{{1,10}}$' "
+        "THEN {text}::numeric BETWEEN -2147483648 AND 2147483647 ELSE false END"
+    ),
+    float: "jsonb_typeof({json}) = 'number'",
+    str: "CASE WHEN jsonb_typeof({json}) = 'string' THEN length({text}) <= {length} ELSE false END",
+}
+
+
+def main():
+    table = StudentActivityEvent.__tablename__
+
+    with SessionLocal() as db:
+        for column in PROMOTED_EVENT_DATA_KEYS:
+            column_type = column.type.compile(dialect=engine.dialect)
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column.key} {column_type}"))
+
+        for column in PROMOTED_EVENT_DATA_KEYS:
+            key = column.key
+            value = f"(event_data->>'{key}')"
+            guard = TYPE_GUARDS[column.type.python_type].format(
+                json=f"(event_data->'{key}')", text=value, length=getattr(column.type, "length", None)
+            )
+            column_type = column.type.compile(dialect=engine.dialect)
+            updated = db.execute(text(
+                f"UPDATE {table} "
+                f"SET {key} = {value}::{column_type}, event_data = event_data - '{key}' "
+                f"WHERE {key} IS NULL AND {guard}"
+            )).rowcount
+            print(f"  OK  {key}: {updated} rows")
+
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
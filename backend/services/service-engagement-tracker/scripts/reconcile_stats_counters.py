@@ -0,0 +1,41 @@
+"""
+Reset the Redis stats counters from authoritative database counts.
+
+The ingest routes keep the per-institute event counter current; writes that
+race with the counter being seeded, or that bypass the API (bulk loads, manual
+deletes), leave it off by a little. Run this script nightly to fix that drift.
+Does nothing when REDIS_URL is not configured.
+
+Usage:
+    cd service-engagement-tracker
+    python scripts/reconcile_stats_counters.py
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+
+from app.core.cache import EVENTS_COUNTER, set_counter
+from app.core.database import SessionLocal
+from app.models import StudentActivityEvent
+
+
+def main():
+    db = SessionLocal()
+    try:
+        counts = db.execute(
+            select(StudentActivityEvent.institute_id, func.count())
+            .group_by(StudentActivityEvent.institute_id)
+        ).all()
+    finally:
+        db.close()
+
+    for institute_id, count in counts:
+        set_counter(EVENTS_COUNTER, count, institute_id=institute_id)
+        print(f"  OK  {institute_id}: {count} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,15 @@ from datetime import date, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.core.cache import PREDICTIONS_GENERATION, bump_generation
 from app.core.database import SessionLocal
 from app.models import StudentActivityEvent
-from app.services.aggregation_service import run_pipeline
+from app.services.aggregation_service import (
+    ensure_activity_event_partitions,
+    refresh_engagement_aggregates,
+    refresh_rolling_averages,
+    run_pipeline,
+)
 
 from sqlalchemy import func
 
@@ -25,6 +31,11 @@ def main(days: int = 14):
     db = SessionLocal()
     cutoff = date.today() - timedelta(days=days)
 
+    # Keep partitions ahead of ingestion; run this script at least monthly
+    for name in ensure_activity_event_partitions(db):
+        print(f"Created partition {name}")
+    db.commit()
+
     rows = (
         db.query(StudentActivityEvent.student_id, StudentActivityEvent.event_timestamp)
         .filter(StudentActivityEvent.event_timestamp >= cutoff)
@@ -50,6 +61,12 @@ def main(days: int = 14):
             print(f"  ERR {sid} {d}  {exc}")
             fail += 1
 
+    if ok:
+        # Days processed out of order leave later rolling averages stale
+        print(f"Rolling averages refreshed on {refresh_rolling_averages(db, cutoff)} scores.")
+        refresh_engagement_aggregates(db)
+        bump_generation(PREDICTIONS_GENERATION)
+
     print(f"\nDone. Processed={ok}, Errors={fail}")
     db.close()
 
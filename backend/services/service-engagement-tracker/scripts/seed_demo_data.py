@@ -12,9 +12,15 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
+from app.core.cache import PREDICTIONS_GENERATION, bump_generation
 from app.core.database import SessionLocal
 from app.models import DailyEngagementMetric, EngagementScore, DisengagementPrediction
-from app.services.aggregation_service import compute_engagement_score, generate_prediction
+from app.services.student_service import resolve_student_pks
+from app.services.aggregation_service import (
+    compute_engagement_score,
+    generate_prediction,
+    refresh_engagement_aggregates,
+)
 
 
 DEMO_STUDENTS = [f"STU{i:04d}" for i in range(1, 26)]
@@ -98,6 +104,7 @@ def seed_demo_data() -> None:
             return
 
         start_date = date.today() - timedelta(days=SEED_DAYS - 1)
+        student_pks = resolve_student_pks(db, DEMO_STUDENTS)
 
         for institute_id in DEMO_INSTITUTES:
             for index, student_id in enumerate(DEMO_STUDENTS):
@@ -128,6 +135,7 @@ def seed_demo_data() -> None:
 
                     metric = DailyEngagementMetric(
                         student_id=student_id,
+                        student_pk=student_pks[student_id],
                         institute_id=institute_id,
                         date=target_date,
                         login_count=login_count,
@@ -165,6 +173,8 @@ def seed_demo_data() -> None:
                 generate_prediction(db, student_id=student_id, institute_id=institute_id)
 
         db.commit()
+        refresh_engagement_aggregates(db)
+        bump_generation(PREDICTIONS_GENERATION)
         print(
             f"Seeded demo engagement data for {len(DEMO_STUDENTS)} students "
             f"across {len(DEMO_INSTITUTES)} institutes."
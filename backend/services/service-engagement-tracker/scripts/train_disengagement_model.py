@@ -4,7 +4,8 @@ Train Disengagement Prediction Model
 This script:
 1. Loads engagement scores from database
 2. Engineers ML features
-3. Trains Gradient Boosting Classifier
+3. Trains a histogram gradient boosting classifier (LightGBM, or scikit-learn's
+   HistGradientBoostingClassifier when lightgbm is not installed)
 4. Evaluates model performance
 5. Generates predictions for all students
 6. Saves predictions to database
@@ -29,19 +30,85 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sqlalchemy import text
+from psycopg.types.json import Jsonb
+try:
+    import adbc_driver_postgresql.dbapi as adbc_postgresql
+except ImportError:  # optional dependency
+    adbc_postgresql = None
+from sqlalchemy import select
 
 # Machine Learning
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+try:
+    from lightgbm import LGBMClassifier
+except ImportError:  # optional dependency
+    LGBMClassifier = None
+try:
+    from numba import njit
+except ImportError:  # optional dependency
+    njit = None
 from sklearn.metrics import (
     classification_report, confusion_matrix, roc_auc_score, 
     roc_curve, accuracy_score
 )
 
 # Database
-from app.core.database import SessionLocal
-from app.models import EngagementScore, DisengagementPrediction
+from app.core.cache import PREDICTIONS_GENERATION, bump_generation
+from app.core.database import SessionLocal, json_serializer
+from app.models import EngagementScore, DisengagementPrediction, ModelMetadata
+from app.models.engagement import FixedPointScore
+from app.services.student_service import resolve_student_pks
+
+
+def _student_feature_kernel(codes, scores, low):
+    """
+    Per-student features in one pass over rows sorted by (student, date).
+
+    codes are integer student codes; running state resets whenever the code
+    changes. Returns lag_3, lag_14, volatility_7 (sample std of the last 7
+    rows, NaN for a single row as in pandas), days_since_start,
+    cumulative_avg and consecutive_low.
+    """
+    n = scores.shape[0]
+    lag_3 = np.full(n, np.nan)
+    lag_14 = np.full(n, np.nan)
+    volatility_7 = np.full(n, np.nan)
+    days_since_start = np.empty(n, np.int64)
+    cumulative_avg = np.empty(n)
+    consecutive_low = np.empty(n, np.int64)
+    
+    start = 0
+    total = 0.0
+    run = 0
+    for i in range(n):
+        if i == 0 or codes[i] != codes[i - 1]:
+            start = i
+            total = 0.0
+        position = i - start
+        
+        total += scores[i]
+        days_since_start[i] = position + 1
+        cumulative_avg[i] = total / (position + 1)
+        if position >= 3:
+            lag_3[i] = scores[i - 3]
+        if position >= 14:
+            lag_14[i] = scores[i - 14]
+        
+        window = scores[max(start, i - 6):i + 1]
+        if window.shape[0] > 1:
+            mean = window.mean()
+            volatility_7[i] = np.sqrt(((window - mean) ** 2).sum() / (window.shape[0] - 1))
+        
+        run = run + 1 if position > 0 and low[i] == low[i - 1] else 1
+        consecutive_low[i] = run if low[i] else 0
+    
+    return lag_3, lag_14, volatility_7, days_since_start, cumulative_avg, consecutive_low
+
+
+# Compiled once and cached next to the script; without numba the pandas path is used
+_student_feature_kernel_jit = njit(cache=True)(_student_feature_kernel) if njit is not None else None
 
 
 class DisengagementPredictor:
@@ -55,38 +122,45 @@ class DisengagementPredictor:
         'low': 0.0      # < 0.4 = Low risk
     }
     
+    # 0/1 trend indicators among the features
+    FLAG_FEATURES = ['is_declining', 'is_improving', 'is_stable']
+    
     def __init__(self, db):
         self.db = db
         self.model = None
         self.feature_columns = None
         self.feature_importance = None
+        self.model_version = None
+        self.student_index = None
     
     def load_data(self) -> pd.DataFrame:
         """Load engagement scores from database"""
         print("\n📥 Loading engagement data from database...")
         
-        query = text("""
-            SELECT 
-                student_id,
-                date,
-                login_score,
-                session_score,
-                interaction_score,
-                forum_score,
-                assignment_score,
-                engagement_score,
-                engagement_level,
-                engagement_score_lag_1day,
-                engagement_score_lag_7days,
-                engagement_change,
-                engagement_trend,
-                rolling_avg_7days,
-                rolling_avg_30days
-            FROM engagement_scores
-            ORDER BY student_id, date
-        """)
-        
-        df = pd.read_sql(query, self.db.bind)
+        # Selected through the model so the SMALLINT fixed-point scores load as floats
+        query = select(
+            EngagementScore.student_id,
+            EngagementScore.institute_id,
+            EngagementScore.date,
+            EngagementScore.login_score,
+            EngagementScore.session_score,
+            EngagementScore.interaction_score,
+            EngagementScore.forum_score,
+            EngagementScore.assignment_score,
+            EngagementScore.engagement_score,
+            EngagementScore.engagement_level,
+            EngagementScore.engagement_score_lag_1day,
+            EngagementScore.engagement_score_lag_7days,
+            EngagementScore.engagement_change,
+            EngagementScore.engagement_trend,
+            EngagementScore.rolling_avg_7days,
+            EngagementScore.rolling_avg_30days,
+        ).order_by(EngagementScore.student_id, EngagementScore.date)
+        
+        if adbc_postgresql is not None:
+            df = self._read_sql_arrow(query)
+        else:
+            df = pd.read_sql(query, self.db.bind)
         
         print(f"✅ Loaded {len(df)} records")
         print(f"   Students: {df['student_id'].nunique()}")
@@ -94,43 +168,112 @@ class DisengagementPredictor:
         
         return df
     
+    def _read_sql_arrow(self, query) -> pd.DataFrame:
+        """
+        Run the query over ADBC: rows arrive as binary COPY and are decoded
+        column-at-a-time into Arrow before pandas sees them, instead of one
+        Python object per cell. The ORM type conversion is bypassed, so the
+        fixed-point score columns are scaled here.
+        """
+        sql = str(query.compile(dialect=self.db.bind.dialect, compile_kwargs={"literal_binds": True}))
+        uri = self.db.bind.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        with adbc_postgresql.connect(uri) as conn:
+            df = pd.read_sql(sql, conn)
+        
+        for column in query.selected_columns:
+            if isinstance(column.type, FixedPointScore):
+                df[column.name] = df[column.name] / FixedPointScore.SCALE
+        return df
+    
     def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Engineer additional features for ML"""
         print("\n🔧 Engineering features...")
         
-        df = df.sort_values(['student_id', 'date'])
+        # Encode student_id once as int32 codes (in student_id order) for every
+        # per-student sort and grouping; student_index maps codes back to ids
+        codes, self.student_index = pd.factorize(df['student_id'], sort=True)
+        df['student_code'] = codes.astype(np.int32)
         
-        # Additional lag features
-        df['engagement_score_lag_3days'] = df.groupby('student_id')['engagement_score'].shift(3)
-        df['engagement_score_lag_14days'] = df.groupby('student_id')['engagement_score'].shift(14)
+        # load_data already orders by (student_id, date); only sort when it didn't
+        if not self._sorted_by_student_date(df):
+            df = df.sort_values(['student_code', 'date'], kind='mergesort')
+        df['low_engagement'] = (df['engagement_score'] < 40).astype(int)
         
-        # Volatility (standard deviation of recent scores)
-        df['engagement_volatility_7days'] = df.groupby('student_id')['engagement_score'].transform(
-            lambda x: x.rolling(window=7, min_periods=1).std()
+        if _student_feature_kernel_jit is not None:
+            self._student_features_numba(df)
+        else:
+            self._student_features_pandas(df)
+        
+        # Trend indicators: one categorical encoding of the labels, then integer
+        # code comparisons instead of three string comparisons
+        trend_labels = ['Declining', 'Improving', 'Stable']
+        trend_codes = pd.Categorical(df['engagement_trend'], categories=trend_labels).codes
+        for code, column in enumerate(['is_declining', 'is_improving', 'is_stable']):
+            df[column] = (trend_codes == code).astype(np.int8)
+        
+        # Component score ratios, evaluated as one expression block (numexpr fuses
+        # the add and divide without temporaries when installed)
+        df.eval(
+            """
+            login_to_session_ratio = login_score / (session_score + 1)
+            interaction_to_forum_ratio = interaction_score / (forum_score + 1)
+            """,
+            inplace=True,
         )
         
-        # Cumulative features
-        df['days_since_start'] = df.groupby('student_id').cumcount() + 1
-        df['cumulative_avg_score'] = df.groupby('student_id')['engagement_score'].expanding().mean().reset_index(level=0, drop=True)
+        print(f"✅ Feature engineering complete - {df.shape[1]} total columns")
         
-        # Trend indicators
-        df['is_declining'] = (df['engagement_trend'] == 'Declining').astype(int)
-        df['is_improving'] = (df['engagement_trend'] == 'Improving').astype(int)
-        df['is_stable'] = (df['engagement_trend'] == 'Stable').astype(int)
+        return df
+    
+    @staticmethod
+    def _sorted_by_student_date(df: pd.DataFrame) -> bool:
+        """Whether rows are ordered by (student_code, date), checked in one linear pass."""
+        codes = df['student_code'].to_numpy()
+        dates = df['date'].to_numpy()
+        same_student = codes[1:] == codes[:-1]
+        return bool(np.all(
+            (codes[1:] > codes[:-1]) | (same_student & (dates[1:] >= dates[:-1]))
+        ))
+    
+    @staticmethod
+    def _student_features_numba(df: pd.DataFrame):
+        """Lag, rolling, cumulative and run-length features from the compiled kernel."""
+        (
+            df['engagement_score_lag_3days'],
+            df['engagement_score_lag_14days'],
+            df['engagement_volatility_7days'],
+            df['days_since_start'],
+            df['cumulative_avg_score'],
+            df['consecutive_low_days'],
+        ) = _student_feature_kernel_jit(
+            df['student_code'].to_numpy(),
+            df['engagement_score'].to_numpy(np.float64),
+            df['low_engagement'].to_numpy(np.int64),
+        )
+    
+    @staticmethod
+    def _student_features_pandas(df: pd.DataFrame):
+        """The same features with grouped pandas operations (numba not installed)."""
+        # One grouping of the student codes shared by every per-student feature;
+        # the frame is already sorted, so groups need no re-sort
+        by_student = df.groupby('student_code', sort=False)
+        scores = by_student['engagement_score']
         
-        # Component score ratios
-        df['login_to_session_ratio'] = df['login_score'] / (df['session_score'] + 1)
-        df['interaction_to_forum_ratio'] = df['interaction_score'] / (df['forum_score'] + 1)
+        # Additional lag features
+        df['engagement_score_lag_3days'] = scores.shift(3)
+        df['engagement_score_lag_14days'] = scores.shift(14)
         
-        # Consecutive low engagement days
-        df['low_engagement'] = (df['engagement_score'] < 40).astype(int)
-        df['consecutive_low_days'] = df.groupby('student_id')['low_engagement'].transform(
-            lambda x: x.groupby((x != x.shift()).cumsum()).cumsum()
-        )
+        # Volatility (standard deviation of recent scores)
+        df['engagement_volatility_7days'] = scores.rolling(window=7, min_periods=1).std().reset_index(level=0, drop=True)
         
-        print(f"✅ Feature engineering complete - {df.shape[1]} total columns")
+        # Cumulative features
+        df['days_since_start'] = by_student.cumcount() + 1
+        df['cumulative_avg_score'] = scores.cumsum() / df['days_since_start']
         
-        return df
+        # Consecutive low engagement days: running count within each run of equal
+        # low_engagement values (a student's first row always starts a new run)
+        runs = (df['low_engagement'] != by_student['low_engagement'].shift()).cumsum()
+        df['consecutive_low_days'] = df['low_engagement'].groupby(runs, sort=False).cumsum()
     
     def prepare_ml_data(self, df: pd.DataFrame):
         """Prepare data for machine learning"""
@@ -161,43 +304,67 @@ class DisengagementPredictor:
             'days_since_start', 'cumulative_avg_score'
         ]
         
-        # Remove rows with NaN in critical features
-        df_ml = df.dropna(subset=['engagement_score_lag_7days', 'rolling_avg_7days']).copy()
+        # Remove rows with NaN in critical features (dropna already returns a new frame)
+        df_ml = df.dropna(subset=['engagement_score_lag_7days', 'rolling_avg_7days'])
         
         print(f"✅ ML dataset prepared:")
         print(f"   Records: {len(df_ml)}")
         print(f"   Features: {len(self.feature_columns)}")
         print(f"   At-Risk Rate: {df_ml['at_risk'].mean()*100:.2f}%")
         
-        # Prepare X and y
-        X = df_ml[self.feature_columns].copy()
-        y = df_ml['at_risk'].copy()
+        # Prepare X and y: float32 features and int8 flags halve the bytes the
+        # histogram binning scans; both estimators accept them natively
+        flag_columns = [c for c in self.FLAG_FEATURES if c in self.feature_columns]
+        X = df_ml[self.feature_columns].astype(np.float32)
+        X[flag_columns] = X[flag_columns].astype(np.int8)
+        y = df_ml['at_risk']
         
-        # Handle any remaining NaN
-        X = X.fillna(0)
+        # Remaining NaN (e.g. lag_14days early on) are handled natively by both estimators
         
         return X, y, df_ml
     
     def train_model(self, X_train, y_train):
-        """Train Gradient Boosting Classifier"""
-        print("\n🚀 Training Gradient Boosting Classifier...")
-        
-        self.model = GradientBoostingClassifier(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=5,
-            min_samples_split=20,
-            min_samples_leaf=10,
-            random_state=42,
-            verbose=0
-        )
-        
-        self.model.fit(X_train, y_train)
+        """Train LightGBM classifier, or HistGradientBoostingClassifier without lightgbm"""
+        if LGBMClassifier is not None:
+            print("\n🚀 Training LightGBM Classifier...")
+            
+            self.model = LGBMClassifier(
+                objective='binary',
+                n_estimators=100,
+                learning_rate=0.1,
+                num_leaves=31,
+                max_depth=-1,
+                min_child_samples=10,
+                n_jobs=-1,
+                random_state=42,
+                verbose=-1
+            )
+            self.model.fit(X_train, y_train)
+            self.model_version = 'v1.1_LightGBM'
+            importances = self.model.feature_importances_
+        else:
+            print("\n🚀 Training HistGradientBoosting Classifier (lightgbm not installed)...")
+            
+            self.model = HistGradientBoostingClassifier(
+                max_iter=100,
+                learning_rate=0.1,
+                max_depth=5,
+                min_samples_leaf=10,
+                early_stopping=True,
+                validation_fraction=0.1,
+                random_state=42
+            )
+            self.model.fit(X_train, y_train)
+            self.model_version = 'v1.1_HistGradientBoosting'
+            # No native feature_importances_; use permutation importance instead
+            importances = permutation_importance(
+                self.model, X_train, y_train, n_repeats=5, n_jobs=-1, random_state=42
+            ).importances_mean
         
         # Store feature importance
         self.feature_importance = pd.DataFrame({
             'feature': self.feature_columns,
-            'importance': self.model.feature_importances_
+            'importance': importances
         }).sort_values('importance', ascending=False)
         
         print("✅ Model trained successfully!")
@@ -211,8 +378,9 @@ class DisengagementPredictor:
         print(f"{'='*60}")
         
         # Make predictions
-        y_pred = self.model.predict(X_test)
+        # One ensemble pass; predict() would re-run predict_proba and take the argmax
         y_pred_proba = self.model.predict_proba(X_test)[:, 1]
+        y_pred = (y_pred_proba > 0.5).astype(int)
         
         # Calculate metrics
         accuracy = accuracy_score(y_test, y_pred)
@@ -252,16 +420,20 @@ class DisengagementPredictor:
         print(f"{'='*60}")
         
         # Predict
-        df_ml['at_risk_prediction'] = self.model.predict(X)
-        df_ml['risk_probability'] = self.model.predict_proba(X)[:, 1]
-        df_ml['risk_level'] = df_ml['risk_probability'].apply(self.categorize_risk)
+        proba = self.model.predict_proba(X)[:, 1]
+        df_ml['risk_probability'] = proba
+        df_ml['at_risk_prediction'] = (proba > 0.5).astype(np.int8)
+        p = df_ml['risk_probability'].to_numpy()
+        df_ml['risk_level'] = np.select(
+            [p >= self.RISK_THRESHOLDS['high'], p >= self.RISK_THRESHOLDS['medium']],
+            ['High', 'Medium'],
+            default='Low'
+        )
         
         # Add metadata
-        df_ml['model_version'] = 'v1.0_GradientBoosting'
-        df_ml['model_type'] = 'GradientBoostingClassifier'
-        df_ml['confidence_score'] = df_ml['risk_probability'].apply(
-            lambda x: max(x, 1-x)
-        )
+        df_ml['model_version'] = self.model_version
+        df_ml['model_type'] = type(self.model).__name__
+        df_ml['confidence_score'] = np.maximum(df_ml['risk_probability'], 1 - df_ml['risk_probability'])
         df_ml['prediction_horizon_days'] = 7
         df_ml['created_at'] = datetime.now()
         
@@ -274,16 +446,39 @@ class DisengagementPredictor:
         
         # Top at-risk students
         print(f"\n⚠️  Top 10 Most At-Risk Students:")
-        top_risk = df_ml.groupby('student_id').agg({
-            'risk_probability': 'mean',
-            'engagement_score': 'mean'
-        }).sort_values('risk_probability', ascending=False).head(10)
+        top_risk = (
+            df_ml.groupby('student_code', sort=False)[['risk_probability', 'engagement_score']]
+            .mean()
+            .nlargest(10, 'risk_probability')
+        )
         
-        for student_id, row in top_risk.iterrows():
-            print(f"   {student_id}: Risk={row['risk_probability']:.3f}, Eng={row['engagement_score']:.2f}")
+        for student_code, row in top_risk.iterrows():
+            print(f"   {self.student_index[student_code]}: Risk={row['risk_probability']:.3f}, Eng={row['engagement_score']:.2f}")
         
         return df_ml
     
+    def _copy_predictions(self, df: pd.DataFrame, columns: List[str]):
+        """Stream the given columns of df into disengagement_predictions using PostgreSQL COPY."""
+        if 'student_pk' not in columns:
+            # COPY bypasses the ORM, so a missing student_pk would be stored as NULL
+            raise ValueError("COPY columns must include student_pk")
+        json_positions = {
+            position for position, column in enumerate(columns)
+            if column == 'contributing_factors'
+        }
+        raw_connection = self.db.connection().connection.driver_connection
+        statement = f"COPY {DisengagementPrediction.__tablename__} ({', '.join(columns)}) FROM STDIN"
+        with raw_connection.cursor() as cursor:
+            with cursor.copy(statement) as copy:
+                # Rows are zipped from the columns one at a time; neither a column
+                # subset frame nor a list of N record dicts is built. tolist() hands
+                # over Python scalars: psycopg < 3.2 cannot adapt numpy int64/bool_
+                for row in zip(*(df[column].tolist() for column in columns)):
+                    copy.write_row([
+                        Jsonb(value, dumps=json_serializer) if position in json_positions else value
+                        for position, value in enumerate(row)
+                    ])
+    
     def save_to_database(self, df_ml):
         """Save predictions to database"""
         print(f"\n{'='*60}")
@@ -296,45 +491,50 @@ class DisengagementPredictor:
             self.db.query(DisengagementPrediction).delete()
             self.db.commit()
             
-            # Prepare data
-            df_predictions = df_ml.copy()
-            df_predictions['prediction_date'] = df_predictions['date']
-            df_predictions['at_risk'] = df_predictions['at_risk_prediction']
+            # Prepare data in place; the at_risk training target is no longer needed
+            # and is replaced by the predicted flag
+            df_ml['prediction_date'] = df_ml['date']
+            df_ml['at_risk'] = df_ml['at_risk_prediction'].astype(bool)
+            # COPY skips the ORM's student_pk resolution, so map it in one lookup
+            pks = resolve_student_pks(self.db, df_ml['student_id'].unique())
+            df_ml['student_pk'] = df_ml['student_id'].map(pks)
             
-            # Add feature importance
+            # Feature importance is the same for every prediction: store it once per model version
             top_features = self.feature_importance.head(5)[['feature', 'importance']].to_dict('records')
-            df_predictions['feature_importance'] = [top_features] * len(df_predictions)
+            self.db.merge(ModelMetadata(
+                model_version=self.model_version,
+                model_type=type(self.model).__name__,
+                feature_importance=top_features,
+                created_at=datetime.now(),
+            ))
             
-            # Contributing factors
-            df_predictions['contributing_factors'] = df_predictions.apply(
-                lambda row: {
-                    'low_engagement_score': bool(row['engagement_score'] < 40),
-                    'declining_trend': bool(row['is_declining'] == 1),
-                    'low_session_activity': bool(row['session_score'] < 30),
-                    'consecutive_low_days': int(row['consecutive_low_days'])
-                }, axis=1
-            )
+            # Contributing factors: compare whole columns, then zip the arrays into dicts
+            low_engagement = df_ml['engagement_score'].to_numpy() < 40
+            declining = df_ml['is_declining'].to_numpy() == 1
+            low_session = df_ml['session_score'].to_numpy() < 30
+            consecutive_low = df_ml['consecutive_low_days'].to_numpy().astype(int)
+            df_ml['contributing_factors'] = [
+                {
+                    'low_engagement_score': bool(a),
+                    'declining_trend': bool(b),
+                    'low_session_activity': bool(c),
+                    'consecutive_low_days': int(d)
+                }
+                for a, b, c, d in zip(low_engagement, declining, low_session, consecutive_low)
+            ]
             
-            # Select columns for database
+            # Select columns for database (COPY skips ORM defaults, so institute_id is explicit)
             db_columns = [
-                'student_id', 'prediction_date', 'at_risk', 'risk_probability', 'risk_level',
-                'contributing_factors', 'feature_importance', 'model_version', 'model_type',
-                'confidence_score', 'prediction_horizon_days', 'created_at'
+                'student_id', 'student_pk', 'institute_id', 'prediction_date', 'at_risk',
+                'risk_probability', 'risk_level', 'contributing_factors', 'model_version',
+                'model_type', 'confidence_score', 'prediction_horizon_days', 'created_at'
             ]
             
-            df_to_save = df_predictions[db_columns].copy()
-            
-            # Convert to database records
-            print(f"\n📝 Inserting {len(df_to_save)} prediction records...")
-            
-            records = []
-            for _, row in df_to_save.iterrows():
-                record = DisengagementPrediction(**row.to_dict())
-                records.append(record)
-            
-            # Bulk insert
-            self.db.bulk_save_objects(records)
+            # Stream rows with COPY instead of building one ORM object per row
+            print(f"\n📝 Inserting {len(df_ml)} prediction records...")
+            self._copy_predictions(df_ml, db_columns)
             self.db.commit()
+            bump_generation(PREDICTIONS_GENERATION)
             
             # Verify
             count = self.db.query(DisengagementPrediction).count()
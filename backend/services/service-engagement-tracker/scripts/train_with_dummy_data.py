@@ -221,15 +221,22 @@ def train():
         X, y, test_size=0.2, random_state=RANDOM_SEED, stratify=y
     )
 
+    # Stochastic boosting (subsample) with early stopping: fit stays serial
+    # across stages, so the win is in training fewer, cheaper ones
     clf = GradientBoostingClassifier(
-        n_estimators=100,
+        n_estimators=200,
         learning_rate=0.1,
         max_depth=5,
         min_samples_split=20,
         min_samples_leaf=10,
+        subsample=0.8,
+        n_iter_no_change=10,
+        validation_fraction=0.1,
+        tol=1e-4,
         random_state=RANDOM_SEED,
     )
     clf.fit(X_train, y_train)
+    print(f"  Stages trained    : {clf.n_estimators_} of {clf.n_estimators}")
 
     y_pred      = clf.predict(X_test)
     y_pred_prob = clf.predict_proba(X_test)[:, 1]
@@ -255,6 +262,7 @@ def train():
         "feature_names": FEATURE_COLUMNS,
         "num_training_samples": len(X_train),
         "num_test_samples": len(X_test),
+        "num_estimators": int(clf.n_estimators_),
         "accuracy": round(acc, 4),
         "roc_auc": round(roc_auc, 4),
         "at_risk_threshold": AT_RISK_THRESHOLD,
@@ -12,125 +12,185 @@ if sys.platform == 'win32':
 
 import requests
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 BASE_URL = "http://localhost:8002"
+MAX_WORKERS = 8
+
+# One keep-alive connection pool for every request in the run, sized for the
+# concurrent read-only checks
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+SESSION.mount("http://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+
+# Tests assert like any pytest test. Under main() each test's output is
+# buffered per thread so concurrent tests don't interleave; under pytest it
+# is printed directly
+_output = threading.local()
+
+def _log(line):
+    lines = getattr(_output, "lines", None)
+    if lines is None:
+        print(line)
+    else:
+        lines.append(line)
+
+def _run(test):
+    """Run one test for main(); returns (name, ok, output lines)"""
+    name = test.__name__.removeprefix("test_").replace("_", " ").capitalize()
+    _output.lines = lines = []
+    try:
+        test()
+        ok = True
+    except requests.exceptions.ConnectionError:
+        raise
+    except AssertionError as e:
+        lines.append(f"   ❌ Failed: {e}")
+        ok = False
+    except Exception as e:
+        lines.append(f"   ❌ Failed: {type(e).__name__}: {e}")
+        ok = False
+    finally:
+        _output.lines = None
+    return name, ok, lines
 
 def test_health():
     """Test health check endpoint"""
-    print("\n[HEALTH] Testing Health Check...")
-    response = requests.get(f"{BASE_URL}/health")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {json.dumps(response.json(), indent=2)}")
-    assert response.status_code == 200
-    print("   ✅ Health check passed!")
+    _log("\n[HEALTH] Testing Health Check...")
+    response = SESSION.get(f"{BASE_URL}/health")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    _log(f"   Response: {json.dumps(response.json(), indent=2)}")
+    _log("   ✅ Health check passed!")
 
 def test_system_stats():
     """Test system statistics"""
-    print("\n📊 Testing System Statistics...")
-    response = requests.get(f"{BASE_URL}/api/v1/stats")
-    print(f"   Status: {response.status_code}")
+    _log("\n📊 Testing System Statistics...")
+    response = SESSION.get(f"{BASE_URL}/api/v1/stats")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     data = response.json()
-    print(f"   Total Students: {data['total_students']}")
-    print(f"   Total Engagement Records: {data['total_engagement_records']}")
-    print(f"   High Risk Students: {data['high_risk_students']}")
-    assert response.status_code == 200
-    print("   ✅ System stats passed!")
+    _log(f"   Total Students: {data['total_students']}")
+    _log(f"   Total Engagement Records: {data['total_engagement_records']}")
+    _log(f"   High Risk Students: {data['high_risk_students']}")
+    _log("   ✅ System stats passed!")
 
 def test_engagement_score():
     """Test engagement score endpoint"""
-    print("\n📈 Testing Engagement Score...")
+    _log("\n📈 Testing Engagement Score...")
     student_id = "STU0001"
-    response = requests.get(f"{BASE_URL}/api/v1/engagement/students/{student_id}/latest")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Student: {data['student_id']}")
-        print(f"   Engagement Score: {data['engagement_score']}")
-        print(f"   Level: {data['engagement_level']}")
-        print("   ✅ Engagement score passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    response = SESSION.get(f"{BASE_URL}/api/v1/engagement/students/{student_id}/latest")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Student: {data['student_id']}")
+    _log(f"   Engagement Score: {data['engagement_score']}")
+    _log(f"   Level: {data['engagement_level']}")
+    _log("   ✅ Engagement score passed!")
 
 def test_engagement_summary():
     """Test engagement summary"""
-    print("\n📋 Testing Engagement Summary...")
+    _log("\n📋 Testing Engagement Summary...")
     student_id = "STU0001"
-    response = requests.get(f"{BASE_URL}/api/v1/engagement/students/{student_id}/summary")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Days Tracked: {data['days_tracked']}")
-        print(f"   Avg Score: {data['avg_engagement_score']}")
-        print(f"   Trend: {data['trend']}")
-        print("   ✅ Engagement summary passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    response = SESSION.get(f"{BASE_URL}/api/v1/engagement/students/{student_id}/summary")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Days Tracked: {data['days_tracked']}")
+    _log(f"   Avg Score: {data['avg_engagement_score']}")
+    _log(f"   Trend: {data['trend']}")
+    _log("   ✅ Engagement summary passed!")
 
 def test_prediction():
     """Test prediction endpoint"""
-    print("\n🎯 Testing Disengagement Prediction...")
+    _log("\n🎯 Testing Disengagement Prediction...")
     student_id = "STU0085"  # Known high-risk student
-    response = requests.get(f"{BASE_URL}/api/v1/predictions/students/{student_id}/latest")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Student: {data['student_id']}")
-        print(f"   At Risk: {data['at_risk']}")
-        print(f"   Risk Probability: {data['risk_probability']:.3f}")
-        print(f"   Risk Level: {data['risk_level']}")
-        print("   ✅ Prediction passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    response = SESSION.get(f"{BASE_URL}/api/v1/predictions/students/{student_id}/latest")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Student: {data['student_id']}")
+    _log(f"   At Risk: {data['at_risk']}")
+    _log(f"   Risk Probability: {data['risk_probability']:.3f}")
+    _log(f"   Risk Level: {data['risk_level']}")
+    _log("   ✅ Prediction passed!")
 
 def test_at_risk_students():
     """Test at-risk students list"""
-    print("\n⚠️  Testing At-Risk Students List...")
-    response = requests.get(f"{BASE_URL}/api/v1/predictions/high-risk?limit=5")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Found {len(data)} high-risk students")
-        for student in data[:3]:
-            print(f"      - {student['student_id']}: Risk={student['avg_risk_probability']:.3f}")
-        print("   ✅ At-risk list passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    _log("\n⚠️  Testing At-Risk Students List...")
+    response = SESSION.get(f"{BASE_URL}/api/v1/predictions/high-risk?limit=5")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Found {len(data)} high-risk students")
+    for student in data[:3]:
+        _log(f"      - {student['student_id']}: Risk={student['avg_risk_probability']:.3f}")
+    _log("   ✅ At-risk list passed!")
 
 def test_student_dashboard():
     """Test student dashboard"""
-    print("\n📊 Testing Student Dashboard...")
+    _log("\n📊 Testing Student Dashboard...")
     student_id = "STU0001"
-    response = requests.get(f"{BASE_URL}/api/v1/students/{student_id}/dashboard")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        status = data['current_status']
-        print(f"   Engagement Score: {status['engagement_score']}")
-        print(f"   Level: {status['engagement_level']}")
-        print(f"   At Risk: {status['at_risk']}")
-        print(f"   Alerts: {len(data['alerts'])}")
-        print("   ✅ Dashboard passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    response = SESSION.get(f"{BASE_URL}/api/v1/students/{student_id}/dashboard")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    status = data['current_status']
+    _log(f"   Engagement Score: {status['engagement_score']}")
+    _log(f"   Level: {status['engagement_level']}")
+    _log(f"   At Risk: {status['at_risk']}")
+    _log(f"   Alerts: {len(data['alerts'])}")
+    _log("   ✅ Dashboard passed!")
 
 def test_leaderboard():
     """Test leaderboard"""
-    print("\n🏆 Testing Leaderboard...")
-    response = requests.get(f"{BASE_URL}/api/v1/engagement/leaderboard?limit=5")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Top {len(data)} students:")
-        for i, student in enumerate(data, 1):
-            print(f"      {i}. {student['student_id']}: {student['avg_engagement_score']:.2f}")
-        print("   ✅ Leaderboard passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    _log("\n🏆 Testing Leaderboard...")
+    response = SESSION.get(f"{BASE_URL}/api/v1/engagement/leaderboard?limit=5")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Top {len(data)} students:")
+    for i, student in enumerate(data, 1):
+        _log(f"      {i}. {student['student_id']}: {student['avg_engagement_score']:.2f}")
+    _log("   ✅ Leaderboard passed!")
+
+def test_student_list_pagination():
+    """Test keyset pagination of the student list"""
+    _log("\n📄 Testing Student List Pagination...")
+    limit = 5
+    response = SESSION.get(f"{BASE_URL}/api/v1/students/list", params={"limit": 2 * limit})
+    assert response.status_code == 200, response.text
+    expected = [s["student_id"] for s in response.json()["students"]]
+
+    first = SESSION.get(f"{BASE_URL}/api/v1/students/list", params={"limit": limit})
+    assert first.status_code == 200, first.text
+    first_page = first.json()
+    if first_page["next_cursor"] is None:
+        _log(f"   Fewer than {limit + 1} students; nothing to page through")
+        _log("   ✅ Student list pagination passed!")
+        return
+
+    second = SESSION.get(
+        f"{BASE_URL}/api/v1/students/list",
+        params={"limit": limit, **first_page["next_cursor"]},
+    )
+    assert second.status_code == 200, second.text
+    first_ids = [s["student_id"] for s in first_page["students"]]
+    second_ids = [s["student_id"] for s in second.json()["students"]]
+    _log(f"   Page 1: {first_ids}")
+    _log(f"   Page 2: {second_ids}")
+
+    # Consecutive pages must neither repeat nor skip a student
+    assert not set(first_ids) & set(second_ids), f"pages overlap: {first_ids} / {second_ids}"
+    assert first_ids + second_ids == expected, f"expected {expected}"
+    _log("   ✅ Student list pagination passed!")
 
 def test_event_ingest():
     """Test event ingestion"""
-    print("\n📥 Testing Event Ingestion...")
+    _log("\n📥 Testing Event Ingestion...")
     event = {
         "student_id": "STU0001",
         "event_type": "login",
@@ -139,29 +199,44 @@ def test_event_ingest():
         "event_data": {"test": True},
         "source_service": "test"
     }
-    response = requests.post(f"{BASE_URL}/api/v1/events/ingest", json=event)
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 201:
-        data = response.json()
-        print(f"   Event ID: {data['event_id']}")
-        print(f"   Status: {data['status']}")
-        print("   ✅ Event ingestion passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    response = SESSION.post(f"{BASE_URL}/api/v1/events/ingest", json=event)
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 201, response.text
+    data = response.json()
+    _log(f"   Event ID: {data['event_id']}")
+    _log(f"   Status: {data['status']}")
+    _log("   ✅ Event ingestion passed!")
 
 def test_prediction_stats():
     """Test prediction statistics"""
-    print("\n📈 Testing Prediction Statistics...")
-    response = requests.get(f"{BASE_URL}/api/v1/predictions/statistics")
-    print(f"   Status: {response.status_code}")
-    if response.status_code == 200:
-        data = response.json()
-        print(f"   Total Predictions: {data['total_predictions']}")
-        print(f"   At-Risk: {data['at_risk_percentage']:.1f}%")
-        print(f"   High Risk: {data['risk_levels']['high']}")
-        print("   ✅ Prediction stats passed!")
-    else:
-        print(f"   ❌ Failed: {response.text}")
+    _log("\n📈 Testing Prediction Statistics...")
+    response = SESSION.get(f"{BASE_URL}/api/v1/predictions/statistics")
+    _log(f"   Status: {response.status_code}")
+    assert response.status_code == 200, response.text
+    data = response.json()
+    _log(f"   Total Predictions: {data['total_predictions']}")
+    _log(f"   At-Risk: {data['at_risk_percentage']:.1f}%")
+    _log(f"   High Risk: {data['risk_levels']['high']}")
+    _log("   ✅ Prediction stats passed!")
+
+# Independent GETs, run concurrently
+READ_ONLY_TESTS = [
+    test_health,
+    test_system_stats,
+    test_engagement_score,
+    test_engagement_summary,
+    test_prediction,
+    test_at_risk_students,
+    test_student_dashboard,
+    test_leaderboard,
+    test_prediction_stats,
+    test_student_list_pagination,
+]
+
+# Mutate state, so they run one at a time after the read-only tests
+WRITE_TESTS = [
+    test_event_ingest,
+]
 
 def main():
     """Run all tests"""
@@ -169,27 +244,26 @@ def main():
     print("🧪 EDUMIND API TEST SUITE")
     print("=" * 60)
     print(f"Base URL: {BASE_URL}")
-    
+
     try:
-        test_health()
-        test_system_stats()
-        test_engagement_score()
-        test_engagement_summary()
-        test_prediction()
-        test_at_risk_students()
-        test_student_dashboard()
-        test_leaderboard()
-        test_event_ingest()
-        test_prediction_stats()
-        
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = list(executor.map(_run, READ_ONLY_TESTS))
+        results += [_run(test) for test in WRITE_TESTS]
+
+        for _, _, lines in results:
+            print("\n".join(lines))
+
+        failed = [name for name, ok, _ in results if not ok]
         print("\n" + "=" * 60)
-        print("✅ ALL TESTS PASSED!")
-        print("=" * 60)
-        print("\n🎉 API is fully operational!")
-        print("📚 View documentation: http://localhost:8002/api/docs")
-        
-    except AssertionError as e:
-        print(f"\n❌ Test failed: {e}")
+        if failed:
+            print(f"❌ {len(failed)} of {len(results)} tests failed: {', '.join(failed)}")
+            print("=" * 60)
+        else:
+            print("✅ ALL TESTS PASSED!")
+            print("=" * 60)
+            print("\n🎉 API is fully operational!")
+            print("📚 View documentation: http://localhost:8002/api/docs")
+
     except requests.exceptions.ConnectionError:
         print(f"\n❌ Cannot connect to API at {BASE_URL}")
         print("   Make sure the server is running:")
@@ -199,4 +273,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
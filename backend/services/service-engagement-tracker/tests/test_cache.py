@@ -0,0 +1,229 @@
+"""
+Test the Redis response cache, generations and counters against fakeredis.
+"""
+
+import asyncio
+import json
+
+import fakeredis
+import orjson
+import pytest
+from fastapi import Response
+
+from app.core import cache
+from app.core.cache import (
+    bump_generation,
+    cache_key,
+    cached,
+    cached_by_generation,
+    counter_key,
+    incr_counter,
+    aincr_counter,
+    set_counter,
+)
+from app.core.clock import today
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_client(server, monkeypatch):
+    """Point the cache helpers at an in-memory Redis shared by the sync and async clients."""
+    client = fakeredis.FakeRedis(server=server)
+    monkeypatch.setattr(cache, "_client", client)
+    monkeypatch.setattr(cache, "_async_client", fakeredis.FakeAsyncRedis(server=server))
+    return client
+
+
+@pytest.fixture
+def broken_redis(server, monkeypatch):
+    """Clients whose every command raises ConnectionError."""
+    server.connected = False
+    monkeypatch.setattr(cache, "_client", fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(cache, "_async_client", fakeredis.FakeAsyncRedis(server=server))
+
+
+class CountingEndpoint:
+    """Stand-in endpoint that returns a fresh payload and counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, limit: int = 10, db=None):
+        self.calls += 1
+        return {"call": self.calls, "limit": limit}
+
+
+class TestCached:
+    """Tests for the TTL response cache."""
+
+    def test_key_excludes_db(self, redis_client):
+        """Requests differing only in their db session share one entry."""
+        endpoint = CountingEndpoint()
+        wrapped = cached("leaderboard")(endpoint)
+
+        first = wrapped(limit=5, db=object())
+        second = wrapped(limit=5, db=object())
+
+        assert endpoint.calls == 1
+        assert second == first
+        assert redis_client.exists(cache_key("leaderboard", limit=5))
+
+    def test_hit_returns_cached_body(self, redis_client):
+        """A hit is served from Redis without running the endpoint."""
+        redis_client.set(cache_key("leaderboard", limit=5), json.dumps({"cached": True}))
+        endpoint = CountingEndpoint()
+
+        assert cached("leaderboard")(endpoint)(limit=5) == {"cached": True}
+        assert endpoint.calls == 0
+
+    def test_params_are_part_of_the_key(self, redis_client):
+        """Different query parameters never share an entry."""
+        endpoint = CountingEndpoint()
+        wrapped = cached("leaderboard")(endpoint)
+
+        wrapped(limit=5)
+        wrapped(limit=10)
+
+        assert endpoint.calls == 2
+
+    def test_async_endpoint_hit(self, redis_client):
+        """Async endpoints go through the asyncio client with the same keys."""
+        calls = []
+
+        @cached("statistics")
+        async def endpoint(institute_id: str, db=None):
+            calls.append(institute_id)
+            return {"institute_id": institute_id}
+
+        async def call_twice():
+            return [await endpoint(institute_id="A", db=object()) for _ in range(2)]
+
+        assert asyncio.run(call_twice()) == [{"institute_id": "A"}] * 2
+        assert calls == ["A"]
+
+    def test_redis_error_degrades_to_miss(self, broken_redis):
+        """An unreachable Redis computes every request instead of failing it."""
+        endpoint = CountingEndpoint()
+        wrapped = cached("leaderboard")(endpoint)
+
+        assert wrapped(limit=5) == {"call": 1, "limit": 5}
+        assert wrapped(limit=5) == {"call": 2, "limit": 5}
+
+
+class TestCachedByGeneration:
+    """Tests for generation-scoped caching."""
+
+    def test_hit_returns_cached_body(self, redis_client):
+        """The second call is served as the stored JSON body."""
+        endpoint = CountingEndpoint()
+        wrapped = cached_by_generation("at-risk", "predictions")(endpoint)
+
+        first = wrapped(limit=5, db=object())
+        second = wrapped(limit=5, db=object())
+
+        assert endpoint.calls == 1
+        assert isinstance(second, Response)
+        assert second.body == orjson.dumps(first)
+        assert redis_client.exists(cache_key("at-risk", today=today(), limit=5))
+
+    def test_bump_invalidates_entries(self, redis_client):
+        """Entries cached before bump_generation are recomputed after it."""
+        endpoint = CountingEndpoint()
+        wrapped = cached_by_generation("at-risk", "predictions")(endpoint)
+
+        wrapped(limit=5)
+        bump_generation("predictions")
+        result = wrapped(limit=5)
+
+        assert endpoint.calls == 2
+        assert result == {"call": 2, "limit": 5}
+
+    def test_bump_only_affects_its_generation(self, redis_client):
+        """Bumping another generation leaves the entry valid."""
+        endpoint = CountingEndpoint()
+        wrapped = cached_by_generation("at-risk", "predictions")(endpoint)
+
+        wrapped(limit=5)
+        bump_generation("other")
+        wrapped(limit=5)
+
+        assert endpoint.calls == 1
+
+    def test_entry_built_under_old_generation_is_not_served(self, redis_client):
+        """A response computed while a bump landed is stored but never served."""
+        endpoint = CountingEndpoint()
+
+        def endpoint_racing_a_write(limit: int = 10, db=None):
+            result = endpoint(limit=limit)
+            if endpoint.calls == 1:
+                # Predictions committed after this request read the generation
+                bump_generation("predictions")
+            return result
+
+        wrapped = cached_by_generation("at-risk", "predictions")(endpoint_racing_a_write)
+
+        wrapped(limit=5)
+        second = wrapped(limit=5)
+        third = wrapped(limit=5)
+
+        assert endpoint.calls == 2
+        assert second == {"call": 2, "limit": 5}
+        assert isinstance(third, Response)
+        assert third.body == orjson.dumps(second)
+
+    def test_entries_expire_at_midnight(self, redis_client):
+        """Entries carry an absolute expiry instead of living forever."""
+        cached_by_generation("at-risk", "predictions")(CountingEndpoint())(limit=5)
+
+        ttl = redis_client.ttl(cache_key("at-risk", today=today(), limit=5))
+        assert 0 < ttl <= 24 * 60 * 60
+
+    def test_redis_error_degrades_to_miss(self, broken_redis):
+        """An unreachable Redis computes every request and skips the write."""
+        endpoint = CountingEndpoint()
+        wrapped = cached_by_generation("at-risk", "predictions")(endpoint)
+
+        assert wrapped(limit=5) == {"call": 1, "limit": 5}
+        assert wrapped(limit=5) == {"call": 2, "limit": 5}
+
+    def test_bump_survives_redis_error(self, broken_redis):
+        """A failed bump is logged, not raised into the writer."""
+        bump_generation("predictions")
+
+
+class TestCounters:
+    """Tests for write-maintained counters."""
+
+    def test_unseeded_counter_is_not_incremented(self, redis_client):
+        """Increments before seeding are dropped rather than creating a partial total."""
+        incr_counter("events", 3, institute_id="A")
+        asyncio.run(aincr_counter("events", 2, institute_id="A"))
+
+        assert redis_client.get(counter_key("events", institute_id="A")) is None
+
+    def test_seeded_counter_is_incremented(self, redis_client):
+        """Once seeded, sync and async increments both apply."""
+        set_counter("events", 10, institute_id="A")
+
+        incr_counter("events", 3, institute_id="A")
+        asyncio.run(aincr_counter("events", 2, institute_id="A"))
+
+        assert int(redis_client.get(counter_key("events", institute_id="A"))) == 15
+
+    def test_seed_does_not_overwrite_live_counter(self, redis_client):
+        """aseed_counter only fills an unseeded counter."""
+        set_counter("events", 10, institute_id="A")
+
+        asyncio.run(cache.aseed_counter("events", 1, institute_id="A"))
+
+        assert asyncio.run(cache.aget_counter("events", institute_id="A")) == 10
+
+    def test_redis_error_reads_as_unseeded(self, broken_redis):
+        """Counter helpers swallow Redis errors; reads report no value."""
+        incr_counter("events", 1, institute_id="A")
+
+        assert asyncio.run(cache.aget_counter("events", institute_id="A")) is None
@@ -0,0 +1,76 @@
+"""
+Test that the list projections match the response schemas they bypass.
+
+Endpoints serializing these projections with orjson skip response_model
+validation, so every required, non-Optional schema field must come from an
+expression that cannot be NULL.
+"""
+
+import typing
+
+import pytest
+from sqlalchemy import BindParameter, Column
+from sqlalchemy.sql.elements import BinaryExpression, Cast, Label
+from sqlalchemy.sql.functions import Function, coalesce
+
+from app.api.projections import (
+    METRIC_RESPONSE_COLUMNS,
+    PREDICTION_RESPONSE_COLUMNS,
+    SCORE_RESPONSE_COLUMNS,
+)
+from app.schemas import (
+    DailyMetricResponse,
+    DisengagementPredictionResponse,
+    EngagementScoreResponse,
+)
+
+PROJECTIONS = [
+    pytest.param(SCORE_RESPONSE_COLUMNS, EngagementScoreResponse, id="score"),
+    pytest.param(PREDICTION_RESPONSE_COLUMNS, DisengagementPredictionResponse, id="prediction"),
+    pytest.param(METRIC_RESPONSE_COLUMNS, DailyMetricResponse, id="metric"),
+]
+
+
+def can_be_null(expression) -> bool:
+    """Conservative nullability: True unless the expression provably yields a value."""
+    if hasattr(expression, "__clause_element__"):
+        # Mapped attribute -> its table column
+        expression = expression.__clause_element__()
+    if isinstance(expression, Label):
+        return can_be_null(expression.element)
+    if isinstance(expression, Column):
+        return expression.nullable
+    if isinstance(expression, BindParameter):
+        return expression.value is None
+    if isinstance(expression, Cast):
+        return can_be_null(expression.clause)
+    if isinstance(expression, BinaryExpression):
+        return can_be_null(expression.left) or can_be_null(expression.right)
+    if isinstance(expression, coalesce) or (
+        isinstance(expression, Function) and expression.name == "greatest"
+    ):
+        # Both skip NULL arguments: NULL only when every argument is
+        return all(can_be_null(argument) for argument in expression.clauses)
+    return True
+
+
+def allows_none(annotation) -> bool:
+    return type(None) in typing.get_args(annotation)
+
+
+@pytest.mark.parametrize("columns, schema", PROJECTIONS)
+def test_projection_keys_match_schema_fields(columns, schema):
+    """Row mappings carry exactly the schema's fields."""
+    assert [column.key for column in columns] == list(schema.model_fields)
+
+
+@pytest.mark.parametrize("columns, schema", PROJECTIONS)
+def test_required_fields_are_never_null(columns, schema):
+    """A NULL can only reach fields the schema declares Optional."""
+    expressions = {column.key: column for column in columns}
+    nullable = [
+        name
+        for name, field in schema.model_fields.items()
+        if not allows_none(field.annotation) and can_be_null(expressions[name])
+    ]
+    assert nullable == []
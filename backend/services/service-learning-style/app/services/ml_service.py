@@ -52,6 +52,7 @@ class LearningStyleMLService:
         self.model_dir = Path(model_dir)
         self.model = None
         self.feature_names = None
+        self.class_names = []
         self.metadata = None
         self.feature_engineer = LearningStyleFeatureEngineer()
         
@@ -82,6 +83,9 @@ class LearningStyleMLService:
             # Load model
             self.model = joblib.load(model_path)
             
+            # Class labels as strings, in predict_proba column order (fixed per model)
+            self.class_names = [str(cls) for cls in getattr(self.model, 'classes_', [])]
+            
             # Load feature names
             features_path = self.model_dir / "feature_names.pkl"
             if features_path.exists():
@@ -271,16 +275,12 @@ class LearningStyleMLService:
             # Select feature columns in correct order
             X = features_df[self.feature_names]
             
-            # Make prediction
-            prediction = self.model.predict(X)[0]
+            # Make prediction (the predicted style is taken from the blended
+            # probabilities below, so predict_proba is the only model call)
             probabilities = self.model.predict_proba(X)[0]
             
-            # Map probabilities to class names
-            classes = self.model.classes_
-            prob_dict = {
-                str(cls): float(prob)
-                for cls, prob in zip(classes, probabilities)
-            }
+            # Map probabilities to the class names cached at load time
+            prob_dict = dict(zip(self.class_names, probabilities.tolist()))
             
             # Blend with behavior-based distribution so recent activity (video, reading, etc.) visibly shifts the result
             prob_dict = self._blend_with_behavior(aggregated, prob_dict)
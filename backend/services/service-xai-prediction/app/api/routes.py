@@ -53,8 +53,8 @@ async def predict_student_outcome(
         request, prediction.risk_level
     )
 
-    # Return response
-    response = PredictionResponse(
+    # Parts are built by ml_service from validated input; response_model checks the result
+    response = PredictionResponse.model_construct(
         prediction=prediction,
         explanation=explanation,
         recommendations=recommendations,
@@ -104,7 +104,7 @@ async def sync_and_predict_student_outcome(
     prediction, explanation = await ml_service.predict(request)
     recommendations = ml_service._generate_recommendations(request, prediction.risk_level)
 
-    response = PredictionResponse(
+    response = PredictionResponse.model_construct(
         prediction=prediction,
         explanation=explanation,
         recommendations=recommendations,
@@ -74,6 +74,11 @@ class Settings(BaseServiceSettings):
     LEARNING_STYLE_SERVICE_URL: str = "http://localhost:8006"
     SYNC_TIMEOUT_SECONDS: float = 10.0
 
+    # Concurrent predictions are coalesced into one model call of up to
+    # PREDICT_BATCH_SIZE rows, waiting at most PREDICT_BATCH_WAIT_MS for more
+    PREDICT_BATCH_SIZE: int = 64
+    PREDICT_BATCH_WAIT_MS: float = 5.0
+
     class Config:
         env_file = str(SERVICE_ENV_FILE)
         case_sensitive = True
@@ -35,6 +35,7 @@ from app.core.middleware import (
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # Setup logging
@@ -87,6 +88,7 @@ app = FastAPI(
     title=settings.SERVICE_NAME,
     version=settings.VERSION,
     description="XAI-powered student outcome prediction service with explainable AI",
+    default_response_class=ORJSONResponse,
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
     lifespan=lifespan,
@@ -13,6 +13,8 @@ class AcademicRiskRequest(BaseModel):
     """Request schema for academic risk prediction"""
 
     model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
         json_schema_extra={
             "example": {
                 "student_id": "student_12345",
@@ -63,6 +65,8 @@ class AcademicRiskResponse(BaseModel):
     """Response schema for academic risk prediction"""
 
     model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
         json_schema_extra={
             "example": {
                 "student_id": "student_12345",
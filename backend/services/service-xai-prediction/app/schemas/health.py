@@ -1,11 +1,13 @@
 from typing import Any, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class HealthResponse(BaseModel):
     """Health check response schema"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     status: str
     service: str
     version: str
@@ -15,6 +17,8 @@ class HealthResponse(BaseModel):
 class ModelInfoResponse(BaseModel):
     """Model information response schema"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     model_type: str
     features_count: int
     feature_names: List[str]
@@ -17,6 +17,8 @@ class PredictionRequest(BaseModel):
     """Request schema for student outcome prediction"""
 
     model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
         json_schema_extra={
             "example": {
                 "student_id": "student_12345",
@@ -60,6 +62,8 @@ class PredictionRequest(BaseModel):
 class PredictionResult(BaseModel):
     """Individual prediction result"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     predicted_class: str = Field(..., description="Predicted outcome class")
     probability: float = Field(..., ge=0, le=1, description="Prediction probability")
     risk_level: str = Field(..., description="Risk level: low, medium, high")
@@ -68,6 +72,8 @@ class PredictionResult(BaseModel):
 class FeatureContribution(BaseModel):
     """Feature importance for explanation"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     feature: str
     value: float
     contribution: float
@@ -77,6 +83,8 @@ class FeatureContribution(BaseModel):
 class ExplanationResult(BaseModel):
     """XAI Explanation result"""
 
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     feature_contributions: List[FeatureContribution]
     top_positive_factors: List[str]
     top_negative_factors: List[str]
@@ -87,6 +95,8 @@ class PredictionResponse(BaseModel):
     """Response schema for prediction"""
 
     model_config = ConfigDict(
+        frozen=True,
+        extra="forbid",
         json_schema_extra={
             "example": {
                 "prediction": {
@@ -1,5 +1,9 @@
+import asyncio
 import json
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
 from pathlib import Path
 from typing import List, Tuple
 
@@ -11,12 +15,27 @@ from app.schemas.academic_risk import (
     CounterfactualChange,
     CounterfactualExplanation,
 )
+from app.services.prediction_cache import PredictionCache
 
 logger = logging.getLogger(__name__)
 
 RISK_LEVELS = ["Safe", "Medium Risk", "At-Risk"]
 RISK_LEVEL_RANK = {level: index for index, level in enumerate(RISK_LEVELS)}
 
+# Request fields in model feature order, read in one C-level call per request
+REQUEST_FEATURES = attrgetter(
+    "avg_grade",
+    "grade_consistency",
+    "grade_range",
+    "num_assessments",
+    "assessment_completion_rate",
+    "studied_credits",
+    "num_of_prev_attempts",
+    "low_performance",
+    "low_engagement",
+    "has_previous_attempts",
+)
+
 
 class AcademicRiskService:
     """Service for academic risk prediction using OULAD model"""
@@ -25,6 +44,12 @@ class AcademicRiskService:
         self.model = None
         self.metadata = None
         self.feature_names = None
+        self._prediction_cache = PredictionCache()
+        # Booster inference (and the counterfactual search around it) runs here,
+        # off the event loop; XGBoost releases the GIL while predicting
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, 4), thread_name_prefix="academic-risk"
+        )
         self._load_model()
 
     def _load_model(self):
@@ -51,6 +76,9 @@ class AcademicRiskService:
             # Load as Booster (raw model)
             self.model = xgb.Booster()
             self.model.load_model(str(model_path))
+            # Calls are a handful of rows and already run concurrently on the
+            # inference pool; OpenMP fan-out per call only adds thread wake-ups
+            self.model.set_param({"nthread": 1})
             logger.info("✓ OULAD model loaded successfully")
 
             # Load metadata
@@ -104,26 +132,24 @@ class AcademicRiskService:
         }
         logger.info("Running academic risk service in demo mode")
 
-    def _prepare_features(self, request: AcademicRiskRequest) -> xgb.DMatrix:
-        """Prepare features as DMatrix for XGBoost Booster"""
-        features = np.array(
-            [
-                [
-                    request.avg_grade,
-                    request.grade_consistency,
-                    request.grade_range,
-                    request.num_assessments,
-                    request.assessment_completion_rate,
-                    request.studied_credits,
-                    request.num_of_prev_attempts,
-                    request.low_performance,
-                    request.low_engagement,
-                    request.has_previous_attempts,
-                ]
-            ]
-        )
-        # Create DMatrix with feature names
-        return xgb.DMatrix(features, feature_names=self.feature_names)
+    def _prepare_features(self, request: AcademicRiskRequest) -> np.ndarray:
+        """Prepare the (1, n_features) float32 feature row for the XGBoost Booster"""
+        return np.array([REQUEST_FEATURES(request)], dtype=np.float32)
+
+    def _predict_raw(self, requests: List[AcademicRiskRequest]) -> List[np.ndarray]:
+        """Booster output per request; repeated identical feature rows reuse the cached output"""
+        rows = [self._prepare_features(request) for request in requests]
+        keys = [PredictionCache.key(row) for row in rows]
+        outputs = [self._prediction_cache.get(key) for key in keys]
+        misses = [index for index, output in enumerate(outputs) if output is None]
+        if misses:
+            # One inplace_predict over all uncached rows: per-call overhead, not
+            # tree traversal, dominates small inputs, and inplace_predict reads
+            # the float32 matrix directly instead of building a DMatrix
+            predicted = self.model.inplace_predict(np.vstack([rows[index] for index in misses]))
+            for index, output in zip(misses, predicted):
+                outputs[index] = self._prediction_cache.put(keys[index], output)
+        return outputs
 
     def _generate_recommendations(
         self, request: AcademicRiskRequest, prediction: int, risk_score: float
@@ -387,43 +413,49 @@ class AcademicRiskService:
         self, request: AcademicRiskRequest
     ) -> Tuple[int, np.ndarray]:
         """Return the predicted class index and raw class probabilities."""
+        return self._run_predictions_model_or_demo([request])[0]
+
+    def _run_predictions_model_or_demo(
+        self, requests: List[AcademicRiskRequest]
+    ) -> List[Tuple[int, np.ndarray]]:
+        """_run_prediction_model_or_demo for several requests with one model call."""
         if self.model is not None:
-            dmatrix = self._prepare_features(request)
-            raw_predictions = self.model.predict(dmatrix)
-
-            if len(raw_predictions[0]) == 3:
-                probabilities = np.array(
-                    [
-                        float(raw_predictions[0][0]),
-                        float(raw_predictions[0][1]),
-                        float(raw_predictions[0][2]),
-                    ]
-                )
-                prediction = int(np.argmax(probabilities))
-                logger.info(
-                    "Model prediction (multi-class) - Student: %s, Prob Safe: %.4f, "
-                    "Prob Medium: %.4f, Prob At-Risk: %.4f, Predicted: %s",
-                    request.student_id,
-                    probabilities[0],
-                    probabilities[1],
-                    probabilities[2],
-                    prediction,
-                )
-                return prediction, probabilities
-
-            prob_at_risk = float(raw_predictions[0])
-            prob_at_risk = max(0.0, min(1.0, prob_at_risk))
-            probabilities = np.array([1.0 - prob_at_risk, prob_at_risk])
-            prediction = 1 if prob_at_risk > 0.5 else 0
+            return [
+                self._interpret_raw_output(request, raw_output)
+                for request, raw_output in zip(requests, self._predict_raw(requests))
+            ]
+
+        return [self._demo_predict(request) for request in requests]
+
+    def _interpret_raw_output(
+        self, request: AcademicRiskRequest, raw_output: np.ndarray
+    ) -> Tuple[int, np.ndarray]:
+        """Predicted class index and class probabilities from one row of Booster output."""
+        if raw_output.shape == (3,):
+            probabilities = raw_output.astype(np.float64)
+            prediction = int(probabilities.argmax())
             logger.info(
-                "Model prediction (binary) - Student: %s, Prob At-Risk: %.4f, Prob Safe: %.4f",
+                "Model prediction (multi-class) - Student: %s, Prob Safe: %.4f, "
+                "Prob Medium: %.4f, Prob At-Risk: %.4f, Predicted: %s",
                 request.student_id,
-                prob_at_risk,
                 probabilities[0],
+                probabilities[1],
+                probabilities[2],
+                prediction,
             )
             return prediction, probabilities
 
-        return self._demo_predict(request)
+        prob_at_risk = float(raw_output)
+        prob_at_risk = max(0.0, min(1.0, prob_at_risk))
+        probabilities = np.array([1.0 - prob_at_risk, prob_at_risk])
+        prediction = 1 if prob_at_risk > 0.5 else 0
+        logger.info(
+            "Model prediction (binary) - Student: %s, Prob At-Risk: %.4f, Prob Safe: %.4f",
+            request.student_id,
+            prob_at_risk,
+            probabilities[0],
+        )
+        return prediction, probabilities
 
     def _summarize_prediction(
         self, prediction: int, probabilities: np.ndarray
@@ -451,11 +483,13 @@ class AcademicRiskService:
 
     def _normalize_request(self, request: AcademicRiskRequest) -> AcademicRiskRequest:
         """Keep derived binary flags consistent with the numeric features."""
-        normalized = request.model_copy(deep=True)
-        normalized.low_performance = 1 if normalized.avg_grade < 40 else 0
-        normalized.low_engagement = 1 if normalized.assessment_completion_rate < 0.7 else 0
-        normalized.has_previous_attempts = 1 if normalized.num_of_prev_attempts > 0 else 0
-        return normalized
+        return request.model_copy(
+            update={
+                "low_performance": 1 if request.avg_grade < 40 else 0,
+                "low_engagement": 1 if request.assessment_completion_rate < 0.7 else 0,
+                "has_previous_attempts": 1 if request.num_of_prev_attempts > 0 else 0,
+            }
+        )
 
     def _format_feature_label(self, feature: str) -> str:
         labels = {
@@ -601,13 +635,21 @@ class AcademicRiskService:
                     float,
                 ] | None = None
 
-                for feature, candidate_request, rationale in self._build_candidate_updates(
-                    working_request
-                ):
-                    candidate_request = self._normalize_request(candidate_request)
-                    candidate_prediction, candidate_probabilities = self._run_prediction_model_or_demo(
-                        candidate_request
+                candidates = [
+                    (feature, self._normalize_request(candidate_request), rationale)
+                    for feature, candidate_request, rationale in self._build_candidate_updates(
+                        working_request
                     )
+                ]
+                # All one-step candidates are scored in a single model call
+                candidate_outputs = self._run_predictions_model_or_demo(
+                    [candidate_request for _, candidate_request, _ in candidates]
+                )
+
+                for (feature, candidate_request, rationale), (
+                    candidate_prediction,
+                    candidate_probabilities,
+                ) in zip(candidates, candidate_outputs):
                     candidate_outcome, candidate_score, candidate_confidence, _ = (
                         self._summarize_prediction(candidate_prediction, candidate_probabilities)
                     )
@@ -738,6 +780,11 @@ class AcademicRiskService:
 
     async def predict(self, request: AcademicRiskRequest) -> AcademicRiskResponse:
         """Make academic risk prediction."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._predict_blocking, request)
+
+    def _predict_blocking(self, request: AcademicRiskRequest) -> AcademicRiskResponse:
+        """CPU-bound body of predict(), run on the inference thread pool."""
         try:
             normalized_request = self._normalize_request(request)
             prediction, probabilities = self._run_prediction_model_or_demo(normalized_request)
@@ -0,0 +1,49 @@
+"""
+Bounded LRU cache of model outputs keyed by the feature row they were computed from
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+# Model outputs kept per service for repeated identical feature rows
+PREDICTION_CACHE_SIZE = 4096
+
+
+class PredictionCache:
+    """Reuse model outputs when the same feature row is scored again (e.g. polling dashboards)"""
+
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        # Services look entries up from their inference threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(features: np.ndarray) -> bytes:
+        """Fingerprint of the row's bytes (each service builds rows of one fixed dtype and shape)"""
+        return hashlib.blake2b(features.tobytes(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        """Cached output for key, or None; hits become most recently used"""
+        with self._lock:
+            output = self._entries.get(key)
+            if output is not None:
+                self._entries.move_to_end(key)
+            return output
+
+    def put(self, key: bytes, output: np.ndarray) -> np.ndarray:
+        """Store a read-only copy of output, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return output
+        output = np.array(output)
+        output.setflags(write=False)
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return output
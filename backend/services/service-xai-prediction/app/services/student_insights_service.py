@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 from dataclasses import dataclass
 from typing import Any
 
@@ -34,6 +35,9 @@ from app.schemas.academic_risk import (
 from app.services.academic_risk_service import academic_risk_service
 from app.services.sync_service import SyncServiceError, sync_service
 
+# Similar students shown in the similar-cases and case-outcome panels
+SIMILAR_CASE_LIMIT = 3
+
 
 @dataclass
 class InsightCandidate:
@@ -97,7 +101,7 @@ class StudentInsightsService:
         )
         case_outcome_explorer = await self._build_case_outcome_explorer(
             source=source,
-            ranked_candidates=ranked_similar_candidates[:3],
+            ranked_candidates=ranked_similar_candidates,
             db=db,
             temp_db=temp_db,
         )
@@ -321,15 +325,16 @@ class StudentInsightsService:
             )
             ranked_candidates.append((similarity, candidate))
 
-        ranked_candidates.sort(key=lambda item: item[0], reverse=True)
-        return ranked_candidates
+        # Only the top few are shown: select them (same order as a full stable
+        # descending sort) instead of sorting every candidate
+        return heapq.nlargest(SIMILAR_CASE_LIMIT, ranked_candidates, key=lambda item: item[0])
 
     def _build_similar_cases(
         self,
         ranked_candidates: list[tuple[float, InsightCandidate]],
     ) -> list[SimilarStudentCase]:
         similar_cases: list[SimilarStudentCase] = []
-        for similarity, candidate in ranked_candidates[:3]:
+        for similarity, candidate in ranked_candidates:
             similar_cases.append(
                 SimilarStudentCase(
                     student_id=candidate.student_id,
@@ -11,6 +11,12 @@ import pytest
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Repository root for the shared backend package (app.core.config imports it),
+# as app/main.py does
+repo_root = project_root.parent.parent.parent
+if str(repo_root) not in sys.path:
+    sys.path.append(str(repo_root))
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
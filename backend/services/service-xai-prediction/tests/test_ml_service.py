@@ -2,6 +2,9 @@
 Test ML Service functionality.
 """
 
+import asyncio
+
+import numpy as np
 import pytest
 
 from app.schemas.prediction import (
@@ -12,6 +15,7 @@ from app.schemas.prediction import (
     PredictionResult,
     RiskLevel,
 )
+from app.services.ml_service import MLService
 
 
 class TestPredictionRequest:
@@ -84,4 +88,116 @@ class TestRiskLevel:
         """Test risk level string values."""
         assert RiskLevel.LOW.value == "low"
         assert RiskLevel.MEDIUM.value == "medium"
-        assert RiskLevel.HIGH.value == "high"
\ No newline at end of file
+        assert RiskLevel.HIGH.value == "high"
+
+
+class RecordingModel:
+    """Fake classifier: P(at_risk) = days_inactive / 30, one call recorded per batch."""
+
+    def __init__(self, error=None):
+        self.batch_sizes = []
+        self.error = error
+
+    def predict_proba(self, features):
+        self.batch_sizes.append(len(features))
+        if self.error is not None:
+            raise self.error
+        at_risk = features[:, 3] / 30
+        return np.column_stack([1 - at_risk, at_risk]).astype(np.float32)
+
+
+def build_service(model) -> MLService:
+    service = MLService()
+    service.model = model
+    return service
+
+
+def run(coroutine):
+    """Run on a fresh event loop; a wedged batch worker fails the test instead of hanging it."""
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=5))
+
+
+def feature_row(days_inactive: int) -> np.ndarray:
+    return np.array([[100, 30, 0.5, days_inactive, 0.5, 60]], dtype=np.float32)
+
+
+class TestPredictionBatching:
+    """Tests for the micro-batching inference worker."""
+
+    def test_concurrent_predictions_share_one_model_call(self):
+        """Concurrent callers are scored in one batch and each gets its own row."""
+        model = RecordingModel()
+        service = build_service(model)
+        requests = [
+            PredictionRequest(student_id=f"student_{days}", days_inactive=days)
+            for days in (3, 6, 9, 12, 15)
+        ]
+
+        async def predict_all():
+            return await asyncio.gather(*(service.predict(r) for r in requests))
+
+        results = run(predict_all())
+
+        assert model.batch_sizes == [len(requests)]
+        for request, (prediction, _) in zip(requests, results):
+            assert prediction.probability == pytest.approx(request.days_inactive / 30)
+            assert type(prediction.probability) is float
+
+    def test_each_event_loop_gets_its_own_worker(self):
+        """A new event loop starts a fresh queue instead of reusing a dead one."""
+        model = RecordingModel()
+        service = build_service(model)
+
+        first = run(service._predict_proba(feature_row(3)))
+        second = run(service._predict_proba(feature_row(6)))
+
+        assert model.batch_sizes == [1, 1]
+        assert first[1] == pytest.approx(0.1)
+        assert second[1] == pytest.approx(0.2)
+
+    def test_model_error_reaches_every_waiter(self):
+        """A failing batch raises the model's exception in every caller."""
+        error = ValueError("model exploded")
+        service = build_service(RecordingModel(error=error))
+
+        async def predict_all():
+            return await asyncio.gather(
+                *(service._predict_proba(feature_row(days)) for days in (3, 6, 9)),
+                return_exceptions=True,
+            )
+
+        assert run(predict_all()) == [error, error, error]
+
+    def test_model_error_falls_back_to_demo_prediction(self):
+        """predict() still answers when the batch fails."""
+        service = build_service(RecordingModel(error=ValueError("model exploded")))
+        request = PredictionRequest(student_id="student_1", days_inactive=9)
+
+        prediction, _ = run(service.predict(request))
+
+        assert prediction.probability == service._demo_prediction(request)
+
+    def test_cancelled_caller_does_not_break_the_batch(self):
+        """Cancelling one queued caller leaves the others and the worker running."""
+        model = RecordingModel()
+        service = build_service(model)
+
+        async def predict_with_one_cancelled():
+            tasks = [
+                asyncio.create_task(service._predict_proba(feature_row(days)))
+                for days in (3, 6, 9)
+            ]
+            # Let every caller queue its row before the batch is scored
+            await asyncio.sleep(0)
+            tasks[1].cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            after = await service._predict_proba(feature_row(12))
+            return results, after
+
+        results, after = run(predict_with_one_cancelled())
+
+        assert model.batch_sizes == [3, 1]
+        assert results[0][1] == pytest.approx(0.1)
+        assert isinstance(results[1], asyncio.CancelledError)
+        assert results[2][1] == pytest.approx(0.3)
+        assert after[1] == pytest.approx(0.4)
@@ -0,0 +1,83 @@
+"""
+Test the model output cache.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.prediction_cache import PredictionCache
+
+
+def row(*values) -> np.ndarray:
+    return np.array([values], dtype=np.float32)
+
+
+class TestPredictionCacheKey:
+    """Tests for feature row fingerprints."""
+
+    def test_equal_rows_share_a_key(self):
+        """Rebuilt rows with the same values hit the same entry."""
+        assert PredictionCache.key(row(1, 2, 3)) == PredictionCache.key(row(1, 2, 3))
+
+    def test_different_rows_get_different_keys(self):
+        """Any changed feature value moves the key."""
+        assert PredictionCache.key(row(1, 2, 3)) != PredictionCache.key(row(1, 2, 4))
+
+
+class TestPredictionCache:
+    """Tests for PredictionCache lookups and eviction."""
+
+    def test_miss_then_hit(self):
+        """get returns None until put stores the output."""
+        cache = PredictionCache()
+        key = PredictionCache.key(row(1, 2, 3))
+
+        assert cache.get(key) is None
+        cache.put(key, np.array([0.2, 0.8]))
+        np.testing.assert_array_equal(cache.get(key), [0.2, 0.8])
+
+    def test_evicts_least_recently_used(self):
+        """A full cache drops the entry read or written longest ago."""
+        cache = PredictionCache(maxsize=2)
+        cache.put(b"a", np.array([1.0]))
+        cache.put(b"b", np.array([2.0]))
+        # Reading "a" makes "b" the least recently used entry
+        cache.get(b"a")
+        cache.put(b"c", np.array([3.0]))
+
+        assert cache.get(b"b") is None
+        np.testing.assert_array_equal(cache.get(b"a"), [1.0])
+        np.testing.assert_array_equal(cache.get(b"c"), [3.0])
+
+    def test_put_refreshes_an_existing_key(self):
+        """Overwriting a key replaces its output and makes it most recently used."""
+        cache = PredictionCache(maxsize=2)
+        cache.put(b"a", np.array([1.0]))
+        cache.put(b"b", np.array([2.0]))
+        cache.put(b"a", np.array([1.5]))
+        cache.put(b"c", np.array([3.0]))
+
+        assert cache.get(b"b") is None
+        np.testing.assert_array_equal(cache.get(b"a"), [1.5])
+
+    @pytest.mark.parametrize("maxsize", [0, -1])
+    def test_non_positive_maxsize_disables_caching(self, maxsize):
+        """put hands the output straight back and stores nothing."""
+        cache = PredictionCache(maxsize=maxsize)
+        output = np.array([0.2, 0.8])
+
+        assert cache.put(b"a", output) is output
+        assert cache.get(b"a") is None
+
+    def test_stored_outputs_are_read_only_copies(self):
+        """Neither the caller's array nor a cache hit can change a stored entry."""
+        cache = PredictionCache()
+        output = np.array([0.2, 0.8])
+        stored = cache.put(b"a", output)
+
+        output[0] = 1.0
+        with pytest.raises(ValueError):
+            stored[0] = 1.0
+        with pytest.raises(ValueError):
+            cache.get(b"a")[0] = 1.0
+        np.testing.assert_array_equal(cache.get(b"a"), [0.2, 0.8])
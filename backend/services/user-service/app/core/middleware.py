@@ -15,26 +15,28 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     """Middleware for logging requests and responses"""
 
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
 
-        # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
+        # Log request (%-style arguments are only formatted when INFO is enabled)
+        logger.info("Request: %s %s", request.method, request.url.path)
 
         # Process request
         response = await call_next(request)
 
         # Calculate processing time
-        process_time = time.time() - start_time
+        process_time = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Log response
         logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Duration: {process_time:.4f}s"
+            "Response: %s %s Status: %d Duration: %.4fs",
+            request.method,
+            request.url.path,
+            response.status_code,
+            process_time,
         )
 
-        # Add custom header with process time
-        response.headers["X-Process-Time"] = str(process_time)
+        # Add custom header with process time (seconds)
+        response.headers["X-Process-Time"] = f"{process_time:.6f}"
 
         return response
 
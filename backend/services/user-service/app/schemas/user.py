@@ -2,10 +2,12 @@ from datetime import datetime
 from typing import Optional
 
 from app.models.user import UserRole
-from pydantic import UUID4, BaseModel, EmailStr
+from pydantic import UUID4, BaseModel, ConfigDict, EmailStr
 
 
 class UserBase(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     email: EmailStr
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -18,6 +20,8 @@ class UserCreate(UserBase):
 
 
 class UserUpdate(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     first_name: Optional[str] = None
     last_name: Optional[str] = None
     password: Optional[str] = None
@@ -30,5 +34,4 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(frozen=True, extra="forbid", from_attributes=True)
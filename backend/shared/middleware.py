@@ -51,17 +51,21 @@ async def logging_middleware(request: Request, call_next: Callable):
     request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
     request.state.request_id = request_id
     
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
-    logger.info(f"[{request_id}] Request: {request.method} {request.url.path} (Instance: {INSTANCE_ID})")
+    # %-style arguments: the message is only formatted when INFO is enabled
+    logger.info("[%s] Request: %s %s (Instance: %s)", request_id, request.method, request.url.path, INSTANCE_ID)
 
     response = await call_next(request)
     
     response.headers["X-Request-ID"] = request_id
     response.headers["X-Instance-ID"] = INSTANCE_ID
 
-    process_time = time.time() - start_time
-    logger.info(f"[{request_id}] Response: {response.status_code} - Duration: {process_time:.3f}s (Instance: {INSTANCE_ID})")
+    process_time = (time.perf_counter_ns() - start_ns) / 1e9
+    logger.info(
+        "[%s] Response: %d - Duration: %.3fs (Instance: %s)",
+        request_id, response.status_code, process_time, INSTANCE_ID,
+    )
 
     return response
 
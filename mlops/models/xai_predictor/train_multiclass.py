@@ -24,6 +24,10 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 import xgboost as xgb
+try:
+    import pyarrow  # noqa: F401  (CSV reader and Parquet engine)
+except ImportError:  # optional dependency; pandas' C parser and CSV output are used instead
+    pyarrow = None
 from sklearn.metrics import (
     accuracy_score,
     classification_report,
@@ -43,6 +47,10 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 DATA_DIR = SCRIPT_DIR / "data"
 OULAD_DIR = DATA_DIR / "OULAD"
 SAVED_MODELS_DIR = SCRIPT_DIR / "saved_models"
+PROCESSED_PARQUET = DATA_DIR / "oulad_processed_multiclass.parquet"
+PROCESSED_CSV = DATA_DIR / "oulad_processed_multiclass.csv"  # legacy format
+# pyarrow's multithreaded CSV reader parses straight into typed columns
+CSV_ENGINE = "pyarrow" if pyarrow is not None else "c"
 
 # Model configuration
 FEATURE_COLS = [
@@ -93,70 +101,42 @@ RISK_THRESHOLDS = {
 # ============================================================
 # ETL FUNCTIONS
 # ============================================================
-def create_risk_category(row) -> int:
+def create_risk_category(df: pd.DataFrame) -> np.ndarray:
     """
-    Create 3-tier risk category based on multiple factors.
-    Returns: 0=Safe, 1=Medium Risk, 2=At-Risk
+    Create 3-tier risk categories based on multiple factors, for all rows at once.
+    Returns: array of 0=Safe, 1=Medium Risk, 2=At-Risk
     """
     # Check if explicitly failed or withdrawn
-    if row["final_result"] in ["Fail", "Withdrawn"]:
-        base_at_risk = True
-    else:
-        base_at_risk = False
-    
-    # Calculate risk score based on features
-    risk_score = 0
-    
-    # Grade-based risk (40% weight)
-    if row["avg_grade"] < 55:
-        risk_score += 4
-    elif row["avg_grade"] < 65:
-        risk_score += 2
-    elif row["avg_grade"] >= 75:
-        risk_score -= 1
-    
-    # Assessment engagement (30% weight)
-    if row["num_assessments"] < 4:
-        risk_score += 3
-    elif row["num_assessments"] < 6:
-        risk_score += 1
-    elif row["num_assessments"] >= 8:
-        risk_score -= 1
-    
-    # Completion rate (15% weight)
-    completion = row["assessment_completion_rate"]
-    if completion < 0.3:
-        risk_score += 2
-    elif completion < 0.5:
-        risk_score += 1
-    elif completion >= 0.7:
-        risk_score -= 1
-    
-    # Previous attempts (15% weight)
-    if row["num_of_prev_attempts"] > 1:
-        risk_score += 2
-    elif row["num_of_prev_attempts"] == 1:
-        risk_score += 1
-    
-    # Grade consistency
-    if row["grade_consistency"] < 70:
-        risk_score += 1
-    elif row["grade_consistency"] >= 90:
-        risk_score -= 1
-    
-    # Determine final category
-    if base_at_risk or risk_score >= 5:
-        return 2  # At-Risk
-    elif risk_score >= 2:
-        return 1  # Medium Risk
-    else:
-        return 0  # Safe
+    base_at_risk = df["final_result"].isin(["Fail", "Withdrawn"]).to_numpy()
+    
+    grade = df["avg_grade"].to_numpy()
+    assessments = df["num_assessments"].to_numpy()
+    completion = df["assessment_completion_rate"].to_numpy()
+    prev_attempts = df["num_of_prev_attempts"].to_numpy()
+    consistency = df["grade_consistency"].to_numpy()
+    
+    # Calculate risk score based on features (the first matching band applies)
+    risk_score = (
+        # Grade-based risk (40% weight)
+        np.select([grade < 55, grade < 65, grade >= 75], [4, 2, -1], default=0)
+        # Assessment engagement (30% weight)
+        + np.select([assessments < 4, assessments < 6, assessments >= 8], [3, 1, -1], default=0)
+        # Completion rate (15% weight)
+        + np.select([completion < 0.3, completion < 0.5, completion >= 0.7], [2, 1, -1], default=0)
+        # Previous attempts (15% weight)
+        + np.select([prev_attempts > 1, prev_attempts == 1], [2, 1], default=0)
+        # Grade consistency
+        + np.select([consistency < 70, consistency >= 90], [1, -1], default=0)
+    )
+    
+    # Determine final category: At-Risk, Medium Risk, else Safe
+    return np.select([base_at_risk | (risk_score >= 5), risk_score >= 2], [2, 1], default=0)
 
 
 def run_etl() -> Path:
     """
     Extract, Transform, Load OULAD data with 3-tier risk categories.
-    Returns path to processed CSV file.
+    Returns path to the processed dataset (Parquet, or CSV without pyarrow).
     """
     print("=" * 60)
     print("STEP 1: ETL PROCESSING (Multi-Class)")
@@ -170,9 +150,22 @@ def run_etl() -> Path:
     
     # Load datasets
     print("\nLoading OULAD datasets...")
-    student_info = pd.read_csv(OULAD_DIR / "studentInfo.csv")
-    student_assessment = pd.read_csv(OULAD_DIR / "studentAssessment.csv")
-    assessments = pd.read_csv(OULAD_DIR / "assessments.csv")
+    # Only the columns the ETL uses, with 32-bit ids (OULAD ids fit easily)
+    student_info = pd.read_csv(
+        OULAD_DIR / "studentInfo.csv", engine=CSV_ENGINE, dtype={"id_student": "int32"}
+    )
+    student_assessment = pd.read_csv(
+        OULAD_DIR / "studentAssessment.csv",
+        engine=CSV_ENGINE,
+        usecols=["id_assessment", "id_student", "date_submitted", "score"],
+        dtype={"id_assessment": "int32", "id_student": "int32", "date_submitted": "int32"},
+    )
+    assessments = pd.read_csv(
+        OULAD_DIR / "assessments.csv",
+        engine=CSV_ENGINE,
+        usecols=["id_assessment", "assessment_type", "weight"],
+        dtype={"id_assessment": "int32"},
+    )
     
     print(f"✓ Student Info: {len(student_info):,} records")
     print(f"✓ Student Assessments: {len(student_assessment):,} records")
@@ -229,7 +222,7 @@ def run_etl() -> Path:
     
     # Create 3-tier risk category
     print("\nCreating 3-tier risk categories...")
-    df["risk_category"] = df.apply(create_risk_category, axis=1)
+    df["risk_category"] = create_risk_category(df)
     
     # Filter clean data
     df_clean = df[df["final_result"].notna()].copy()
@@ -243,9 +236,14 @@ def run_etl() -> Path:
     )
     output_df = df_clean[output_cols]
     
-    # Save processed data
-    output_path = DATA_DIR / "oulad_processed_multiclass.csv"
-    output_df.to_csv(output_path, index=False)
+    # Save processed data: zstd-compressed Parquet keeps the dtypes and reads back
+    # far faster than CSV; CSV only when pyarrow is not installed
+    if pyarrow is not None:
+        output_path = PROCESSED_PARQUET
+        output_df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    else:
+        output_path = PROCESSED_CSV
+        output_df.to_csv(output_path, index=False)
     
     # Print distribution
     print(f"\n✓ Processed {len(output_df):,} student records")
@@ -271,13 +269,17 @@ def run_training() -> dict:
     print("=" * 60)
     
     # Load processed data
-    data_path = DATA_DIR / "oulad_processed_multiclass.csv"
-    if not data_path.exists():
-        print(f"Error: Processed data not found at {data_path}")
+    if pyarrow is not None and PROCESSED_PARQUET.exists():
+        data_path = PROCESSED_PARQUET
+        df = pd.read_parquet(data_path, engine="pyarrow")
+    elif PROCESSED_CSV.exists():
+        data_path = PROCESSED_CSV
+        df = pd.read_csv(data_path, engine=CSV_ENGINE)
+    else:
+        print(f"Error: Processed data not found at {PROCESSED_PARQUET} or {PROCESSED_CSV}")
         print("Please run ETL first: python train_multiclass.py --step etl")
         sys.exit(1)
     
-    df = pd.read_csv(data_path)
     print(f"\n✓ Loaded {len(df):,} records from {data_path}")
     
     X = df[FEATURE_COLS]
@@ -6,7 +6,11 @@ These schemas can be imported by any backend service that needs prediction types
 from enum import Enum
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Schemas are immutable value objects; unknown fields are rejected rather than
+# carried along
+SCHEMA_CONFIG = ConfigDict(frozen=True, extra="forbid")
 
 
 class RiskLevel(str, Enum):
@@ -29,6 +33,8 @@ class PredictionType(str, Enum):
 
 class PredictionRequest(BaseModel):
     """Request schema for student outcome prediction."""
+    model_config = SCHEMA_CONFIG
+
     student_id: str = Field(..., description="Unique student identifier")
     total_interactions: float = Field(default=0.0, ge=0)
     avg_response_time: float = Field(default=0.0, ge=0)
@@ -40,6 +46,8 @@ class PredictionRequest(BaseModel):
 
 class PredictionResult(BaseModel):
     """Individual prediction result."""
+    model_config = SCHEMA_CONFIG
+
     predicted_class: str
     probability: float = Field(..., ge=0, le=1)
     risk_level: str
@@ -47,6 +55,8 @@ class PredictionResult(BaseModel):
 
 class FeatureContribution(BaseModel):
     """Feature importance for explanation."""
+    model_config = SCHEMA_CONFIG
+
     feature: str
     value: float
     contribution: float
@@ -55,6 +65,8 @@ class FeatureContribution(BaseModel):
 
 class ExplanationResult(BaseModel):
     """XAI Explanation result."""
+    model_config = SCHEMA_CONFIG
+
     feature_contributions: List[FeatureContribution]
     top_positive_factors: List[str]
     top_negative_factors: List[str]
@@ -64,6 +76,8 @@ class ExplanationResult(BaseModel):
 
 class PredictionResponse(BaseModel):
     """Response schema for prediction."""
+    model_config = SCHEMA_CONFIG
+
     prediction: PredictionResult
     explanation: ExplanationResult
     recommendations: List[str] = Field(default_factory=list)
@@ -75,6 +89,8 @@ class PredictionResponse(BaseModel):
 
 class AcademicRiskRequest(BaseModel):
     """Request schema for academic risk prediction."""
+    model_config = SCHEMA_CONFIG
+
     student_id: str
     code_module: Optional[str] = None
     code_presentation: Optional[str] = None
@@ -87,6 +103,8 @@ class AcademicRiskRequest(BaseModel):
 
 class AcademicRiskResponse(BaseModel):
     """Response schema for academic risk prediction."""
+    model_config = SCHEMA_CONFIG
+
     student_id: str
     risk_level: str
     risk_probability: float = Field(..., ge=0, le=1)
@@ -104,6 +122,8 @@ class AcademicRiskResponse(BaseModel):
 
 class DataQuality(BaseModel):
     """Information about data quality."""
+    model_config = SCHEMA_CONFIG
+
     status: str  # sufficient, partial, insufficient
     ml_ready: bool
     completeness_score: float
@@ -113,6 +133,8 @@ class DataQuality(BaseModel):
 
 class SmartPredictionRequest(BaseModel):
     """Combined request for smart prediction."""
+    model_config = SCHEMA_CONFIG
+
     student_id: str
     total_clicks: int = Field(default=0, ge=0)
     days_active: int = Field(default=0, ge=0)
@@ -130,6 +152,8 @@ class SmartPredictionRequest(BaseModel):
 
 class SmartPredictionResponse(BaseModel):
     """Response from smart prediction."""
+    model_config = SCHEMA_CONFIG
+
     student_id: str
     risk_level: str
     risk_probability: float